@@ -0,0 +1,104 @@
+"""
+Benchmark: universe-scale cross-source reconciliation.
+
+Writes two synthetic universe matrices to a temporary directory: a reference
+source stamped at New York midnight and a second source with naive dates
+whose closes match except for injected anomalies (deviation spikes, dropped
+bars, stale repeats, unadjusted splits and dividend-adjusted history). The
+benchmark then times ``reconcile_universe`` over the whole universe and
+reports how many of the injected episodes it found.
+
+Usage:
+    python benchmarks/bench_reconcile.py [--symbols 5000] [--dates 2520]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.analysis.reconcile import reconcile_universe
+
+
+def write_matrix(path: Path, close: np.ndarray, dates: pd.DatetimeIndex, symbols):
+    """Write a single-field matrix in the layout build_universe_matrix produces."""
+    path.mkdir(parents=True, exist_ok=True)
+    np.save(path / 'values.npy', close[None].astype(np.float32))
+    stamps = dates.tz_convert('UTC') if dates.tz is not None else dates
+    np.save(path / 'dates.npy', stamps.tz_localize(None).as_unit('ns').asi8)
+    meta = {'fields': ['Close'], 'symbols': symbols, 'dtype': 'float32',
+            'tz': str(dates.tz) if dates.tz is not None else None}
+    (path / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+
+def make_sources(n_symbols: int, n_dates: int, events: int, seed: int = 7):
+    """Reference and second-source closes plus the injected episode counts."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.02, size=(n_symbols, n_dates))
+    reference = 100 * np.exp(np.cumsum(returns, axis=1))
+    other = reference.copy()
+
+    def cells(count):
+        return rng.integers(0, n_symbols, count), rng.integers(10, n_dates - 10, count)
+
+    rows, cols = cells(events)
+    other[rows, cols] *= 1.05
+    rows, cols = cells(events)
+    other[rows, cols] = np.nan
+    rows, cols = cells(events)
+    other[rows, cols] = other[rows, cols - 1]
+
+    # Split mismatches and dividend-adjusted history on disjoint symbols
+    picked = rng.choice(n_symbols, 2 * events, replace=False)
+    for row in picked[:events]:
+        other[row, :rng.integers(10, n_dates - 10)] *= 2.0
+    for row in picked[events:]:
+        other[row, :rng.integers(10, n_dates - 10)] *= 0.99
+
+    return reference, other, {'deviation': events, 'missing': events, 'stale': events,
+                              'split': events, 'dividend': events}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-source reconciliation benchmark")
+    parser.add_argument('--symbols', type=int, default=5000, help='Symbols in the universe')
+    parser.add_argument('--dates', type=int, default=2520, help='Sessions per symbol (2520 ~ 10 years)')
+    parser.add_argument('--events', type=int, default=100, help='Injected episodes per check')
+    args = parser.parse_args()
+
+    print("🚀 Cross-Source Reconciliation Benchmark")
+    print("=" * 60)
+    print(f"   {args.symbols} symbols x {args.dates} sessions, {args.events} injected episodes per check")
+
+    reference, other, injected = make_sources(args.symbols, args.dates, args.events)
+    days = pd.bdate_range(end='2024-06-28', periods=args.dates)
+    symbols = [f"S{i:05d}" for i in range(args.symbols)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_matrix(Path(tmp) / 'yahoo', reference, days.tz_localize('America/New_York'), symbols)
+        write_matrix(Path(tmp) / 'alpha_vantage', other, days, symbols)
+
+        started = time.perf_counter()
+        report = reconcile_universe({'yahoo': Path(tmp) / 'yahoo', 'alpha_vantage': Path(tmp) / 'alpha_vantage'})
+        elapsed = time.perf_counter() - started
+
+    summary = report['summary']
+    cells = args.symbols * args.dates
+    print(f"\n⏱️  {elapsed:.2f}s ({cells / elapsed / 1e6:.1f}M symbol-sessions/s), "
+          f"{summary['sources']['alpha_vantage']['bars_compared']:,} bars compared")
+    print(f"\n{'check':>10} {'injected':>10} {'episodes':>10} {'bars':>10}")
+    for check, count in injected.items():
+        print(f"{check:>10} {count:>10} {summary['episodes'].get(check, 0):>10} "
+              f"{summary['flagged_bars'].get(check, 0):>10}")
+    print(f"\n   {len(report['anomalies'])} report rows, {summary['symbols_flagged']} symbols flagged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: per-request serialization cost of /stock/price responses.
+
+Compares the original handler body (copy the frame, strftime the index,
+cast object columns, to_dict, walk every record, JSONResponse) with the
+slice-first encoders in src.utils.serialization, for price histories of
+different lengths. Every variant returns the last 30 rows.
+
+Usage:
+    python benchmarks/bench_serialization.py [--iterations 2000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.utils import serialization
+
+HISTORY_LENGTHS = {'1mo': 21, '6mo': 126, '5y': 1260, 'max': 10000}
+
+
+def make_price_frame(n_rows: int) -> pd.DataFrame:
+    """yfinance-shaped OHLCV frame with a tz-aware daily index."""
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows)))
+    index = pd.date_range(end='2024-06-28', periods=n_rows, freq='B', tz='America/New_York', name='Date')
+    return pd.DataFrame({
+        'Open': close * 0.99,
+        'High': close * 1.01,
+        'Low': close * 0.98,
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 50_000_000, n_rows),
+        'Dividends': np.zeros(n_rows),
+        'Stock Splits': np.zeros(n_rows),
+    }, index=index)
+
+
+def legacy(df):
+    """Original get_stock_price serialization."""
+    df_copy = df.copy()
+    if hasattr(df_copy.index, 'strftime'):
+        df_copy.index = df_copy.index.strftime('%Y-%m-%d %H:%M:%S')
+    for col in df_copy.columns:
+        if df_copy[col].dtype == 'object':
+            df_copy[col] = df_copy[col].astype(str)
+    records = df_copy.tail(30).to_dict(orient="records")
+    for record in records:
+        for key, value in record.items():
+            if hasattr(value, 'isoformat'):
+                record[key] = value.isoformat()
+            elif hasattr(value, 'strftime'):
+                record[key] = value.strftime('%Y-%m-%d %H:%M:%S')
+    return JSONResponse(records).body
+
+
+def new_format(fmt):
+    def encode(df):
+        return serialization.frame_response(df, fmt, rows=30).body
+    return encode
+
+
+def per_call_us(func, df, iterations: int) -> float:
+    func(df)  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(df)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization benchmark")
+    parser.add_argument('--iterations', type=int, default=2000, help='Calls per measurement')
+    args = parser.parse_args()
+
+    variants = {'legacy': legacy, 'records': new_format('records'), 'columnar': new_format('columnar')}
+    try:
+        import pyarrow  # noqa: F401
+        variants['arrow'] = new_format('arrow')
+    except ImportError:
+        print("⚠️  pyarrow not installed, skipping the arrow format")
+
+    print("🚀 Serialization Benchmark (µs per request, last 30 rows)")
+    print("=" * 60)
+    print(f"{'history':>8}" + "".join(f"{name:>12}" for name in variants))
+    for label, n_rows in HISTORY_LENGTHS.items():
+        df = make_price_frame(n_rows)
+        timings = [per_call_us(func, df, args.iterations) for func in variants.values()]
+        print(f"{label:>8}" + "".join(f"{t:>12.1f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Fixtures for the offline benchmark suite.
+
+Every benchmark runs against a replay cassette through ReplayManager, so no
+upstream is contacted: a synthetic cassette for 1,000 symbols is generated
+once per session, or ``BENCH_CASSETTE`` points at a recorded one
+(``python -m src.main ... --record DIR``). Upstream calls take a simulated
+``BENCH_LATENCY_MS`` (default 5) and each connector allows
+``BENCH_RATE_LIMIT`` requests per second (default 1000), enforced on both
+sides: by the replay connectors as 429s and by the client rate limiter.
+Caches, the price store and rate-limit state are wiped before every round,
+so rounds measure the cold path.
+
+Usage:
+    python -m pytest benchmarks/suite                      # compare with baselines.json
+    python -m pytest benchmarks/suite --update-baselines   # store new baselines
+    python -m pytest benchmarks/suite -k "not 1000"        # skip the largest universe
+
+A benchmark fails when its median exceeds the stored baseline by more than
+``--regression-threshold`` (default 0.25, i.e. 25%); benchmarks without a
+baseline only report.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+WORKDIR = Path(tempfile.mkdtemp(prefix='fri-bench-'))
+BASELINES = Path(__file__).resolve().parent / 'baselines.json'
+LATENCY_MS = float(os.environ.get('BENCH_LATENCY_MS', '5'))
+RATE_LIMIT = int(os.environ.get('BENCH_RATE_LIMIT', '1000'))
+SIZES = [1, 100, 1000]
+ROUNDS = {1: 5, 100: 3, 1000: 2}
+
+# Every on-disk layer lives in the scratch directory; set before settings are imported
+for name, value in {
+    'PRICE_STORE_DIR': str(WORKDIR / 'prices'),
+    'CACHE_DIR': str(WORKDIR / 'cache'),
+    'RATE_LIMIT_DIR': str(WORKDIR / 'ratelimit'),
+    'CACHE_REDIS_ENABLED': 'false',
+    'RATE_LIMIT_REDIS_ENABLED': 'false',
+    'INFLUX_ENABLED': 'false',
+    'ANALYTICS_POOL_ENABLED': 'false',
+    'WARM_ENABLED': 'false',
+    'STREAM_BROKER': 'memory',
+    'STREAM_SYMBOLS': '',
+    'RECORD_DIR': '',
+    'REPLAY_DIR': '',
+    'API_BATCH_MAX_SYMBOLS': str(max(SIZES)),
+}.items():
+    os.environ[name] = value
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('replay benchmarks')
+    group.addoption('--update-baselines', action='store_true',
+                    help='Write the medians of this run to benchmarks/suite/baselines.json')
+    group.addoption('--regression-threshold', type=float, default=0.25,
+                    help='Allowed median slowdown over the baseline (0.25 = 25%%)')
+
+
+class ReplayBench:
+    """Cassette, session factory and baseline checks shared by the benchmarks."""
+
+    def __init__(self, config, cassette: str, symbols):
+        self.config = config
+        self.cassette = cassette
+        self.symbols = symbols
+        self.limits = {name: (RATE_LIMIT, 1.0) for name in ('yahoo_finance', 'alpha_vantage', 'sec_edgar', 'fred')}
+        self.loop = asyncio.new_event_loop()
+        self.baselines = json.loads(BASELINES.read_text(encoding='utf-8')) if BASELINES.exists() else {}
+        self.results = {}
+
+    def session(self):
+        """A fresh DataSession over the cassette with the simulated upstream."""
+        from src.runtime import DataSession
+        from src.storage.replay import ReplayManager
+        from src.utils.rate_limiter import TokenBucketLimiter
+
+        manager = ReplayManager(self.cassette, latency_ms=LATENCY_MS, jitter=0.0, rate_limits=self.limits)
+        limiter = TokenBucketLimiter(self.limits, redis_url=None, directory=str(WORKDIR / 'ratelimit'))
+        return DataSession(manager, limiter)
+
+    def _reset(self):
+        for name in ('prices', 'cache', 'ratelimit'):
+            shutil.rmtree(WORKDIR / name, ignore_errors=True)
+        return (), {}
+
+    def measure(self, benchmark, name: str, scenario, size: int):
+        """Benchmark an async scenario from a clean slate and check it against its baseline."""
+        benchmark.extra_info.update({'symbols': size, 'latency_ms': LATENCY_MS, 'rate_limit': RATE_LIMIT})
+        benchmark.pedantic(lambda: self.loop.run_until_complete(scenario()), setup=self._reset,
+                           rounds=ROUNDS.get(size, 3), iterations=1)
+        if benchmark.stats is None:  # --benchmark-disable
+            return
+        median = benchmark.stats.stats.median
+        self.results[name] = round(median, 6)
+        baseline = self.baselines.get('benchmarks', {}).get(name)
+        if baseline is None or self.config.getoption('--update-baselines'):
+            return
+        limit = baseline * (1 + self.config.getoption('--regression-threshold'))
+        assert median <= limit, (f"{name}: median {median:.3f}s regressed past {limit:.3f}s "
+                                 f"(baseline {baseline:.3f}s)")
+
+    def save(self):
+        benchmarks = {**self.baselines.get('benchmarks', {}), **self.results}
+        BASELINES.write_text(json.dumps({
+            'machine': f"{platform.system()} {platform.machine()} {platform.python_implementation()} "
+                       f"{platform.python_version()}, {os.cpu_count()} CPU",
+            'latency_ms': LATENCY_MS,
+            'rate_limit': RATE_LIMIT,
+            'benchmarks': dict(sorted(benchmarks.items())),
+        }, indent=2) + '\n', encoding='utf-8')
+
+
+@pytest.fixture(scope='session')
+def replay(request):
+    from src.storage.replay import write_synthetic_cassette
+
+    cassette = os.environ.get('BENCH_CASSETTE')
+    if cassette:
+        from src.storage.replay import Cassette
+        recorded = Cassette(cassette)
+        symbols = sorted({e['symbol'] for e in recorded._entries.values()
+                          if e['connector'] == 'yahoo_finance' and e['symbol']})
+    else:
+        cassette = str(WORKDIR / 'cassette')
+        symbols = [f"S{i:04d}" for i in range(max(SIZES))]
+        write_synthetic_cassette(cassette, symbols)
+
+    bench = ReplayBench(request.config, cassette, symbols)
+    yield bench
+    if request.config.getoption('--update-baselines') and bench.results:
+        bench.save()
+    bench.loop.close()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
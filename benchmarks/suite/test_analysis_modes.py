@@ -0,0 +1,20 @@
+"""run_batch over the replay cassette for each analysis mode and universe size."""
+
+import pytest
+
+from conftest import SIZES, WORKDIR
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('mode', ['basic', 'technical', 'comprehensive'])
+def test_run_batch(benchmark, replay, mode, size):
+    from src.analysis.batch import run_batch
+
+    symbols = replay.symbols[:size]
+
+    async def scenario():
+        async with replay.session() as session:
+            report = await run_batch(symbols, mode, str(WORKDIR / f'{mode}.jsonl'), manager=session.manager)
+        assert report['failed'] == 0, report
+
+    replay.measure(benchmark, f'run_batch[{mode}-{size}]', scenario, size)
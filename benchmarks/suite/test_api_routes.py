@@ -0,0 +1,50 @@
+"""Hot API routes served in-process over ASGI against the replay cassette."""
+
+import json
+
+import httpx
+import pytest
+
+from conftest import SIZES
+
+
+async def _call(replay, requests):
+    """Run ``requests(client)`` against a fresh app session, inside the lifespan."""
+    import src.main_api as main_api
+
+    main_api.session = replay.session()
+    async with main_api.lifespan(main_api.app):
+        transport = httpx.ASGITransport(app=main_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            return await requests(client)
+
+
+def _check_lines(response, size):
+    response.raise_for_status()
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == size and all(row['status'] == 'ok' for row in rows)
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('route', ['price', 'info'])
+def test_stock_route(benchmark, replay, route, size):
+    symbols = replay.symbols[:size]
+
+    async def requests(client):
+        if size == 1:
+            response = await client.get(f'/stock/{route}', params={'symbol': symbols[0]})
+            response.raise_for_status()
+            return
+        path = '/stock/prices' if route == 'price' else '/stock/info'
+        _check_lines(await client.post(path, json={'symbols': symbols}), size)
+
+    replay.measure(benchmark, f'api_{route}[{size}]', lambda: _call(replay, requests), size)
+
+
+def test_economic_indicator(benchmark, replay):
+    async def requests(client):
+        for series_id in ('GDP', 'UNRATE', 'CPIAUCSL', 'DGS10'):
+            response = await client.get('/economic/indicator', params={'series_id': series_id})
+            response.raise_for_status()
+
+    replay.measure(benchmark, 'api_economic_indicator', lambda: _call(replay, requests), 1)
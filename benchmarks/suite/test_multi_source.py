@@ -0,0 +1,22 @@
+"""Concurrent multi-source fetches over the replay cassette."""
+
+import pytest
+
+from conftest import SIZES
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_fetch_multi_source(benchmark, replay, size):
+    from src.analysis.multi_source import fetch_multi_source
+    from src.config.settings import settings
+    from src.utils.fanout import fan_out
+
+    symbols = replay.symbols[:size]
+
+    async def scenario():
+        async with replay.session() as session:
+            results = [result async for result in fan_out(
+                symbols, lambda symbol: fetch_multi_source(session.manager, symbol), settings.BATCH_SIZE)]
+        assert all(result.error is None for result in results)
+
+    replay.measure(benchmark, f'multi_source[{size}]', scenario, size)
@@ -0,0 +1,27 @@
+"""
+Analysis routines for the Financial Research Intelligence platform.
+
+Exports are imported on first use, so importing the package stays cheap.
+"""
+
+from src.registry import lazy_exports
+
+__all__ = [
+    'run_analysis',
+    'load_universe',
+    'run_batch',
+    'IncrementalIndicators',
+    'IndicatorBook',
+    'AnalyticsExecutor',
+    'reconcile_universe',
+]
+
+__getattr__ = lazy_exports(__name__, {
+    'run_analysis': '.runner',
+    'load_universe': '.batch',
+    'run_batch': '.batch',
+    'IncrementalIndicators': '.incremental',
+    'IndicatorBook': '.incremental',
+    'AnalyticsExecutor': '.executor',
+    'reconcile_universe': '.reconcile',
+})
@@ -0,0 +1,200 @@
+"""
+Batch multi-symbol scan mode.
+
+Runs the single-symbol analysis for a whole universe of tickers through one
+shared FinancialDataManager, with bounded concurrency per connector, and
+writes the results to a single JSON Lines or Parquet file.
+"""
+
+import asyncio
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.config.settings import settings
+from src.utils.connector_proxy import ConnectorProxy, wrap_connectors
+from .runner import run_analysis
+
+
+class ConnectorThrottle(ConnectorProxy):
+    """Connector wrapper that caps the number of in-flight async calls."""
+
+    def __init__(self, connector: Any, limit: int):
+        super().__init__(connector)
+        self._semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _call(self, name, method, args, kwargs):
+        async with self._semaphore:
+            return await method(*args, **kwargs)
+
+
+def throttle_connectors(manager, limit: Optional[int] = None):
+    """
+    Wrap every connector of a manager in a ConnectorThrottle.
+
+    The throttle sits directly around the connector, below any cache layer,
+    so cache hits never wait for a slot.
+
+    Args:
+        manager: FinancialDataManager whose connectors should be bounded
+        limit: Maximum in-flight calls per connector (defaults to settings.MAX_WORKERS)
+
+    Returns:
+        The same manager, for chaining
+    """
+    limit = limit or settings.MAX_WORKERS
+    return wrap_connectors(manager, lambda name, connector: ConnectorThrottle(connector, limit),
+                           ConnectorThrottle, innermost=True)
+
+
+def load_universe(symbols: Optional[Iterable[str]] = None,
+                  universe_file: Optional[str] = None) -> List[str]:
+    """
+    Build a de-duplicated, upper-cased symbol list.
+
+    Args:
+        symbols: Symbols given directly (entries may be comma separated)
+        universe_file: Path to a file with one or more symbols per line;
+            blank lines and lines starting with '#' are ignored
+
+    Returns:
+        Symbols in first-seen order
+    """
+    raw: List[str] = []
+    for entry in symbols or []:
+        raw.extend(entry.split(','))
+
+    if universe_file:
+        with open(universe_file, 'r', encoding='utf-8') as fh:
+            for line in fh:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    raw.extend(line.replace(',', ' ').split())
+
+    seen = set()
+    universe = []
+    for symbol in raw:
+        symbol = symbol.strip().upper()
+        if symbol and symbol not in seen:
+            seen.add(symbol)
+            universe.append(symbol)
+    return universe
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class _ResultWriter:
+    """Streams rows to JSON Lines, or buffers them for a single Parquet write."""
+
+    def __init__(self, output_path: str):
+        self.path = Path(output_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.parquet = self.path.suffix.lower() == '.parquet'
+        self._rows: List[Dict[str, Any]] = []
+        self._fh = None if self.parquet else open(self.path, 'w', encoding='utf-8')
+
+    def write(self, row: Dict[str, Any]):
+        if self.parquet:
+            self._rows.append(row)
+        else:
+            self._fh.write(json.dumps(row, default=str) + '\n')
+
+    def close(self):
+        if self.parquet:
+            import pandas as pd
+            frame = pd.DataFrame(self._rows)
+            # Mixed-type columns (e.g. lists of sources) are stored as JSON text
+            for col in frame.columns:
+                if frame[col].dtype == 'object':
+                    frame[col] = frame[col].map(
+                        lambda v: v if v is None or isinstance(v, str) else json.dumps(v, default=str)
+                    )
+            frame.to_parquet(self.path, index=False)
+        else:
+            self._fh.close()
+
+
+async def run_batch(symbols: List[str],
+                    analysis_type: str = 'basic',
+                    output_path: str = 'batch_results.jsonl',
+                    manager=None,
+                    batch_size: Optional[int] = None,
+                    max_workers: Optional[int] = None,
+                    indicator_book=None) -> Dict[str, Any]:
+    """
+    Analyze many symbols concurrently and write one row per symbol.
+
+    At most ``batch_size`` symbols are in flight at once, and each connector
+    serves at most ``max_workers`` concurrent calls.
+
+    Args:
+        symbols: Symbols to analyze
+        analysis_type: Type of analysis ('basic', 'comprehensive', 'technical')
+        output_path: Destination file; '.parquet' writes Parquet, anything else JSON Lines
+        manager: Shared FinancialDataManager (created if not given)
+        batch_size: Symbols in flight (defaults to settings.BATCH_SIZE)
+        max_workers: In-flight calls per connector (defaults to settings.MAX_WORKERS)
+        indicator_book: Optional IndicatorBook for incremental technical analysis
+
+    Returns:
+        Throughput report
+    """
+    if manager is None:
+        from src.data.data_manager import FinancialDataManager
+        manager = FinancialDataManager()
+    throttle_connectors(manager, max_workers)
+
+    batch_size = max(1, batch_size or settings.BATCH_SIZE)
+    queue: asyncio.Queue = asyncio.Queue()
+    for symbol in symbols:
+        queue.put_nowait(symbol)
+
+    writer = _ResultWriter(output_path)
+    latencies: List[float] = []
+    failures = 0
+
+    async def worker():
+        nonlocal failures
+        while True:
+            try:
+                symbol = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                row = await run_analysis(manager, symbol, analysis_type, indicator_book)
+                row['status'] = 'ok'
+            except Exception as e:
+                failures += 1
+                row = {'symbol': symbol, 'analysis': analysis_type, 'status': 'error', 'error': str(e)}
+            elapsed = time.perf_counter() - started
+            latencies.append(elapsed)
+            row['latency_ms'] = round(elapsed * 1000, 3)
+            writer.write(row)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(batch_size, len(symbols)))))
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'symbols': len(symbols),
+        'succeeded': len(symbols) - failures,
+        'failed': failures,
+        'elapsed_s': round(elapsed, 3),
+        'symbols_per_sec': round(len(symbols) / elapsed, 3) if elapsed > 0 else 0.0,
+        'p50_latency_ms': round(_percentile(latencies, 50) * 1000, 3),
+        'p95_latency_ms': round(_percentile(latencies, 95) * 1000, 3),
+        'output': str(writer.path),
+    }
@@ -0,0 +1,144 @@
+"""
+Process-pool executor for CPU-bound analytics.
+
+``AnalyticsExecutor.run`` sends a job to a ``ProcessPoolExecutor`` sized from
+``settings.MAX_WORKERS`` and returns an awaitable, so indicator maths (and
+later forecasting) no longer runs on the event loop thread and stalls every
+other request on the worker.
+
+NumPy arguments travel through ``multiprocessing.shared_memory``: the
+parent copies each array into a shared block once, and the worker maps the
+same block as an array instead of unpickling a copy. Jobs should reduce
+their inputs to small results (a few values or a short tail), since the
+return value is pickled back.
+
+Jobs must be importable top-level functions, e.g.::
+
+    executor = AnalyticsExecutor()
+    sma_20, sma_50, volatility = await executor.run(indicators.latest_technicals, close)
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+# (shared memory block name, shape, dtype) describing one array argument
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+class _SharedArg:
+    """Marker for an argument passed through shared memory."""
+
+    __slots__ = ('spec',)
+
+    def __init__(self, spec: ArraySpec):
+        self.spec = spec
+
+
+def _share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, _SharedArg]:
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, _SharedArg((block.name, array.shape, array.dtype.str))
+
+
+def _run_job(func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+    """Worker side: map shared arrays, run the job, release the mappings."""
+    blocks: List[shared_memory.SharedMemory] = []
+
+    def attach(value):
+        if not isinstance(value, _SharedArg):
+            return value
+        name, shape, dtype = value.spec
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        return view
+
+    try:
+        result = func(*[attach(a) for a in args], **{k: attach(v) for k, v in kwargs.items()})
+        # Results must not reference the shared blocks after they are closed
+        if isinstance(result, np.ndarray):
+            result = np.array(result)
+        return result
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _warm_up():
+    """Import the analytics stack in a fresh worker."""
+    from src.analysis import indicators  # noqa: F401
+    return None
+
+
+class AnalyticsExecutor:
+    """
+    Awaitable process pool for CPU-heavy per-symbol work.
+
+    Args:
+        max_workers: Worker processes (settings.MAX_WORKERS if None)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.MAX_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.jobs = 0
+        self.shared_bytes = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: workers never inherit the event loop, sockets or threads of the parent
+            self._pool = ProcessPoolExecutor(self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    async def start(self) -> 'AnalyticsExecutor':
+        """Start every worker now instead of on the first job."""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, _warm_up) for _ in range(self.max_workers)))
+        return self
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run ``func(*args, **kwargs)`` in a worker process.
+
+        NumPy array arguments are passed through shared memory.
+        """
+        blocks: List[shared_memory.SharedMemory] = []
+
+        def share(value):
+            if isinstance(value, np.ndarray):
+                block, marker = _share(value)
+                blocks.append(block)
+                self.shared_bytes += value.nbytes
+                return marker
+            return value
+
+        try:
+            job_args = tuple(share(a) for a in args)
+            job_kwargs = {k: share(v) for k, v in kwargs.items()}
+            self.jobs += 1
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), _run_job, func, job_args, job_kwargs
+            )
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    async def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'workers': self.max_workers, 'jobs': self.jobs, 'shared_bytes': self.shared_bytes}
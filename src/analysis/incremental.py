@@ -0,0 +1,364 @@
+"""
+Incremental (append-only) technical indicators for live prices.
+
+``IncrementalIndicators`` keeps the running state of every indicator in
+``indicators.technical_indicators`` for one symbol: rolling windows with
+Welford mean/variance, EMA state and Wilder averages. Each new bar updates
+the state in O(1), so an intraday refresh only needs the latest bars instead
+of a full history download and recompute. Results match the vectorized
+engine on the same history.
+
+State is plain JSON and can be saved and restored, per symbol or for a whole
+``IndicatorBook``.
+"""
+
+import json
+import math
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Rolling sums accumulate rounding error; rebuild them from the buffer this often
+_RESYNC_EVERY = 1024
+
+# Exponential averages of IncrementalIndicators, in state order
+_EWMS = ('ema_12', 'ema_20', 'ema_26', 'macd_signal', 'avg_gain', 'avg_loss', 'atr_14')
+
+
+def bar_stamp(timestamp: Any) -> Optional[str]:
+    """Normalize a bar timestamp to the string stored in the state."""
+    if timestamp is None:
+        return None
+    return timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp)
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or value != value
+
+
+class RollingWindow:
+    """Fixed-size trailing window with Welford mean and variance."""
+
+    def __init__(self, size: int, values: Iterable[float] = ()):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self._pushes = 0
+        self._rebuild(values)
+
+    def _rebuild(self, values: Iterable[float]):
+        self.values.clear()
+        self.mean = 0.0
+        self.m2 = 0.0
+        for value in values:
+            self.push(value)
+
+    def push(self, value: float) -> List[Any]:
+        """Append a value; returns the token ``undo`` needs to take it back."""
+        token = [self.values[0] if len(self.values) == self.size else None, self.mean, self.m2, self._pushes]
+        if token[0] is not None:
+            self._remove(token[0])
+        self.values.append(value)
+        n = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+
+        self._pushes += 1
+        if self._pushes % _RESYNC_EVERY == 0:
+            self._rebuild(list(self.values))
+        return token
+
+    def undo(self, token: List[Any]):
+        """Take back the push that returned ``token`` (it must be the latest one)."""
+        evicted, self.mean, self.m2, self._pushes = token
+        self.values.pop()
+        if evicted is not None:
+            self.values.appendleft(evicted)
+
+    def _remove(self, value: float):
+        n = len(self.values) - 1
+        if n == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / n
+        self.m2 -= delta * (value - self.mean)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def average(self) -> float:
+        return self.mean if self.full else math.nan
+
+    def std(self, ddof: int = 1) -> float:
+        if not self.full or self.size <= ddof:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.size - ddof))
+
+
+class ExponentialAverage:
+    """Recursive exponential average (pandas ``ewm(adjust=False)`` semantics)."""
+
+    def __init__(self, alpha: float, min_periods: int = 1, value: float = math.nan, seen: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = value
+        self.seen = seen
+
+    def push(self, value: float):
+        if _is_missing(value):
+            return
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1.0 - self.alpha) * self.value
+        self.seen += 1
+
+    def current(self) -> float:
+        return self.value if self.seen >= self.min_periods else math.nan
+
+    def dump(self) -> List[Any]:
+        return [None if math.isnan(self.value) else self.value, self.seen]
+
+    def load(self, value: Optional[float], seen: int):
+        self.value = math.nan if value is None else value
+        self.seen = seen
+
+
+class IncrementalIndicators:
+    """
+    O(1)-per-bar indicator state for a single symbol.
+
+    Produces the same keys as ``indicators.technical_indicators``: SMA_20,
+    SMA_50, EMA_20, RSI_14, MACD, MACD_Signal, MACD_Hist, Bollinger Bands,
+    Volatility and, when highs and lows are supplied, ATR_14.
+    """
+
+    def __init__(self, symbol: str = ''):
+        self.symbol = symbol.upper()
+        self.bars = 0
+        self.last_close = math.nan
+        self.last_timestamp: Optional[str] = None
+        self._undo: Optional[Dict[str, Any]] = None
+
+        self.closes_20 = RollingWindow(20)
+        self.closes_50 = RollingWindow(50)
+        self.returns_20 = RollingWindow(20)
+        self.ema_12 = ExponentialAverage(2.0 / 13.0)
+        self.ema_20 = ExponentialAverage(2.0 / 21.0)
+        self.ema_26 = ExponentialAverage(2.0 / 27.0)
+        self.macd_signal = ExponentialAverage(2.0 / 10.0)
+        self.avg_gain = ExponentialAverage(1.0 / 14.0, min_periods=14)
+        self.avg_loss = ExponentialAverage(1.0 / 14.0, min_periods=14)
+        self.atr_14 = ExponentialAverage(1.0 / 14.0, min_periods=14)
+
+    @classmethod
+    def from_history(cls, symbol: str, close, high=None, low=None, timestamps=None) -> 'IncrementalIndicators':
+        """
+        Seed the state by replaying a price history.
+
+        Args:
+            symbol: Stock symbol
+            close: Close prices, oldest first
+            high: Optional high prices
+            low: Optional low prices
+            timestamps: Optional bar timestamps
+
+        Returns:
+            Indicator state positioned after the last bar
+        """
+        state = cls(symbol)
+        for i, value in enumerate(close):
+            state.update(
+                value,
+                high=None if high is None else high[i],
+                low=None if low is None else low[i],
+                timestamp=None if timestamps is None else timestamps[i],
+            )
+        return state
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None,
+               timestamp: Any = None) -> Dict[str, float]:
+        """
+        Apply one bar.
+
+        A bar whose timestamp equals the last applied bar revises that bar
+        instead of appending a new one, so a still-forming intraday bar can be
+        refreshed repeatedly.
+
+        Args:
+            close: Close (or latest) price
+            high: Optional high price, needed for ATR
+            low: Optional low price, needed for ATR
+            timestamp: Optional bar timestamp
+
+        Returns:
+            Current indicator values
+        """
+        if _is_missing(close):
+            return self.values()
+        stamp = bar_stamp(timestamp)
+        if stamp is not None and stamp == self.last_timestamp and self._undo is not None:
+            self._rollback(self._undo)
+
+        # One-step undo holds only what this bar overwrites, so the update stays O(1)
+        self._undo = {
+            'bars': self.bars,
+            'last_close': None if math.isnan(self.last_close) else self.last_close,
+            'last_timestamp': self.last_timestamp,
+            'ewm': {name: getattr(self, name).dump() for name in _EWMS},
+        }
+        close = float(close)
+        previous = self.last_close
+        self._undo['windows'] = {'closes_20': self.closes_20.push(close), 'closes_50': self.closes_50.push(close)}
+        self.ema_12.push(close)
+        self.ema_20.push(close)
+        self.ema_26.push(close)
+        self.macd_signal.push(self.ema_12.value - self.ema_26.value)
+
+        if not math.isnan(previous):
+            self._undo['windows']['returns_20'] = self.returns_20.push(close / previous - 1.0)
+            change = close - previous
+            self.avg_gain.push(max(change, 0.0))
+            self.avg_loss.push(max(-change, 0.0))
+
+        if not _is_missing(high) and not _is_missing(low):
+            true_range = float(high) - float(low)
+            if not math.isnan(previous):
+                true_range = max(true_range, abs(float(high) - previous), abs(float(low) - previous))
+            self.atr_14.push(true_range)
+
+        self.last_close = close
+        self.last_timestamp = stamp
+        self.bars += 1
+        return self.values()
+
+    def values(self) -> Dict[str, float]:
+        """Current indicator values (NaN until a window is full)."""
+        macd_line = self.ema_12.current() - self.ema_26.current()
+        signal = self.macd_signal.current()
+        middle = self.closes_20.average()
+        width = self.closes_20.std() * 2.0
+
+        gain, loss = self.avg_gain.current(), self.avg_loss.current()
+        if loss == 0 and gain > 0:
+            rsi = 100.0
+        elif math.isnan(gain) or math.isnan(loss) or loss == 0:
+            rsi = math.nan
+        else:
+            rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+
+        result = {
+            'Close': self.last_close,
+            'SMA_20': middle,
+            'SMA_50': self.closes_50.average(),
+            'EMA_20': self.ema_20.current(),
+            'RSI_14': rsi,
+            'MACD': macd_line,
+            'MACD_Signal': signal,
+            'MACD_Hist': macd_line - signal,
+            'BB_Middle': middle,
+            'BB_Upper': middle + width,
+            'BB_Lower': middle - width,
+            'Volatility': self.returns_20.std() * 100,
+        }
+        if self.atr_14.seen:
+            result['ATR_14'] = self.atr_14.current()
+        return result
+
+    def _rollback(self, undo: Dict[str, Any]):
+        """Revert the last ``update`` using the state it saved."""
+        self.bars = undo['bars']
+        self.last_close = math.nan if undo['last_close'] is None else undo['last_close']
+        self.last_timestamp = undo['last_timestamp']
+        for name, token in undo['windows'].items():
+            getattr(self, name).undo(token)
+        for name, (value, seen) in undo['ewm'].items():
+            getattr(self, name).load(value, seen)
+
+    def _dump(self) -> Dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'bars': self.bars,
+            'last_close': None if math.isnan(self.last_close) else self.last_close,
+            'last_timestamp': self.last_timestamp,
+            'closes': list(self.closes_50.values),
+            'returns': list(self.returns_20.values),
+            'ewm': {name: getattr(self, name).dump() for name in _EWMS},
+        }
+
+    def _load(self, state: Dict[str, Any]):
+        self.symbol = state['symbol']
+        self.bars = state['bars']
+        self.last_close = math.nan if state['last_close'] is None else state['last_close']
+        self.last_timestamp = state['last_timestamp']
+        closes = state['closes']
+        self.closes_20._rebuild(closes[-20:])
+        self.closes_50._rebuild(closes)
+        self.returns_20._rebuild(state['returns'])
+        for name, (value, seen) in state['ewm'].items():
+            getattr(self, name).load(value, seen)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable snapshot of the state."""
+        state = self._dump()
+        state['undo'] = self._undo
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'IncrementalIndicators':
+        """Restore a snapshot produced by ``to_dict``."""
+        indicators = cls(state['symbol'])
+        indicators._load(state)
+        undo = state.get('undo')
+        # Snapshots from before the compact undo format cannot be rolled back
+        indicators._undo = undo if undo is not None and 'windows' in undo else None
+        return indicators
+
+
+class IndicatorBook:
+    """Incremental indicator state for many symbols, with save/restore."""
+
+    def __init__(self):
+        self.states: Dict[str, IncrementalIndicators] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self.states
+
+    def get(self, symbol: str) -> Optional[IncrementalIndicators]:
+        return self.states.get(symbol.upper())
+
+    def seed(self, symbol: str, close, high=None, low=None, timestamps=None) -> IncrementalIndicators:
+        """Replace a symbol's state with one built from a full history."""
+        state = IncrementalIndicators.from_history(symbol, close, high, low, timestamps)
+        self.states[state.symbol] = state
+        return state
+
+    def update(self, symbol: str, close: float, high: Optional[float] = None,
+               low: Optional[float] = None, timestamp: Any = None) -> Dict[str, float]:
+        """Apply one bar to a symbol, creating its state if needed."""
+        key = symbol.upper()
+        if key not in self.states:
+            self.states[key] = IncrementalIndicators(key)
+        return self.states[key].update(close, high, low, timestamp)
+
+    def save(self, path: str):
+        """Write every symbol's state to a JSON file."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({symbol: state.to_dict() for symbol, state in self.states.items()}, fh)
+        tmp.replace(target)
+
+    @classmethod
+    def load(cls, path: str) -> 'IndicatorBook':
+        """Restore a book written by ``save`` (empty if the file does not exist)."""
+        book = cls()
+        if Path(path).exists():
+            with open(path, 'r', encoding='utf-8') as fh:
+                for symbol, state in json.load(fh).items():
+                    book.states[symbol] = IncrementalIndicators.from_dict(state)
+        return book
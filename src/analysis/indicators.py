@@ -0,0 +1,226 @@
+"""
+Vectorized technical indicators.
+
+Every function works along the last axis of a 1-D (dates) or 2-D
+(symbols x dates) float array and returns an array of the same shape, so a
+whole universe is computed in one pass instead of one ``.rolling()`` call per
+column. Windowed statistics use cumulative sums, so the cost does not grow
+with the window length. Incomplete windows and missing bars yield NaN, which
+matches pandas' ``rolling(window).mean()`` with the default ``min_periods``.
+
+Inputs are never modified, and float64 inputs are read without a copy; use
+``price_matrix`` to get a zero-copy (symbols x dates) view of a wide frame.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+def price_matrix(frame) -> np.ndarray:
+    """
+    View a wide price frame (dates x symbols) as a (symbols x dates) array.
+
+    For a frame holding a single float64 block this is a transposed view of
+    the frame's own memory, not a copy.
+
+    Args:
+        frame: DataFrame indexed by date with one column per symbol
+
+    Returns:
+        Read-only (symbols x dates) float64 array
+    """
+    view = frame.to_numpy(dtype=np.float64, copy=False).T.view()
+    view.flags.writeable = False
+    return view
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _window_sum(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """Turn a cumulative sum along the last axis into trailing window sums."""
+    out = np.full(cumulative.shape, np.nan)
+    if window <= cumulative.shape[-1]:
+        out[..., window - 1] = cumulative[..., window - 1]
+        out[..., window:] = cumulative[..., window:] - cumulative[..., :-window]
+    return out
+
+
+def _rolling_moments(x: np.ndarray, window: int, shift=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trailing window count, sum and sum of squares of ``x - shift``, skipping NaN."""
+    valid = ~np.isnan(x)
+    centered = np.where(valid, x - shift, 0.0)
+    count = _window_sum(np.cumsum(valid, axis=-1, dtype=np.float64), window)
+    total = _window_sum(np.cumsum(centered, axis=-1), window)
+    squares = _window_sum(np.cumsum(centered * centered, axis=-1), window)
+    return count, total, squares
+
+
+def _row_shift(x: np.ndarray) -> np.ndarray:
+    """Per-row offset used to center data before summing squares."""
+    if x.shape[-1] == 0:
+        return 0.0
+    lowest = np.min(np.where(np.isnan(x), np.inf, x), axis=-1, keepdims=True)
+    return np.where(np.isfinite(lowest), lowest, 0.0)
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int = 1) -> np.ndarray:
+    """
+    Recursive exponential average, matching pandas ``ewm(adjust=False)``.
+
+    As with pandas' default ``ignore_na=False``, the previous average keeps
+    decaying through missing values, so the first value after a gap of
+    ``k`` NaNs gets the weight ``alpha / ((1 - alpha) ** (k + 1) + alpha)``.
+    The output holds the last average through a gap.
+
+    This is a Python loop over dates; each step updates every symbol at
+    once, so a universe costs the same number of steps as one symbol.
+    """
+    out = np.empty(x.shape)
+    state = np.full(x.shape[:-1], np.nan)
+    old_weight = np.ones(x.shape[:-1])
+    seen = np.zeros(x.shape[:-1])
+    for t in range(x.shape[-1]):
+        current = x[..., t]
+        valid = ~np.isnan(current)
+        started = ~np.isnan(state)
+        old_weight = np.where(started, old_weight * (1.0 - alpha), old_weight)
+        blended = (old_weight * state + alpha * current) / (old_weight + alpha)
+        state = np.where(valid, np.where(started, blended, current), state)
+        old_weight = np.where(valid, 1.0, old_weight)
+        seen = seen + valid
+        out[..., t] = np.where(seen >= min_periods, state, np.nan)
+    return out
+
+
+def sma(values, window: int) -> np.ndarray:
+    """Simple moving average over a trailing window."""
+    x = _as_float(values)
+    count, total, _ = _rolling_moments(x, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count == window, total / window, np.nan)
+
+
+def rolling_std(values, window: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation over a trailing window."""
+    x = _as_float(values)
+    shift = _row_shift(x)
+    count, total, squares = _rolling_moments(x, window, shift)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (squares - total * total / window) / (window - ddof)
+    variance = np.maximum(variance, 0.0)
+    return np.where(count == window, np.sqrt(variance), np.nan)
+
+
+def pct_change(values) -> np.ndarray:
+    """Period-over-period fractional change; the first date is NaN."""
+    x = _as_float(values)
+    out = np.full(x.shape, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[..., 1:] = x[..., 1:] / x[..., :-1] - 1.0
+    return out
+
+
+def rolling_volatility(close, window: int = 20) -> np.ndarray:
+    """Rolling standard deviation of daily returns, in percent."""
+    return rolling_std(pct_change(close), window) * 100
+
+
+def ema(values, span: int) -> np.ndarray:
+    """Exponential moving average with ``alpha = 2 / (span + 1)``."""
+    return _ewm(_as_float(values), 2.0 / (span + 1.0))
+
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    """Relative Strength Index using Wilder's smoothing."""
+    delta = np.diff(_as_float(close), axis=-1, prepend=np.nan)
+    gains = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+    losses = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+    avg_gain = _ewm(gains, 1.0 / window, min_periods=window)
+    avg_loss = _ewm(losses, 1.0 / window, min_periods=window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = avg_gain / avg_loss
+        out = 100.0 - 100.0 / (1.0 + rs)
+    return np.where((avg_loss == 0) & (avg_gain > 0), 100.0, out)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Moving Average Convergence Divergence.
+
+    Returns:
+        Tuple of (macd line, signal line, histogram)
+    """
+    x = _as_float(close)
+    line = ema(x, fast) - ema(x, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger_bands(close, window: int = 20, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger Bands around a simple moving average.
+
+    Returns:
+        Tuple of (middle, upper, lower) bands
+    """
+    x = _as_float(close)
+    middle = sma(x, window)
+    width = rolling_std(x, window) * num_std
+    return middle, middle + width, middle - width
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    """Average True Range using Wilder's smoothing."""
+    h, l, c = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = np.full(c.shape, np.nan)
+    prev_close[..., 1:] = c[..., :-1]
+    true_range = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+    return _ewm(true_range, 1.0 / window, min_periods=window)
+
+
+def technical_indicators(close, high=None, low=None) -> Dict[str, np.ndarray]:
+    """
+    Compute the standard indicator set used by the technical analysis path.
+
+    Args:
+        close: Close prices, 1-D (dates) or 2-D (symbols x dates)
+        high: Optional high prices, required for ATR
+        low: Optional low prices, required for ATR
+
+    Returns:
+        Dictionary of indicator name to array shaped like ``close``
+    """
+    close = _as_float(close)
+    macd_line, macd_signal, macd_hist = macd(close)
+    bb_mid, bb_upper, bb_lower = bollinger_bands(close)
+    result = {
+        'SMA_20': sma(close, 20),
+        'SMA_50': sma(close, 50),
+        'EMA_20': ema(close, 20),
+        'RSI_14': rsi(close, 14),
+        'MACD': macd_line,
+        'MACD_Signal': macd_signal,
+        'MACD_Hist': macd_hist,
+        'BB_Middle': bb_mid,
+        'BB_Upper': bb_upper,
+        'BB_Lower': bb_lower,
+        'Volatility': rolling_volatility(close, 20),
+    }
+    if high is not None and low is not None:
+        result['ATR_14'] = atr(high, low, close, 14)
+    return result
+
+
+def latest_technicals(close) -> Tuple[float, float, float]:
+    """
+    Latest SMA_20, SMA_50 and 20-day volatility of a 1-D close series.
+
+    This is the technical analysis summary; it returns plain floats so it
+    can run as an AnalyticsExecutor job.
+    """
+    close = _as_float(close)
+    return (float(sma(close, 20)[-1]), float(sma(close, 50)[-1]),
+            float(rolling_volatility(close, 20)[-1]))
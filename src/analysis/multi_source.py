@@ -0,0 +1,169 @@
+"""
+Concurrent multi-source fetch with per-source timeouts and an overall deadline.
+
+``fetch_multi_source`` queries every connector that serves per-symbol data
+at the same time. Each source gets its own timeout, and when the overall
+deadline passes the sources still running are cancelled and reported as
+such, so callers always get whatever arrived in time. Per-source timing is
+included in the result.
+
+``validate_cross_source_data`` works on that payload instead of fetching
+again, so a comprehensive analysis costs one upstream round per source.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings
+
+# (data type, connector method, keyword arguments) fetched from each source
+SOURCE_REQUESTS = (
+    ('price', 'get_stock_price', {'period': '1mo'}),
+    ('info', 'get_company_info', {}),
+    ('financials', 'get_financial_statements', {}),
+)
+
+# Per-source timeout overrides in seconds (settings.SOURCE_TIMEOUT otherwise)
+SOURCE_TIMEOUTS = {
+    'alpha_vantage': 15.0,
+}
+
+# Relative spread between latest closes above which sources disagree
+PRICE_TOLERANCE = 0.02
+
+
+async def _fetch_source(connector, symbol: str):
+    """Fetch every supported data type from one source concurrently."""
+    requests = [(data_type, getattr(connector, method), kwargs)
+                for data_type, method, kwargs in SOURCE_REQUESTS if hasattr(connector, method)]
+    results = await asyncio.gather(*(call(symbol, **kwargs) for _, call, kwargs in requests),
+                                   return_exceptions=True)
+    data = {}
+    errors = {}
+    for (data_type, _, _), result in zip(requests, results):
+        if isinstance(result, Exception):
+            errors[data_type] = str(result)
+        else:
+            data[data_type] = result
+    if not data and errors:
+        raise RuntimeError('; '.join(f"{k}: {v}" for k, v in errors.items()))
+    return data, errors
+
+
+async def _timed_source(name: str, connector, symbol: str, timeout: float):
+    started = time.perf_counter()
+    timing: Dict[str, Any] = {'timeout_s': timeout}
+    try:
+        data, errors = await asyncio.wait_for(_fetch_source(connector, symbol), timeout)
+        timing['status'] = 'partial' if errors else 'ok'
+        if errors:
+            timing['errors'] = errors
+    except asyncio.TimeoutError:
+        data = {'error': f"timed out after {timeout:.1f}s"}
+        timing['status'] = 'timeout'
+    except Exception as e:
+        data = {'error': str(e)}
+        timing['status'] = 'error'
+    timing['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return data, timing
+
+
+async def fetch_multi_source(manager, symbol: str, deadline: Optional[float] = None,
+                             timeouts: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Fetch a symbol from every per-symbol source concurrently.
+
+    Args:
+        manager: FinancialDataManager whose connectors are queried
+        symbol: Stock symbol
+        deadline: Overall seconds to wait (settings.MULTI_SOURCE_DEADLINE if None)
+        timeouts: Per-source timeout overrides in seconds
+
+    Returns:
+        Dictionary with 'symbol', 'timestamp', 'sources' (data types per
+        source, or {'error': ...}) and 'timings' (status and elapsed_ms per source)
+    """
+    deadline = deadline if deadline is not None else settings.MULTI_SOURCE_DEADLINE
+    limits = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    started = time.perf_counter()
+
+    tasks = {}
+    for name, connector in manager.connectors.items():
+        if not any(hasattr(connector, method) for _, method, _ in SOURCE_REQUESTS):
+            continue
+        timeout = min(limits.get(name, settings.SOURCE_TIMEOUT), deadline)
+        tasks[asyncio.ensure_future(_timed_source(name, connector, symbol, timeout))] = name
+
+    sources: Dict[str, Any] = {}
+    timings: Dict[str, Any] = {}
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in done:
+            sources[tasks[task]], timings[tasks[task]] = task.result()
+        for task in pending:
+            task.cancel()
+            sources[tasks[task]] = {'error': f"deadline of {deadline:.1f}s exceeded"}
+            timings[tasks[task]] = {'status': 'deadline', 'elapsed_ms': round(deadline * 1000, 3)}
+
+    return {
+        'symbol': symbol.upper(),
+        'timestamp': datetime.now().isoformat(),
+        'sources': sources,
+        'timings': timings,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def _latest_close(frame) -> Optional[float]:
+    """Latest close of a price frame, whatever the source's column naming."""
+    if frame is None or getattr(frame, 'empty', True):
+        return None
+    for column in frame.columns:
+        name = str(column).lower()
+        if name.endswith('close') and 'adj' not in name:
+            try:
+                return float(frame[column].dropna().iloc[-1])
+            except (IndexError, TypeError, ValueError):
+                return None
+    return None
+
+
+def validate_cross_source_data(symbol: str, multi_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare sources using an already-fetched multi-source payload.
+
+    Args:
+        symbol: Stock symbol
+        multi_data: Result of fetch_multi_source
+
+    Returns:
+        Dictionary with 'symbol', 'timestamp' and 'validations'
+    """
+    prices = {}
+    for source, data in multi_data.get('sources', {}).items():
+        close = _latest_close(data.get('price')) if isinstance(data, dict) else None
+        if close is not None:
+            prices[source] = close
+
+    validations: Dict[str, Any] = {}
+    if len(prices) >= 2:
+        low, high = min(prices.values()), max(prices.values())
+        deviation = (high - low) / low if low else float('inf')
+        validations['price_consistency'] = {
+            'prices': prices,
+            'max_deviation_pct': round(deviation * 100, 4),
+            'is_consistent': deviation <= PRICE_TOLERANCE,
+        }
+    else:
+        validations['price_consistency'] = {
+            'prices': prices,
+            'message': 'Fewer than two sources returned prices',
+        }
+
+    return {
+        'symbol': symbol.upper(),
+        'timestamp': datetime.now().isoformat(),
+        'validations': validations,
+    }
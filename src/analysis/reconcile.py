@@ -0,0 +1,259 @@
+"""
+Bulk cross-source price reconciliation over universe matrices.
+
+``validate_cross_source_data`` compares the latest close of one symbol.
+``reconcile_universe`` compares the full daily history of every shared
+symbol across two or more sources, each packed into a ``UniverseMatrix``
+(see src.storage.universe). Sources are aligned on (symbol, session date)
+and every check runs as whole-array NumPy operations over a block of
+symbols at a time:
+
+- deviation: closes differ by more than a relative tolerance
+- missing: one source has a bar the other lacks, inside the date range
+  both sources cover for that symbol
+- stale: a source repeats its previous close while the other one moved
+- split / dividend: the ratio between the sources steps to a new level and
+  holds it, i.e. one source adjusted its history for a corporate action
+  and the other did not
+
+Flagged bars are collapsed into episodes (consecutive flagged bars of one
+symbol, source and check), so a source that was off for a month is one row
+of the anomaly report rather than twenty.
+"""
+
+import time
+from functools import reduce
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.storage.universe import UniverseMatrix
+from .multi_source import PRICE_TOLERANCE
+
+# Move of the other source above which a repeated close counts as stale
+STALE_MOVE = 0.001
+
+# Smallest log-ratio step between sources reported as a dividend mismatch
+DIVIDEND_MIN_STEP = 0.002
+
+# Steps of at least this factor are split mismatches (5-for-4 is the smallest common split)
+SPLIT_MIN_RATIO = 1.2
+
+# Bars the ratio must hold its level on each side of a step, and the drift allowed while holding
+STEP_CONFIRM_BARS = 2
+STEP_HOLD = 0.001
+
+ANOMALY_COLUMNS = ['symbol', 'source', 'check', 'start', 'end', 'bars', 'value']
+
+
+def _session_days(matrix: UniverseMatrix) -> np.ndarray:
+    """Local session date of every bar, as days since the epoch."""
+    dates = matrix.dates
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return dates.normalize().to_numpy().astype('M8[D]').astype(np.int64)
+
+
+def _aligned(matrix: UniverseMatrix, symbols: List[str], field: str,
+             positions: np.ndarray, width: int) -> np.ndarray:
+    """(symbols x shared days) float64 block of one field, NaN where there is no bar."""
+    block = np.full((len(symbols), width), np.nan)
+    block[:, positions] = matrix.field(field)[matrix.rows(symbols)]
+    return block
+
+
+def _lag(values: np.ndarray, k: int) -> np.ndarray:
+    """values[:, t - k] at column t (negative k looks ahead), NaN past the edges."""
+    out = np.full_like(values, np.nan)
+    if k > 0:
+        out[:, k:] = values[:, :-k]
+    elif k < 0:
+        out[:, :k] = values[:, -k:]
+    else:
+        out[...] = values
+    return out
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value forward along each row."""
+    index = np.where(np.isnan(values), 0, np.arange(values.shape[1]))
+    np.maximum.accumulate(index, axis=1, out=index)
+    return values[np.arange(values.shape[0])[:, None], index]
+
+
+def _coverage(valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """First and last column holding a bar in each row (first > last for empty rows)."""
+    width = valid.shape[1]
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), width)
+    last = width - 1 - valid[:, ::-1].argmax(axis=1)
+    return first, last
+
+
+def _episodes(mask: np.ndarray, metric: Optional[np.ndarray] = None):
+    """
+    Runs of consecutive flagged bars per row.
+
+    Returns:
+        rows, first column, last column, bar count and the largest metric
+        value inside each run (NaN without a metric)
+    """
+    width = mask.shape[1]
+    edges = np.diff(np.pad(mask, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, stops = np.nonzero(edges == -1)
+    worst = np.full(len(rows), np.nan)
+    if metric is not None and len(rows):
+        flat = np.append(np.where(mask, metric, -np.inf).ravel(), -np.inf)
+        bounds = np.empty(2 * len(rows), dtype=np.intp)
+        bounds[0::2] = rows * width + starts
+        bounds[1::2] = rows * width + stops
+        worst = np.maximum.reduceat(flat, bounds)[0::2]
+    return rows, starts, stops - 1, stops - starts, worst
+
+
+def _check_block(ref: np.ndarray, other: np.ndarray,
+                 tolerance: float) -> Iterator[Tuple[str, bool, np.ndarray, Optional[np.ndarray]]]:
+    """
+    Run every check on one aligned block.
+
+    Yields (check, blames_reference, mask, metric) tuples; pair checks
+    (deviation, split, dividend) are attributed to the non-reference source.
+    """
+    ref_ok = ~np.isnan(ref)
+    other_ok = ~np.isnan(other)
+    both = ref_ok & other_ok
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deviation = np.abs(other - ref) / np.abs(ref)
+        yield 'deviation', False, both & (deviation > tolerance), deviation
+
+        first_ref, last_ref = _coverage(ref_ok)
+        first_other, last_other = _coverage(other_ok)
+        columns = np.arange(ref.shape[1])
+        covered = ((columns >= np.maximum(first_ref, first_other)[:, None])
+                   & (columns <= np.minimum(last_ref, last_other)[:, None]))
+        yield 'missing', False, covered & ref_ok & ~other_ok, None
+        yield 'missing', True, covered & other_ok & ~ref_ok, None
+
+        consecutive = both & _lag(both.astype(float), 1).astype(bool)
+        ref_move = np.abs(ref / _lag(ref, 1) - 1)
+        other_move = np.abs(other / _lag(other, 1) - 1)
+        yield 'stale', False, consecutive & (other == _lag(other, 1)) & (ref_move > STALE_MOVE), ref_move
+        yield 'stale', True, consecutive & (ref == _lag(ref, 1)) & (other_move > STALE_MOVE), other_move
+
+        # Corporate actions: the log ratio steps once and holds its level on both sides
+        log_ratio = _ffill(np.log(other / ref))
+        before = _lag(log_ratio, 1)
+        step = np.abs(log_ratio - before)
+        held = both.copy()
+        for k in range(1, STEP_CONFIRM_BARS + 1):
+            held &= np.abs(_lag(log_ratio, -k) - log_ratio) <= STEP_HOLD
+            held &= np.abs(_lag(log_ratio, k + 1) - before) <= STEP_HOLD
+        factor = np.exp(step)
+        split = held & (factor >= SPLIT_MIN_RATIO)
+        yield 'split', False, split, factor
+        yield 'dividend', False, held & ~split & (step >= DIVIDEND_MIN_STEP), factor
+
+
+def reconcile_universe(sources: Mapping[str, Union[UniverseMatrix, str]],
+                       reference: Optional[str] = None,
+                       symbols: Optional[Iterable[str]] = None,
+                       field: str = 'Close',
+                       tolerance: float = PRICE_TOLERANCE,
+                       block_size: int = 256) -> Dict[str, Any]:
+    """
+    Compare every source against a reference source over full histories.
+
+    Args:
+        sources: Source name to UniverseMatrix (or its directory)
+        reference: Source the others are compared with (first source if None)
+        symbols: Symbols to compare (every reference symbol if None)
+        field: Bar field to compare
+        tolerance: Relative deviation above which closes disagree
+        block_size: Symbols processed per vectorized block (bounds memory)
+
+    Returns:
+        Dictionary with 'summary' (coverage and counts per source and check)
+        and 'anomalies', a DataFrame with one row per episode: symbol,
+        source blamed, check, first and last session date, bar count and
+        value (largest relative deviation for 'deviation', move of the
+        other source for 'stale', ratio step factor for 'split'/'dividend')
+    """
+    started = time.perf_counter()
+    matrices = {name: m if isinstance(m, UniverseMatrix) else UniverseMatrix(m)
+                for name, m in sources.items()}
+    if len(matrices) < 2:
+        raise ValueError("Reconciliation needs at least two sources")
+    reference = reference or next(iter(matrices))
+    if reference not in matrices:
+        raise ValueError(f"Unknown reference source: {reference}")
+
+    wanted = [s.upper() for s in symbols] if symbols is not None else list(matrices[reference].symbols)
+    session_days = {name: _session_days(matrix) for name, matrix in matrices.items()}
+    days = reduce(np.union1d, session_days.values())
+    positions = {name: np.searchsorted(days, values) for name, values in session_days.items()}
+    dates = days.astype('M8[D]')
+    available = {name: set(matrix.symbols) for name, matrix in matrices.items()}
+
+    parts: List[pd.DataFrame] = []
+    coverage: Dict[str, Dict[str, int]] = {}
+    for name in matrices:
+        if name == reference:
+            continue
+        shared = [s for s in wanted if s in available[reference] and s in available[name]]
+        compared = 0
+        for begin in range(0, len(shared), block_size):
+            block = shared[begin:begin + block_size]
+            ref = _aligned(matrices[reference], block, field, positions[reference], len(days))
+            other = _aligned(matrices[name], block, field, positions[name], len(days))
+            compared += int(np.count_nonzero(~np.isnan(ref) & ~np.isnan(other)))
+            labels = np.asarray(block, dtype=object)
+            for check, blames_reference, mask, metric in _check_block(ref, other, tolerance):
+                rows, first, last, bars, worst = _episodes(mask, metric)
+                if len(rows):
+                    parts.append(pd.DataFrame({
+                        'symbol': labels[rows],
+                        'source': reference if blames_reference else name,
+                        'check': check,
+                        'start': dates[first],
+                        'end': dates[last],
+                        'bars': bars,
+                        'value': worst,
+                    }))
+        coverage[name] = {
+            'symbols': len(shared),
+            'missing_symbols': sum(1 for s in wanted if s not in available[name]),
+            'bars_compared': compared,
+        }
+
+    if parts:
+        anomalies = pd.concat(parts, ignore_index=True).sort_values(['symbol', 'start', 'check'],
+                                                                    ignore_index=True)
+    else:
+        anomalies = pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    summary = {
+        'reference': reference,
+        'field': field,
+        'symbols': len(wanted),
+        'sessions': len(days),
+        'sources': coverage,
+        'episodes': anomalies.groupby('check').size().to_dict() if len(anomalies) else {},
+        'flagged_bars': anomalies.groupby('check')['bars'].sum().astype(int).to_dict() if len(anomalies) else {},
+        'symbols_flagged': int(anomalies['symbol'].nunique()),
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+    return {'summary': summary, 'anomalies': anomalies}
+
+
+def write_anomalies(anomalies: pd.DataFrame, output_path: str):
+    """Write an anomaly report as JSON Lines, or Parquet for a '.parquet' path."""
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == '.parquet':
+        anomalies.to_parquet(path, index=False)
+        return
+    rows = anomalies.assign(start=anomalies['start'].astype(str), end=anomalies['end'].astype(str))
+    rows.to_json(path, orient='records', lines=True)
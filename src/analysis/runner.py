@@ -0,0 +1,114 @@
+"""
+Single-symbol analysis shared by the CLI and the batch scan mode.
+"""
+
+from typing import Any, Dict
+
+from . import indicators
+from .incremental import bar_stamp
+from .multi_source import fetch_multi_source, validate_cross_source_data
+
+
+def _to_float(value: Any):
+    """Convert numpy/pandas scalars to plain floats, keeping NaN as None."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+
+async def run_analysis(manager, symbol: str, analysis_type: str = 'comprehensive',
+                       indicator_book=None) -> Dict[str, Any]:
+    """
+    Run one analysis for a symbol and return the results as a flat dictionary.
+
+    Args:
+        manager: FinancialDataManager used to fetch the data
+        symbol: Stock symbol to analyze
+        analysis_type: Type of analysis ('basic', 'comprehensive', 'technical')
+        indicator_book: Optional IndicatorBook; technical analysis then rolls the
+            saved per-symbol state forward from the latest bars instead of
+            recomputing six months of history
+
+    Returns:
+        Dictionary of JSON-serializable analysis results
+    """
+    result: Dict[str, Any] = {'symbol': symbol.upper(), 'analysis': analysis_type}
+
+    if analysis_type == 'basic':
+        # Basic price and info analysis
+        price_data = await manager.get_stock_data(symbol, 'price', period='1mo')
+        company_info = await manager.get_stock_data(symbol, 'info')
+
+        result['current_price'] = _to_float(price_data.iloc[-1]['Close'])
+        result['company'] = company_info.get('longName', 'N/A')
+        result['market_cap'] = company_info.get('marketCap', 0)
+
+    elif analysis_type == 'comprehensive':
+        # Comprehensive multi-source analysis, all sources fetched concurrently
+        multi_data = await fetch_multi_source(manager, symbol)
+        result['sources'] = list(multi_data['sources'].keys())
+        result['source_timings'] = multi_data['timings']
+
+        # Validate cross-source data on the payload fetched above
+        validation = validate_cross_source_data(symbol, multi_data)
+        result['price_consistency'] = None
+        if 'price_consistency' in validation['validations']:
+            price_check = validation['validations']['price_consistency']
+            if 'is_consistent' in price_check:
+                result['price_consistency'] = bool(price_check['is_consistent'])
+
+    elif analysis_type == 'technical':
+        # Technical analysis
+        state = indicator_book.get(symbol) if indicator_book is not None else None
+        recent = None
+        if state is not None and state.last_timestamp is not None:
+            # A saved state only needs the bars since its last update
+            recent = await manager.get_stock_data(symbol, 'price', period='5d')
+            if recent.empty or bar_stamp(recent.index[0]) > state.last_timestamp:
+                recent = None  # gap since the last update, rebuild from history
+
+        if recent is not None:
+            for timestamp, bar in recent.iterrows():
+                if bar_stamp(timestamp) >= state.last_timestamp:
+                    state.update(bar['Close'], bar.get('High'), bar.get('Low'), timestamp)
+            latest = state.values()
+            current_price, sma_20, sma_50 = latest['Close'], latest['SMA_20'], latest['SMA_50']
+            volatility = latest['Volatility']
+            as_of = recent.index[-1]
+        else:
+            price_data = await manager.get_stock_data(symbol, 'price', period='6mo')
+
+            # Calculate basic technical indicators straight from the Close column,
+            # in a worker process when the manager has an analytics executor
+            close = price_data['Close'].to_numpy(dtype=float, copy=False)
+            current_price = close[-1]
+            executor = getattr(manager, 'analytics_executor', None)
+            if executor is not None:
+                sma_20, sma_50, volatility = await executor.run(indicators.latest_technicals, close)
+            else:
+                sma_20, sma_50, volatility = indicators.latest_technicals(close)
+            as_of = price_data.index[-1]
+
+            if indicator_book is not None:
+                high = price_data['High'].to_numpy(dtype=float) if 'High' in price_data else None
+                low = price_data['Low'].to_numpy(dtype=float) if 'Low' in price_data else None
+                indicator_book.seed(symbol, close, high, low, list(price_data.index))
+
+        result['current_price'] = _to_float(current_price)
+        result['sma_20'] = _to_float(sma_20)
+        result['sma_50'] = _to_float(sma_50)
+        result['volatility'] = _to_float(volatility)
+        result['trend'] = 'bullish' if sma_20 > sma_50 else 'bearish'
+
+        # Keep the computed indicators when a time-series sink is attached
+        sink = getattr(manager, 'influx_sink', None)
+        if sink is not None:
+            sink.write_indicators(symbol, {'Close': current_price, 'SMA_20': sma_20,
+                                           'SMA_50': sma_50, 'Volatility': volatility}, as_of)
+
+    else:
+        raise ValueError(f"Unknown analysis type: {analysis_type}")
+
+    return result
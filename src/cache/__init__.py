@@ -0,0 +1,28 @@
+"""
+Caching for connector data: in-process LRU, Redis and local disk tiers,
+plus background warming of the hottest keys.
+
+Exports are imported on first use, so importing the package stays cheap.
+"""
+
+from src.registry import lazy_exports
+
+__all__ = [
+    'LRUCache',
+    'MISSING',
+    'TieredCache',
+    'CachedConnector',
+    'install_cache',
+    'AccessTracker',
+    'CacheWarmer',
+]
+
+__getattr__ = lazy_exports(__name__, {
+    'LRUCache': '.lru',
+    'MISSING': '.lru',
+    'TieredCache': '.tiered',
+    'CachedConnector': '.connector',
+    'install_cache': '.connector',
+    'AccessTracker': '.warmer',
+    'CacheWarmer': '.warmer',
+})
@@ -0,0 +1,152 @@
+"""
+Compact binary encoding for cached values.
+
+DataFrames are stored column by column as raw NumPy buffers behind a small
+JSON header, so decoding is a handful of ``np.frombuffer`` calls rather than
+unpickling arbitrary objects. Everything else (company info dictionaries,
+lists, scalars) is stored as JSON. Large payloads are zlib-compressed.
+
+Values JSON cannot hold as-is (a Series inside an info dictionary,
+timestamps in an object column, ...) raise CodecError rather than being
+stored as strings.
+
+Layout::
+
+    b'FRC1' | kind (1 byte) | flags (1 byte) | body
+
+where the frame body is ``header length (4 bytes) | JSON header | buffers``.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+MAGIC = b'FRC1'
+KIND_FRAME = b'D'
+KIND_JSON = b'J'
+FLAG_ZLIB = 1
+COMPRESS_ABOVE = 16 * 1024
+
+
+class CodecError(ValueError):
+    """Raised when a value cannot be encoded or a blob cannot be decoded."""
+
+
+def _json_dumps(value: Any) -> bytes:
+    # No fallback for other types (and no datetimes or non-string keys, which
+    # orjson would turn into strings): values that would not decode to what
+    # was cached fail instead, so they stay in the memory tier
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(value).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _encode_array(values, buffers: List[bytes]) -> Dict[str, Any]:
+    """Describe one column or index and append its raw buffer."""
+    dtype = getattr(values, 'dtype', None)
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        buffers.append(pd.DatetimeIndex(values).asi8.tobytes())
+        return {'kind': 'tz', 'tz': str(dtype.tz), 'unit': dtype.unit}
+    array = np.asarray(values)
+    if array.dtype.kind in 'biufcmM':
+        buffers.append(np.ascontiguousarray(array).tobytes())
+        return {'kind': 'raw', 'dtype': array.dtype.str}
+    buffers.append(_json_dumps(array.tolist()))
+    return {'kind': 'json'}
+
+
+def _decode_array(spec: Dict[str, Any], buffer: bytes):
+    if spec['kind'] == 'raw':
+        return np.frombuffer(buffer, dtype=np.dtype(spec['dtype']))
+    if spec['kind'] == 'tz':
+        utc = np.frombuffer(buffer, dtype='<i8').view(f"M8[{spec.get('unit', 'ns')}]")
+        return pd.DatetimeIndex(utc).tz_localize('UTC').tz_convert(spec['tz'])
+    return np.array(_json_loads(buffer), dtype=object)
+
+
+def _encode_frame(frame: pd.DataFrame) -> bytes:
+    if isinstance(frame.index, pd.MultiIndex) or isinstance(frame.columns, pd.MultiIndex):
+        raise CodecError("MultiIndex frames are not supported")
+    buffers: List[bytes] = []
+    header = {
+        'index': _encode_array(frame.index, buffers),
+        'index_name': frame.index.name,
+        'labels': _encode_array(frame.columns, buffers),
+        'columns': [_encode_array(frame.iloc[:, i], buffers) for i in range(frame.shape[1])],
+    }
+    header['sizes'] = [len(buffer) for buffer in buffers]
+    raw_header = _json_dumps(header)
+    return struct.pack('<I', len(raw_header)) + raw_header + b''.join(buffers)
+
+
+def _decode_frame(body: bytes) -> pd.DataFrame:
+    (header_size,) = struct.unpack_from('<I', body)
+    header = _json_loads(body[4:4 + header_size])
+    offset = 4 + header_size
+    buffers: List[bytes] = []
+    for size in header['sizes']:
+        buffers.append(body[offset:offset + size])
+        offset += size
+
+    index = pd.Index(_decode_array(header['index'], buffers[0]), name=header['index_name'])
+    labels = list(_decode_array(header['labels'], buffers[1]))
+    columns = [_decode_array(spec, buffer) for spec, buffer in zip(header['columns'], buffers[2:])]
+    frame = pd.DataFrame(dict(enumerate(columns)), index=index)
+    frame.columns = pd.Index(labels)
+    return frame
+
+
+def encode(value: Any) -> bytes:
+    """
+    Encode a cacheable value.
+
+    Raises:
+        CodecError: If the value cannot be represented
+    """
+    try:
+        if isinstance(value, pd.DataFrame):
+            kind, body = KIND_FRAME, _encode_frame(value)
+        else:
+            kind, body = KIND_JSON, _json_dumps(value)
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(f"Cannot encode {type(value).__name__}: {e}") from e
+
+    flags = 0
+    if len(body) > COMPRESS_ABOVE:
+        body = zlib.compress(body, 1)
+        flags |= FLAG_ZLIB
+    return MAGIC + kind + bytes([flags]) + body
+
+
+def decode(blob: bytes) -> Any:
+    """
+    Decode a value produced by ``encode``.
+
+    Raises:
+        CodecError: If the blob is not in the expected format
+    """
+    if blob[:4] != MAGIC:
+        raise CodecError("Unknown cache blob format")
+    kind, flags, body = blob[4:5], blob[5], blob[6:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    if kind == KIND_FRAME:
+        return _decode_frame(body)
+    if kind == KIND_JSON:
+        return _json_loads(body)
+    raise CodecError(f"Unknown cache blob kind {kind!r}")
@@ -0,0 +1,119 @@
+"""
+Caching layer for data connectors.
+
+``install_cache`` wraps every connector of a FinancialDataManager so the
+data methods below are served from a TieredCache. Both the API (which calls
+``data_manager.connectors[...]`` directly) and the manager's own methods
+go through the wrapped connectors.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.connector_proxy import ConnectorProxy, wrap_connectors
+from .lru import MISSING
+from .tiered import TieredCache
+
+# Connector method -> data type used for the TTL policy
+METHOD_DATA_TYPES = {
+    'get_stock_price': 'price',
+    'get_company_info': 'info',
+    'get_financial_statements': 'financials',
+    'get_technical_indicators': 'technical',
+    '_fetch_observations': 'economic',
+    'get_economic_indicators': 'economic',
+}
+
+
+def cache_key(connector: str, method: str, args: Tuple, kwargs: Dict[str, Any]) -> str:
+    """Stable key for a connector call; the leading symbol/series is case-folded."""
+    parts = [connector, method]
+    for position, arg in enumerate(args):
+        parts.append(arg.upper() if position == 0 and isinstance(arg, str) else repr(arg))
+    parts.extend(f"{name}={kwargs[name]!r}" for name in sorted(kwargs))
+    return ':'.join(parts)
+
+
+def is_closed_range(kwargs: Dict[str, Any]) -> bool:
+    """Whether a price request ends before today, i.e. its bars can no longer change."""
+    end = kwargs.get('end')
+    if end is None:
+        return False
+    try:
+        end_date = end if isinstance(end, date) else datetime.fromisoformat(str(end)[:10])
+        if isinstance(end_date, datetime):
+            end_date = end_date.date()
+    except ValueError:
+        return False
+    return end_date < date.today()
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or bool(getattr(value, 'empty', False))
+
+
+class CachedConnector(ConnectorProxy):
+    """
+    Connector wrapper serving data methods from a TieredCache.
+
+    With an AccessTracker, every expiring call is reported to it (and
+    whether the cache answered), so a CacheWarmer can refresh hot entries
+    through ``refresh`` before they expire.
+    """
+
+    def __init__(self, name: str, connector: Any, cache: TieredCache,
+                 tracker: Optional['AccessTracker'] = None):
+        super().__init__(connector)
+        self._name = name
+        self._cache = cache
+        self._tracker = tracker
+
+    async def _call(self, name, method, args, kwargs):
+        data_type = METHOD_DATA_TYPES.get(name)
+        if data_type is None:
+            return await method(*args, **kwargs)
+
+        key = cache_key(self._name, name, args, kwargs)
+        persistent = data_type == 'price' and is_closed_range(kwargs)
+        value = await self._cache.get(key, persistent)
+        if self._tracker is not None and not persistent:
+            self._tracker.record(self._name, name, args, kwargs, hit=value is not MISSING)
+        if value is not MISSING:
+            return value
+        return await self._fetch(key, data_type, persistent, method, args, kwargs)
+
+    async def _fetch(self, key, data_type, persistent, method, args, kwargs):
+        async def fetch():
+            result = await method(*args, **kwargs)
+            if not _is_empty(result):
+                await self._cache.set(key, result, self._cache.ttl_for(data_type), persistent)
+            return result
+
+        # Concurrent misses for the same key share one upstream call
+        return await self._cache.flights.do(key, fetch)
+
+    async def refresh(self, name: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        """Fetch a data method from beneath the cache and store the result, skipping the lookup."""
+        data_type = METHOD_DATA_TYPES[name]
+        key = cache_key(self._name, name, args, kwargs)
+        persistent = data_type == 'price' and is_closed_range(kwargs)
+        return await self._fetch(key, data_type, persistent, getattr(self._connector, name), args, kwargs)
+
+
+def install_cache(manager, cache: Optional[TieredCache] = None,
+                  tracker: Optional['AccessTracker'] = None) -> TieredCache:
+    """
+    Put a TieredCache in front of every connector of a manager.
+
+    Args:
+        manager: FinancialDataManager to wrap
+        cache: Cache to use (a new TieredCache if not given)
+        tracker: AccessTracker to report calls to, for cache warming (optional)
+
+    Returns:
+        The cache, for stats and shutdown
+    """
+    cache = cache or TieredCache()
+    wrap_connectors(manager, lambda name, connector: CachedConnector(name, connector, cache, tracker),
+                    CachedConnector)
+    return cache
@@ -0,0 +1,83 @@
+"""
+Bounded in-process LRU cache with per-entry TTL.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Least-recently-used cache holding live Python objects.
+
+    Entries expire after their own TTL; once ``max_entries`` is reached the
+    least recently used entry is evicted. Values are returned as-is, so
+    cached DataFrames must be treated as read-only by callers.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a live entry exists; unlike ``get`` this touches neither recency nor counters."""
+        entry = self._entries.get(key)
+        return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or MISSING."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value; ``ttl`` of None keeps it until evicted."""
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """Seconds until an entry expires (None if absent or without TTL)."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is None:
+            return None
+        return entry[0] - time.monotonic()
+
+    def delete(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
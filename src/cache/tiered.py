@@ -0,0 +1,242 @@
+"""
+Three-tier cache: in-process LRU, shared Redis, and a local disk store.
+
+Lookups go memory -> Redis -> disk. Redis and disk hold the compact binary
+form from ``codec``; the memory tier holds decoded objects so repeat lookups
+cost a dictionary access. The disk tier is reserved for historical data that
+never changes (e.g. price bars for a closed date range) and has no TTL.
+
+Redis is optional: if the client is not installed or the server is down the
+tier is skipped and retried later, so the cache degrades to memory + disk.
+"""
+
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from src.config.settings import settings, REDIS_URL
+from src.utils import SingleFlight
+from . import codec
+from .lru import LRUCache, MISSING
+
+# Seconds per data type, from the per-source cache policy
+DEFAULT_TTLS = {
+    'price': 1800,
+    'info': 3600,
+    'financials': 86400,
+    'technical': 3600,
+    'economic': 3600,
+    'filings': 86400,
+}
+
+# How long to leave Redis alone after a connection failure
+REDIS_RETRY_AFTER = 30.0
+
+
+class RedisTier:
+    """Shared cache tier on Redis, disabled temporarily on errors."""
+
+    def __init__(self, url: str, prefix: str = 'fri:cache:'):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+        self._disabled_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as aioredis
+            self._client = aioredis.from_url(self.url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return self._client
+
+    def _fail(self, e: Exception):
+        self.errors += 1
+        self._disabled_until = time.monotonic() + REDIS_RETRY_AFTER
+        logger.warning(f"Redis cache tier unavailable, retrying in {REDIS_RETRY_AFTER:.0f}s: {e}")
+
+    async def get(self, key: str):
+        """Return (blob, seconds to expiry) or (None, None)."""
+        if not self._available():
+            return None, None
+        try:
+            async with self._get_client().pipeline(transaction=False) as pipe:
+                blob, pttl = await pipe.get(self.prefix + key).pttl(self.prefix + key).execute()
+        except Exception as e:
+            self._fail(e)
+            return None, None
+        if blob is None:
+            self.misses += 1
+            return None, None
+        self.hits += 1
+        return blob, (pttl / 1000.0 if pttl and pttl > 0 else None)
+
+    async def set(self, key: str, blob: bytes, ttl: Optional[float]):
+        if not self._available():
+            return
+        try:
+            await self._get_client().set(self.prefix + key, blob, ex=int(ttl) if ttl else None)
+        except Exception as e:
+            self._fail(e)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {'enabled': self._available(), 'hits': self.hits, 'misses': self.misses, 'errors': self.errors}
+
+
+class DiskTier:
+    """Local store for immutable entries, one binary file per key."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.bin"
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: Path, blob: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(blob)
+        tmp.replace(path)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        blob = await asyncio.to_thread(self._read, self._path(key))
+        if blob is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return blob
+
+    async def set(self, key: str, blob: bytes):
+        await asyncio.to_thread(self._write, self._path(key), blob)
+        self.writes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {'directory': str(self.directory), 'hits': self.hits, 'misses': self.misses, 'writes': self.writes}
+
+
+class TieredCache:
+    """
+    Memory -> Redis -> disk cache with per-data-type TTLs.
+
+    Args:
+        max_entries: Capacity of the in-process LRU tier
+        redis_url: Redis URL for the shared tier (None disables it)
+        cache_dir: Directory for the immutable on-disk tier (None disables it)
+        ttls: Overrides for the per-data-type TTLs in seconds
+    """
+
+    def __init__(self, max_entries: Optional[int] = None,
+                 redis_url: Optional[str] = REDIS_URL if settings.CACHE_REDIS_ENABLED else None,
+                 cache_dir: Optional[str] = settings.CACHE_DIR,
+                 ttls: Optional[Dict[str, int]] = None):
+        self.memory = LRUCache(max_entries or settings.CACHE_MAX_ENTRIES)
+        self.redis = RedisTier(redis_url) if redis_url else None
+        self.disk = DiskTier(cache_dir) if cache_dir else None
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.flights = SingleFlight()
+        self.encode_errors = 0
+
+    def ttl_for(self, data_type: str) -> int:
+        return self.ttls.get(data_type, settings.CACHE_TTL)
+
+    async def get(self, key: str, persistent: bool = False) -> Any:
+        """
+        Look a key up through the tiers, promoting hits to the faster ones.
+
+        Args:
+            key: Cache key
+            persistent: Whether the entry may live in the disk tier
+
+        Returns:
+            The cached value, or MISSING
+        """
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+
+        if self.redis is not None:
+            blob, remaining = await self.redis.get(key)
+            if blob is not None:
+                value = codec.decode(blob)
+                self.memory.set(key, value, remaining)
+                return value
+
+        if persistent and self.disk is not None:
+            blob = await self.disk.get(key)
+            if blob is not None:
+                value = codec.decode(blob)
+                self.memory.set(key, value)
+                return value
+
+        return MISSING
+
+    async def promote(self, key: str) -> bool:
+        """Copy a key from Redis into the memory tier (with its remaining TTL); False if Redis lacks it."""
+        if self.redis is None:
+            return False
+        blob, remaining = await self.redis.get(key)
+        if blob is None:
+            return False
+        self.memory.set(key, codec.decode(blob), remaining)
+        return True
+
+    async def set(self, key: str, value: Any, ttl: Optional[float], persistent: bool = False):
+        """
+        Store a value in every applicable tier.
+
+        Args:
+            key: Cache key
+            value: Value to cache (DataFrame, dict, list or scalar)
+            ttl: Seconds to keep the entry (ignored for persistent entries)
+            persistent: Store in the disk tier without expiry
+        """
+        self.memory.set(key, value, None if persistent else ttl)
+        if self.redis is None and (not persistent or self.disk is None):
+            return
+        try:
+            blob = codec.encode(value)
+        except codec.CodecError as e:
+            self.encode_errors += 1
+            logger.debug(f"Not caching {key} outside memory: {e}")
+            return
+        if self.redis is not None:
+            await self.redis.set(key, blob, None if persistent else ttl)
+        if persistent and self.disk is not None:
+            await self.disk.set(key, blob)
+
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for every tier."""
+        return {
+            'memory': self.memory.stats(),
+            'redis': self.redis.stats() if self.redis is not None else {'enabled': False},
+            'disk': self.disk.stats() if self.disk is not None else {'enabled': False},
+            'coalesced': self.flights.coalesced,
+            'encode_errors': self.encode_errors,
+        }
@@ -0,0 +1,361 @@
+"""
+Background warming of the connector cache.
+
+``AccessTracker`` counts how often each expiring cache key is requested,
+as a score that halves every ``WARM_HALF_LIFE`` seconds, and persists the
+scores to ``WARM_STATE_FILE`` so a restarted process knows what was hot.
+``CacheWarmer`` refreshes the hottest keys shortly before they expire, so
+popular symbols are served from the cache instead of waiting on a miss.
+
+Refreshes go through the layers beneath the cache (price store, rate
+limiter, ...) and only spend ``WARM_BUDGET`` of each connector's rate
+limit; keys that do not fit in a cycle's budget are deferred to the next.
+
+Example::
+
+    tracker = AccessTracker()
+    cache = install_cache(manager, tracker=tracker)
+    warmer = await CacheWarmer(manager, cache, tracker, limiter).start()
+    ...
+    await warmer.close()
+    await tracker.save()
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.utils.connector_proxy import find_proxy
+from src.utils.fanout import fan_out
+from .connector import METHOD_DATA_TYPES, CachedConnector, cache_key
+from .tiered import TieredCache
+
+# Argument types that survive the round trip through the state file
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def _plain(args: Tuple, kwargs: Dict[str, Any]) -> bool:
+    return all(isinstance(v, _PLAIN_TYPES) for v in (*args, *kwargs.values()))
+
+
+class AccessTracker:
+    """
+    Decaying request counts per cache key.
+
+    Args:
+        path: JSON file the scores are loaded from and saved to (None keeps
+            them in memory only)
+        half_life: Seconds for a score to halve (settings.WARM_HALF_LIFE if None)
+        max_entries: Keys kept, lowest scores dropped first
+            (settings.WARM_TRACK_MAX if None)
+    """
+
+    def __init__(self, path: Optional[str] = settings.WARM_STATE_FILE, half_life: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.path = Path(path) if path else None
+        self.half_life = half_life or settings.WARM_HALF_LIFE
+        self.max_entries = max(1, max_entries or settings.WARM_TRACK_MAX)
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self.served_warm = 0
+        if self.path is not None:
+            self._calls = self._read()
+
+    def _decayed(self, entry: Dict[str, Any], now: float) -> float:
+        return entry['score'] * math.pow(0.5, max(0.0, now - entry['updated']) / self.half_life)
+
+    def _entry(self, connector: str, method: str, args: Tuple, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if method not in METHOD_DATA_TYPES or not _plain(args, kwargs):
+            return None
+        key = cache_key(connector, method, args, kwargs)
+        entry = self._calls.get(key)
+        if entry is None:
+            entry = self._calls[key] = {'connector': connector, 'method': method, 'args': list(args),
+                                        'kwargs': dict(kwargs), 'score': 0.0, 'updated': time.time()}
+            if len(self._calls) > self.max_entries * 1.25:
+                self.prune()
+        return entry
+
+    def record(self, connector: str, method: str, args: Tuple, kwargs: Dict[str, Any], hit: bool = False):
+        """Count one request for a connector call; ``hit`` is whether the cache answered it."""
+        self.requests += 1
+        if hit:
+            self.served_warm += 1
+        entry = self._entry(connector, method, args, kwargs)
+        if entry is None:
+            return
+        now = time.time()
+        entry['score'] = self._decayed(entry, now) + 1.0
+        entry['updated'] = now
+
+    def seed(self, connector: str, method: str, args: Tuple, kwargs: Optional[Dict[str, Any]] = None):
+        """
+        Mark a call as hot without counting a request.
+
+        The score is raised to one above settings.WARM_MIN_SCORE, which keeps
+        an otherwise unrequested call hot for a little over half a half-life.
+        """
+        entry = self._entry(connector, method, args, kwargs or {})
+        if entry is None:
+            return
+        now = time.time()
+        entry['score'] = max(self._decayed(entry, now), settings.WARM_MIN_SCORE + 1.0)
+        entry['updated'] = now
+
+    def hottest(self, limit: Optional[int] = None,
+                min_score: Optional[float] = None) -> List[Tuple[str, Dict[str, Any], float]]:
+        """
+        The most requested calls, hottest first.
+
+        Args:
+            limit: Calls to return (settings.WARM_TOP_N if None)
+            min_score: Lowest decayed score to include (settings.WARM_MIN_SCORE if None)
+
+        Returns:
+            List of (cache key, call, decayed score)
+        """
+        now = time.time()
+        floor = settings.WARM_MIN_SCORE if min_score is None else min_score
+        scored = [(key, entry, self._decayed(entry, now)) for key, entry in self._calls.items()]
+        scored = [item for item in scored if item[2] >= floor]
+        scored.sort(key=lambda item: item[2], reverse=True)
+        return scored[:limit or settings.WARM_TOP_N]
+
+    def prune(self):
+        """Drop the coldest keys beyond ``max_entries``."""
+        if len(self._calls) <= self.max_entries:
+            return
+        now = time.time()
+        ranked = sorted(self._calls, key=lambda key: self._decayed(self._calls[key], now), reverse=True)
+        for key in ranked[self.max_entries:]:
+            del self._calls[key]
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache warming state {self.path}: {e}")
+            return {}
+        return data.get('calls', {}) if isinstance(data, dict) else {}
+
+    def _write(self, calls: Dict[str, Dict[str, Any]]):
+        # Other processes sharing the file keep their keys: merge by the higher score
+        now = time.time()
+        merged = self._read()
+        for key, entry in calls.items():
+            current = merged.get(key)
+            if current is None or self._decayed(entry, now) >= self._decayed(current, now):
+                merged[key] = entry
+        ranked = sorted(merged, key=lambda key: self._decayed(merged[key], now), reverse=True)
+        merged = {key: merged[key] for key in ranked[:self.max_entries]}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'saved_at': now, 'half_life': self.half_life, 'calls': merged}),
+                       encoding='utf-8')
+        tmp.replace(self.path)
+
+    async def save(self):
+        """Write the scores to the state file (no-op without one)."""
+        if self.path is None:
+            return
+        snapshot = {key: dict(entry) for key, entry in self._calls.items()}
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except OSError as e:
+            logger.warning(f"Could not save cache warming state to {self.path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'tracked': len(self._calls),
+            'requests': self.requests,
+            'served_warm': self.served_warm,
+            'hit_ratio': self.served_warm / self.requests if self.requests else 0.0,
+        }
+
+
+class CacheWarmer:
+    """
+    Periodically refresh the hottest cache keys before they expire.
+
+    A key is refreshed once its remaining TTL drops under the lead time:
+    ``WARM_LEAD_FRACTION`` of its TTL, but at least 1.5 warming intervals
+    (so no key expires between two cycles) and at most half the TTL.
+
+    Args:
+        manager: FinancialDataManager whose connectors carry a CachedConnector
+        cache: The connectors' TieredCache
+        tracker: AccessTracker fed by the CachedConnectors
+        limiter: TokenBucketLimiter whose rates bound the refreshes (optional)
+        interval: Seconds between cycles (settings.WARM_INTERVAL if None)
+    """
+
+    def __init__(self, manager, cache: TieredCache, tracker: AccessTracker,
+                 limiter: Optional['TokenBucketLimiter'] = None, interval: Optional[float] = None):
+        self.manager = manager
+        self.cache = cache
+        self.tracker = tracker
+        self.limiter = limiter
+        self.interval = interval or settings.WARM_INTERVAL
+        self.cycles = 0
+        self.refreshed = 0
+        self.promoted = 0
+        self.deferred = 0
+        self.failed = 0
+        self.last: Dict[str, Any] = {}
+        self._credits: Dict[str, float] = {}
+        self._last_cycle: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> 'CacheWarmer':
+        """Run warming cycles in the background, the first one right away."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache warming cycle failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _lead(self, ttl: float) -> float:
+        return min(ttl / 2, max(self.interval * 1.5, ttl * settings.WARM_LEAD_FRACTION))
+
+    def _accrue(self) -> Dict[str, float]:
+        """Top up each limited connector's refresh credit for the time since the last cycle."""
+        now = time.monotonic()
+        elapsed = self.interval if self._last_cycle is None else now - self._last_cycle
+        self._last_cycle = now
+        if self.limiter is None:
+            return {}
+        for name in self.manager.connectors:
+            limit = self.limiter.rate(name)
+            if limit is None:
+                continue
+            per_second = limit[0] * settings.WARM_BUDGET
+            cap = max(1.0, per_second * self.interval)
+            self._credits[name] = min(cap, self._credits.get(name, cap) + per_second * elapsed)
+        return self._credits
+
+    async def run_cycle(self, budget: bool = True) -> Dict[str, Any]:
+        """
+        Refresh the hot keys that are missing or about to expire.
+
+        Args:
+            budget: Hold refreshes to settings.WARM_BUDGET of each connector's
+                rate limit (False refreshes every due key, as ``--warm`` does)
+
+        Returns:
+            Cycle report: hot, fresh, promoted, refreshed, deferred, failed,
+            elapsed_s and the coverage afterwards
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            credits = self._accrue()
+            hot = self.tracker.hottest()
+            report = {'hot': len(hot), 'fresh': 0, 'promoted': 0, 'refreshed': 0, 'deferred': 0, 'failed': 0}
+            due: Dict[str, Tuple[CachedConnector, Dict[str, Any]]] = {}
+            for key, call, _ in hot:
+                proxy = find_proxy(self.manager.connectors.get(call['connector']), CachedConnector)
+                if proxy is None:
+                    continue
+                if key not in self.cache.memory and await self.cache.promote(key):
+                    report['promoted'] += 1
+                if key in self.cache.memory:
+                    remaining = self.cache.memory.expires_in(key)
+                    ttl = self.cache.ttl_for(METHOD_DATA_TYPES[call['method']])
+                    if remaining is None or remaining > self._lead(ttl):
+                        report['fresh'] += 1
+                        continue
+                name = call['connector']
+                if budget and name in credits:
+                    if credits[name] < 1:
+                        report['deferred'] += 1
+                        continue
+                    credits[name] -= 1
+                due[key] = (proxy, call)
+
+            async def refresh(key: str):
+                proxy, call = due[key]
+                return await proxy.refresh(call['method'], tuple(call['args']), call['kwargs'])
+
+            async for result in fan_out(list(due), refresh, settings.WARM_CONCURRENCY):
+                if result.error is not None:
+                    report['failed'] += 1
+                    logger.debug(f"Could not warm {result.key}: {result.error}")
+                else:
+                    report['refreshed'] += 1
+
+            self.cycles += 1
+            for counter in ('promoted', 'refreshed', 'deferred', 'failed'):
+                setattr(self, counter, getattr(self, counter) + report[counter])
+            report['elapsed_s'] = round(time.perf_counter() - started, 3)
+            report['coverage'] = self.coverage()
+            self.last = report
+        await self.tracker.save()
+        return report
+
+    def coverage(self) -> Dict[str, Any]:
+        """
+        Share of the hot keys currently held in memory.
+
+        Returns:
+            Dictionary with 'hot', 'cached', 'ratio', 'weighted' (by score)
+            and 'by_type' ({data type: {'hot', 'cached'}})
+        """
+        hot = self.tracker.hottest()
+        total_score = cached_score = 0.0
+        by_type: Dict[str, Counter] = {}
+        for key, call, score in hot:
+            counts = by_type.setdefault(METHOD_DATA_TYPES[call['method']], Counter(hot=0, cached=0))
+            counts['hot'] += 1
+            total_score += score
+            if key in self.cache.memory:
+                counts['cached'] += 1
+                cached_score += score
+        cached = sum(counts['cached'] for counts in by_type.values())
+        return {
+            'hot': len(hot),
+            'cached': cached,
+            'ratio': cached / len(hot) if hot else 0.0,
+            'weighted': cached_score / total_score if total_score else 0.0,
+            'by_type': {data_type: dict(counts) for data_type, counts in sorted(by_type.items())},
+        }
+
+    async def close(self):
+        """Stop the background cycles."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._task is not None,
+            'interval': self.interval,
+            'cycles': self.cycles,
+            'refreshed': self.refreshed,
+            'promoted': self.promoted,
+            'deferred': self.deferred,
+            'failed': self.failed,
+            'coverage': self.coverage(),
+            'last': self.last,
+            'tracker': self.tracker.stats(),
+        }
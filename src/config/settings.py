@@ -43,10 +43,22 @@ class Settings(BaseSettings):
     INFLUXDB_TOKEN: str = os.getenv("INFLUXDB_TOKEN", "")
     INFLUXDB_ORG: str = os.getenv("INFLUXDB_ORG", "financial_research")
     INFLUXDB_BUCKET: str = os.getenv("INFLUXDB_BUCKET", "market_data")
+    INFLUX_ENABLED: bool = os.getenv("INFLUX_ENABLED", "false").lower() == "true"
+    INFLUX_BATCH_SIZE: int = int(os.getenv("INFLUX_BATCH_SIZE", "5000"))
+    INFLUX_FLUSH_INTERVAL: float = float(os.getenv("INFLUX_FLUSH_INTERVAL", "1"))
+    INFLUX_MAX_QUEUE: int = int(os.getenv("INFLUX_MAX_QUEUE", "100000"))
+    INFLUX_MAX_RETRIES: int = int(os.getenv("INFLUX_MAX_RETRIES", "3"))
+    INFLUX_SPILL_DIR: str = os.getenv("INFLUX_SPILL_DIR", "data/influx_spill")
     
     # Kafka Configuration
     KAFKA_BOOTSTRAP_SERVERS: str = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
     
+    # Quote Streaming Settings
+    STREAM_BROKER: str = os.getenv("STREAM_BROKER", "kafka")  # kafka or memory
+    STREAM_TOPIC: str = os.getenv("STREAM_TOPIC", "quotes")
+    STREAM_SYMBOLS: str = os.getenv("STREAM_SYMBOLS", "")  # comma separated; API polls these when set
+    STREAM_POLL_INTERVAL: float = float(os.getenv("STREAM_POLL_INTERVAL", "5"))
+    
     # Application Settings
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
@@ -54,14 +66,76 @@ class Settings(BaseSettings):
     # Data Processing Settings
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", "4"))
     BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "100"))
+    ANALYTICS_POOL_ENABLED: bool = os.getenv("ANALYTICS_POOL_ENABLED", "true").lower() == "true"
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour
     
+    # Cache Settings
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_REDIS_ENABLED: bool = os.getenv("CACHE_REDIS_ENABLED", "true").lower() == "true"
+    CACHE_DIR: str = os.getenv("CACHE_DIR", "data/cache")
+    PRICE_STORE_DIR: str = os.getenv("PRICE_STORE_DIR", "data/prices")
+    
+    # Cache Warming Settings
+    WARM_ENABLED: bool = os.getenv("WARM_ENABLED", "true").lower() == "true"
+    WARM_STATE_FILE: str = os.getenv("WARM_STATE_FILE", "data/cache_warm.json")
+    WARM_INTERVAL: float = float(os.getenv("WARM_INTERVAL", "60"))
+    WARM_TOP_N: int = int(os.getenv("WARM_TOP_N", "500"))
+    WARM_MIN_SCORE: float = float(os.getenv("WARM_MIN_SCORE", "2"))
+    WARM_HALF_LIFE: float = float(os.getenv("WARM_HALF_LIFE", "86400"))  # 1 day
+    WARM_LEAD_FRACTION: float = float(os.getenv("WARM_LEAD_FRACTION", "0.1"))
+    WARM_BUDGET: float = float(os.getenv("WARM_BUDGET", "0.5"))  # share of each rate limit
+    WARM_CONCURRENCY: int = int(os.getenv("WARM_CONCURRENCY", "2"))
+    WARM_TRACK_MAX: int = int(os.getenv("WARM_TRACK_MAX", "5000"))
+    
+    # Multi-Source Fetch Settings
+    SOURCE_TIMEOUT: float = float(os.getenv("SOURCE_TIMEOUT", "10"))
+    MULTI_SOURCE_DEADLINE: float = float(os.getenv("MULTI_SOURCE_DEADLINE", "20"))
+    
+    # Rate Limit Settings
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_REDIS_ENABLED: bool = os.getenv("RATE_LIMIT_REDIS_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_DIR: str = os.getenv("RATE_LIMIT_DIR", "data/ratelimit")
+    RATE_LIMIT_MAX_RETRIES: int = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "2"))
+    
+    # Shared HTTP Client Settings
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_DNS_CACHE_TTL: float = float(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    HTTP_USER_AGENT: str = os.getenv("HTTP_USER_AGENT", os.getenv("SEC_USER_AGENT", "Financial Research Bot (contact@example.com)"))
+    
+    # API Batch Settings
+    API_BATCH_MAX_SYMBOLS: int = int(os.getenv("API_BATCH_MAX_SYMBOLS", "500"))
+    API_BATCH_CONCURRENCY: int = int(os.getenv("API_BATCH_CONCURRENCY", "16"))
+    
+    # Metrics Settings
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TIMING_HEADER: bool = os.getenv("METRICS_TIMING_HEADER", "false").lower() == "true"
+    
+    # Record/Replay Settings
+    RECORD_DIR: Optional[str] = os.getenv("RECORD_DIR") or None
+    REPLAY_DIR: Optional[str] = os.getenv("REPLAY_DIR") or None
+    REPLAY_LATENCY_MS: Optional[float] = float(os.getenv("REPLAY_LATENCY_MS")) if os.getenv("REPLAY_LATENCY_MS") else None
+    REPLAY_LATENCY_JITTER: float = float(os.getenv("REPLAY_LATENCY_JITTER", "0.1"))
+    
     # Financial Data Settings
     DEFAULT_CURRENCY: str = "USD"
     DEFAULT_TIMEZONE: str = "UTC"
     
     # SEC EDGAR Settings
     SEC_USER_AGENT: str = os.getenv("SEC_USER_AGENT", "Financial Research Bot (contact@example.com)")
+    SEC_DATA_DIR: str = os.getenv("SEC_DATA_DIR", "data/sec_edgar")
+    
+    # SEC Filing Index Settings
+    FILINGS_INDEX_BACKEND: str = os.getenv("FILINGS_INDEX_BACKEND", "local")  # local or elasticsearch
+    FILINGS_INDEX_DIR: str = os.getenv("FILINGS_INDEX_DIR", "data/filings_index")
+    FILINGS_ES_PREFIX: str = os.getenv("FILINGS_ES_PREFIX", "filings")
+    FILINGS_BULK_SIZE: int = int(os.getenv("FILINGS_BULK_SIZE", "1000"))
+    FILINGS_CONCURRENCY: int = int(os.getenv("FILINGS_CONCURRENCY", os.getenv("MAX_WORKERS", "4")))
+    FILINGS_PER_TYPE: int = int(os.getenv("FILINGS_PER_TYPE", "4"))
+    FILINGS_SECTION_CHARS: int = int(os.getenv("FILINGS_SECTION_CHARS", "500000"))
     
     # FRED (Federal Reserve Economic Data) Settings
     FRED_ENABLED: bool = os.getenv("FRED_ENABLED", "true").lower() == "true"
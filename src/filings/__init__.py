@@ -0,0 +1,27 @@
+"""
+SEC filing ingestion: streaming parser, concurrent ingester and full-text/fact indexes.
+
+Exports are imported on first use, so importing the package stays cheap.
+"""
+
+from src.registry import lazy_exports
+
+__all__ = [
+    'parse_filing',
+    'find_filings',
+    'download_filings',
+    'ingest_filings',
+    'FilingIndex',
+    'ElasticsearchFilingIndex',
+    'open_filing_index',
+]
+
+__getattr__ = lazy_exports(__name__, {
+    'parse_filing': '.parser',
+    'find_filings': '.ingest',
+    'download_filings': '.ingest',
+    'ingest_filings': '.ingest',
+    'FilingIndex': '.index',
+    'ElasticsearchFilingIndex': '.index',
+    'open_filing_index': '.index',
+})
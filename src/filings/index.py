@@ -0,0 +1,485 @@
+"""
+Full-text and fact indexes for parsed SEC filings.
+
+Both backends share one async interface (``known``, ``add``, ``flush``,
+``search``, ``facts``, ``close``, ``stats``), so the ingester and the API do
+not care which one is configured (``FILINGS_INDEX_BACKEND``):
+
+- ``FilingIndex``: a local inverted index, the stand-in when Elasticsearch is
+  not running. Postings are compact ``array('I')`` columns per term (section
+  ids and term counts), queries intersect them with NumPy and rank sections
+  by BM25; facts are grouped by concept. The index is pickled to
+  ``FILINGS_INDEX_DIR`` on ``flush``, and queries reload it when another
+  process (``main.py --ingest-filings`` next to a running API) has saved
+  it since.
+- ``ElasticsearchFilingIndex``: three indices, ``<prefix>-filings`` (one
+  document per accession, used for deduplication), ``<prefix>-sections``
+  and ``<prefix>-facts``, written through the ``_bulk`` API in batches of
+  ``FILINGS_BULK_SIZE`` documents over the shared HTTP client.
+
+Search is conjunctive (every query term must appear in a section). Fact
+queries match the concept's local name (``Revenues``) or qualified name
+(``us-gaap:Revenues``) case-insensitively, optionally for one ticker and a
+period-end prefix (``2023``, ``2023-09`` or ``2023-09-30``), newest first.
+"""
+
+import asyncio
+import math
+import os
+import pickle
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from loguru import logger
+
+from src.config.settings import ELASTICSEARCH_URL, settings
+from src.filings.parser import tokenize
+
+INDEX_FILE = 'index.pkl'
+PREVIEW_CHARS = 240
+BM25_K1 = 1.2
+BM25_B = 0.75
+FILING_FIELDS = ('accession', 'ticker', 'form', 'company', 'cik', 'filed', 'period')
+
+
+class FilingIndexError(RuntimeError):
+    """The index backend rejected a request."""
+
+
+def _concept_key(concept: str) -> Tuple[str, Optional[str]]:
+    """(local name, qualified name or None), both lower-cased."""
+    concept = concept.strip().lower()
+    return concept.rpartition(':')[2], concept if ':' in concept else None
+
+
+class FilingIndex:
+    """
+    Local inverted index over filing sections and XBRL facts.
+
+    ``known``, ``search`` and ``facts`` reload the persisted index when its
+    mtime has changed, unless this instance has unsaved additions of its own
+    (which win, and overwrite the file on the next ``flush``).
+
+    Args:
+        directory: Where the index is persisted (settings.FILINGS_INDEX_DIR if None)
+    """
+
+    backend = 'local'
+    # The ingester asks the parser for per-section term counts
+    tokenize = True
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.FILINGS_INDEX_DIR)
+        self._filings: List[Dict[str, Any]] = []
+        self._accessions: Dict[str, int] = {}
+        # Per section: owning filing, item, title, preview; lengths in terms
+        self._sections: List[Tuple[int, str, str, str]] = []
+        self._section_filing = array('I')
+        self._lengths = array('I')
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._facts: Dict[str, List[Tuple]] = {}
+        self._fact_count = 0
+        self._dirty = False
+        # mtime of the index file this instance last loaded or saved
+        self._mtime: Optional[int] = None
+        loaded = self._read()
+        if loaded is not None:
+            self._mtime, state = loaded
+            self.__dict__.update(state)
+
+    def _read(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(mtime, state) of the persisted index, or None if there is none."""
+        try:
+            with open(self.directory / INDEX_FILE, 'rb') as fh:
+                return os.fstat(fh.fileno()).st_mtime_ns, pickle.load(fh)
+        except FileNotFoundError:
+            return None
+
+    async def _refresh(self):
+        """Reload the index if it was saved by someone else since it was loaded."""
+        if self._dirty:
+            return
+        try:
+            mtime = (self.directory / INDEX_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        loaded = await asyncio.to_thread(self._read)
+        # Additions made while reading win over the file
+        if loaded is not None and not self._dirty:
+            self._mtime, state = loaded
+            self.__dict__.update(state)
+            logger.info(f"Reloaded filing index from {self.directory} ({len(self._filings)} filings)")
+
+    # -- writing ---------------------------------------------------------
+
+    async def known(self, accessions: Iterable[str]) -> Set[str]:
+        """The given accession numbers that are already indexed."""
+        await self._refresh()
+        return {a for a in accessions if a in self._accessions}
+
+    async def add(self, filing: Dict[str, Any]):
+        """Index a parsed filing (parsed with ``tokenize_sections=True``)."""
+        if filing['accession'] in self._accessions:
+            return
+        number = len(self._filings)
+        self._accessions[filing['accession']] = number
+        self._filings.append({**{k: filing.get(k) for k in FILING_FIELDS},
+                              'sections': len(filing['sections']), 'facts': len(filing['facts'])})
+
+        for section in filing['sections']:
+            terms = section.get('terms')
+            if terms is None:
+                terms = {}
+                for term in tokenize(section['title'] + '\n' + section['text']):
+                    terms[term] = terms.get(term, 0) + 1
+            doc = len(self._sections)
+            self._sections.append((number, section['item'], section['title'], section['text'][:PREVIEW_CHARS]))
+            self._section_filing.append(number)
+            self._lengths.append(sum(terms.values()))
+            postings = self._postings
+            for term, count in terms.items():
+                column = postings.get(term)
+                if column is None:
+                    column = postings[term] = (array('I'), array('I'))
+                column[0].append(doc)
+                column[1].append(count)
+
+        for fact in filing['facts']:
+            local, _ = _concept_key(fact['concept'])
+            self._facts.setdefault(local, []).append(
+                (number, fact['concept'], fact['value'], fact['unit'], fact['decimals'],
+                 fact['period_start'], fact['period_end'], fact['dimensional'])
+            )
+        self._fact_count += len(filing['facts'])
+        self._dirty = True
+
+    def save(self):
+        """Persist the index atomically."""
+        state = {k: v for k, v in self.__dict__.items() if k.startswith('_') and k not in ('_dirty', '_mtime')}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / INDEX_FILE
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'wb') as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+        self._mtime = path.stat().st_mtime_ns
+        self._dirty = False
+
+    async def flush(self):
+        if self._dirty:
+            await asyncio.to_thread(self.save)
+
+    async def close(self):
+        await self.flush()
+
+    # -- queries ---------------------------------------------------------
+
+    def _allowed_filings(self, ticker: Optional[str], form: Optional[str]) -> Optional[np.ndarray]:
+        if not ticker and not form:
+            return None
+        ticker = ticker.upper() if ticker else None
+        form = form.upper() if form else None
+        return np.array([n for n, f in enumerate(self._filings)
+                         if (ticker is None or f['ticker'] == ticker)
+                         and (form is None or (f['form'] or '').upper() == form)], dtype=np.uint32)
+
+    async def search(self, query: str, limit: int = 10, ticker: Optional[str] = None,
+                     form: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sections containing every query term, best BM25 score first."""
+        await self._refresh()
+        terms = list(dict.fromkeys(tokenize(query)))
+        columns = [self._postings.get(term) for term in terms]
+        if not terms or any(column is None for column in columns):
+            return []
+        columns.sort(key=lambda column: len(column[0]))
+        candidates = np.frombuffer(columns[0][0], dtype=np.uint32)
+        for docs, _ in columns[1:]:
+            candidates = np.intersect1d(candidates, np.frombuffer(docs, dtype=np.uint32), assume_unique=True)
+            if not len(candidates):
+                return []
+        allowed = self._allowed_filings(ticker, form)
+        if allowed is not None:
+            filings = np.frombuffer(self._section_filing, dtype=np.uint32)[candidates]
+            candidates = candidates[np.isin(filings, allowed)]
+            if not len(candidates):
+                return []
+
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+        total = len(self._sections)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[candidates] / max(lengths.mean(), 1.0))
+        scores = np.zeros(len(candidates))
+        for docs, counts in columns:
+            docs = np.frombuffer(docs, dtype=np.uint32)
+            tf = np.frombuffer(counts, dtype=np.uint32)[np.searchsorted(docs, candidates)]
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        top = np.argsort(-scores)[:limit] if len(scores) <= limit else \
+            np.argpartition(-scores, limit)[:limit]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for position in top:
+            number, item, title, preview = self._sections[int(candidates[position])]
+            filing = self._filings[number]
+            results.append({**{k: filing[k] for k in FILING_FIELDS}, 'item': item, 'title': title,
+                            'score': round(float(scores[position]), 4), 'preview': preview})
+        return results
+
+    async def facts(self, concept: str, ticker: Optional[str] = None, period: Optional[str] = None,
+                    limit: int = 100, include_dimensional: bool = False) -> List[Dict[str, Any]]:
+        """Reported values of a concept, latest period end first."""
+        await self._refresh()
+        local, qualified = _concept_key(concept)
+        ticker = ticker.upper() if ticker else None
+        rows = []
+        for number, name, value, unit, decimals, start, end, dimensional in self._facts.get(local, ()):
+            filing = self._filings[number]
+            if (qualified is not None and name.lower() != qualified) or (dimensional and not include_dimensional) \
+                    or (ticker is not None and filing['ticker'] != ticker) \
+                    or (period is not None and not (end or '').startswith(period)):
+                continue
+            rows.append({'accession': filing['accession'], 'ticker': filing['ticker'], 'form': filing['form'],
+                         'filed': filing['filed'], 'concept': name, 'value': value, 'unit': unit,
+                         'decimals': decimals, 'period_start': start, 'period_end': end,
+                         'dimensional': dimensional})
+        rows.sort(key=lambda row: (row['period_end'] or '', row['filed'] or ''), reverse=True)
+        return rows[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'filings': len(self._filings), 'sections': len(self._sections),
+                'terms': len(self._postings), 'facts': self._fact_count}
+
+
+SECTION_MAPPING = {
+    'accession': {'type': 'keyword'}, 'ticker': {'type': 'keyword'}, 'form': {'type': 'keyword'},
+    'company': {'type': 'keyword'}, 'filed': {'type': 'keyword'}, 'period': {'type': 'keyword'},
+    'item': {'type': 'keyword'}, 'title': {'type': 'text'}, 'text': {'type': 'text'},
+}
+FACT_MAPPING = {
+    'accession': {'type': 'keyword'}, 'ticker': {'type': 'keyword'}, 'form': {'type': 'keyword'},
+    'filed': {'type': 'keyword'}, 'concept': {'type': 'keyword'}, 'name': {'type': 'keyword'},
+    'qname': {'type': 'keyword'}, 'value': {'type': 'double'}, 'unit': {'type': 'keyword'},
+    'decimals': {'type': 'keyword'}, 'period_start': {'type': 'keyword'},
+    'period_end': {'type': 'keyword'}, 'dimensional': {'type': 'boolean'},
+}
+FILING_MAPPING = {
+    'accession': {'type': 'keyword'}, 'ticker': {'type': 'keyword'}, 'form': {'type': 'keyword'},
+    'company': {'type': 'keyword'}, 'cik': {'type': 'keyword'}, 'filed': {'type': 'keyword'},
+    'period': {'type': 'keyword'}, 'sections': {'type': 'integer'}, 'facts': {'type': 'integer'},
+}
+
+
+class ElasticsearchFilingIndex:
+    """
+    Filing index in Elasticsearch, written with the bulk API.
+
+    Document ids are derived from the accession number, so indexing a
+    filing twice overwrites rather than duplicates it.
+
+    Args:
+        client: httpx.AsyncClient to use (a private one if None)
+        url: Elasticsearch URL (settings if None)
+        prefix: Index name prefix (settings.FILINGS_ES_PREFIX if None)
+        bulk_size: Documents per bulk request (settings.FILINGS_BULK_SIZE if None)
+    """
+
+    backend = 'elasticsearch'
+    tokenize = False
+
+    def __init__(self, client=None, url: Optional[str] = None, prefix: Optional[str] = None,
+                 bulk_size: Optional[int] = None):
+        self.url = (url or ELASTICSEARCH_URL).rstrip('/')
+        prefix = prefix or settings.FILINGS_ES_PREFIX
+        self.indices = {'filings': f"{prefix}-filings", 'sections': f"{prefix}-sections",
+                        'facts': f"{prefix}-facts"}
+        self.bulk_size = bulk_size or settings.FILINGS_BULK_SIZE
+        self._client = client
+        self._owns_client = client is None
+        self._actions: List[bytes] = []
+        self._pending = 0
+        self._ready = False
+        self.filings = 0
+        self.documents = 0
+        self.bulk_requests = 0
+        self.errors = 0
+
+    def _http(self):
+        if self._client is None:
+            from src.utils.http import create_http_client
+            self._client = create_http_client()
+        return self._client
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        response = await self._http().request(method, f"{self.url}/{path}", **kwargs)
+        if response.status_code >= 300:
+            raise FilingIndexError(f"Elasticsearch {method} /{path} failed ({response.status_code}): "
+                                   f"{response.text[:200]}")
+        return response.json()
+
+    async def _ensure_indices(self):
+        if self._ready:
+            return
+        mappings = {'filings': FILING_MAPPING, 'sections': SECTION_MAPPING, 'facts': FACT_MAPPING}
+        for kind, index in self.indices.items():
+            response = await self._http().put(f"{self.url}/{index}",
+                                              json={'mappings': {'properties': mappings[kind]}})
+            if response.status_code >= 300 and 'resource_already_exists' not in response.text:
+                raise FilingIndexError(f"Could not create index {index} ({response.status_code}): "
+                                       f"{response.text[:200]}")
+        self._ready = True
+
+    # -- writing ---------------------------------------------------------
+
+    async def known(self, accessions: Iterable[str]) -> Set[str]:
+        """The given accession numbers that are already indexed."""
+        ids = list(accessions)
+        if not ids:
+            return set()
+        response = await self._http().post(f"{self.url}/{self.indices['filings']}/_mget", json={'ids': ids})
+        if response.status_code == 404:
+            return set()
+        if response.status_code >= 300:
+            raise FilingIndexError(f"Elasticsearch _mget failed ({response.status_code}): {response.text[:200]}")
+        return {doc['_id'] for doc in response.json().get('docs', []) if doc.get('found')}
+
+    def _action(self, index: str, doc_id: str, source: Dict[str, Any]):
+        from src.utils.serialization import dumps
+
+        self._actions.append(dumps({'index': {'_index': self.indices[index], '_id': doc_id}}))
+        self._actions.append(dumps(source))
+        self._pending += 1
+
+    async def add(self, filing: Dict[str, Any]):
+        """Queue a parsed filing's documents, sending a bulk request when the batch is full."""
+        meta = {k: filing.get(k) for k in FILING_FIELDS}
+        accession = filing['accession']
+        for section in filing['sections']:
+            self._action('sections', f"{accession}:{section['item']}",
+                         {**meta, 'item': section['item'], 'title': section['title'], 'text': section['text']})
+        for number, fact in enumerate(filing['facts']):
+            local, _ = _concept_key(fact['concept'])
+            self._action('facts', f"{accession}:{number}",
+                         {**{k: meta[k] for k in ('accession', 'ticker', 'form', 'filed')},
+                          'concept': fact['concept'], 'name': local, 'qname': fact['concept'].lower(),
+                          'value': fact['value'], 'unit': fact['unit'], 'decimals': fact['decimals'],
+                          'period_start': fact['period_start'], 'period_end': fact['period_end'],
+                          'dimensional': fact['dimensional']})
+        # The filing document goes last: once it exists, the filing counts as indexed
+        self._action('filings', accession,
+                     {**meta, 'sections': len(filing['sections']), 'facts': len(filing['facts'])})
+        self.filings += 1
+        if self._pending >= self.bulk_size:
+            await self._send()
+
+    async def _send(self):
+        if not self._actions:
+            return
+        await self._ensure_indices()
+        body, count = b'\n'.join(self._actions) + b'\n', self._pending
+        self._actions, self._pending = [], 0
+        result = await self._request('POST', '_bulk', content=body,
+                                     headers={'Content-Type': 'application/x-ndjson'})
+        self.bulk_requests += 1
+        self.documents += count
+        if result.get('errors'):
+            failed = [item for item in result.get('items', [])
+                      if next(iter(item.values())).get('error')]
+            self.errors += len(failed)
+            if failed:
+                logger.warning(f"Elasticsearch rejected {len(failed)} of {count} filing documents: "
+                               f"{next(iter(failed[0].values()))['error']}")
+
+    async def flush(self):
+        """Send queued documents and make them searchable."""
+        if self._actions:
+            await self._send()
+            await self._request('POST', f"{','.join(self.indices.values())}/_refresh")
+
+    async def close(self):
+        try:
+            await self.flush()
+        finally:
+            if self._owns_client and self._client is not None:
+                await self._client.aclose()
+                self._client = None
+
+    # -- queries ---------------------------------------------------------
+
+    async def _search(self, index: str, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        response = await self._http().post(f"{self.url}/{self.indices[index]}/_search", json=body)
+        if response.status_code == 404:
+            return []
+        if response.status_code >= 300:
+            raise FilingIndexError(f"Elasticsearch search failed ({response.status_code}): {response.text[:200]}")
+        return response.json()['hits']['hits']
+
+    @staticmethod
+    def _filters(ticker: Optional[str], form: Optional[str]) -> List[Dict[str, Any]]:
+        filters = []
+        if ticker:
+            filters.append({'term': {'ticker': ticker.upper()}})
+        if form:
+            filters.append({'term': {'form': form.upper()}})
+        return filters
+
+    async def search(self, query: str, limit: int = 10, ticker: Optional[str] = None,
+                     form: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sections containing every query term, best score first."""
+        hits = await self._search('sections', {
+            'size': limit,
+            '_source': {'excludes': ['text']},
+            'query': {'bool': {
+                'must': {'multi_match': {'query': query, 'fields': ['title^2', 'text'], 'operator': 'and'}},
+                'filter': self._filters(ticker, form),
+            }},
+            'highlight': {'fields': {'text': {'fragment_size': PREVIEW_CHARS, 'number_of_fragments': 1}}},
+        })
+        return [{**hit['_source'], 'score': round(hit['_score'], 4),
+                 'preview': ' '.join(hit.get('highlight', {}).get('text', []))} for hit in hits]
+
+    async def facts(self, concept: str, ticker: Optional[str] = None, period: Optional[str] = None,
+                    limit: int = 100, include_dimensional: bool = False) -> List[Dict[str, Any]]:
+        """Reported values of a concept, latest period end first."""
+        local, qualified = _concept_key(concept)
+        filters = [{'term': {'qname': qualified}} if qualified else {'term': {'name': local}}]
+        filters.extend(self._filters(ticker, None))
+        if period:
+            filters.append({'prefix': {'period_end': period}})
+        if not include_dimensional:
+            filters.append({'term': {'dimensional': False}})
+        hits = await self._search('facts', {
+            'size': limit,
+            'query': {'bool': {'filter': filters}},
+            'sort': [{'period_end': {'order': 'desc', 'missing': '_last'}}, {'filed': 'desc'}],
+        })
+        rows = []
+        for hit in hits:
+            row = dict(hit['_source'])
+            row.pop('name', None)
+            row.pop('qname', None)
+            rows.append(row)
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'filings': self.filings, 'documents': self.documents,
+                'bulk_requests': self.bulk_requests, 'errors': self.errors, 'pending': self._pending}
+
+
+def open_filing_index(client=None, backend: Optional[str] = None):
+    """
+    The configured filing index.
+
+    Args:
+        client: Shared httpx.AsyncClient for Elasticsearch
+        backend: 'local' or 'elasticsearch' (settings.FILINGS_INDEX_BACKEND if None)
+    """
+    backend = backend or settings.FILINGS_INDEX_BACKEND
+    if backend == 'elasticsearch':
+        return ElasticsearchFilingIndex(client)
+    if backend == 'local':
+        return FilingIndex()
+    raise ValueError(f"Unknown filing index backend: {backend}")
@@ -0,0 +1,148 @@
+"""
+Concurrent SEC filing ingestion.
+
+``ingest_filings`` discovers downloaded filings, parses up to
+``FILINGS_CONCURRENCY`` of them at once (in the analytics process pool when
+one is given, otherwise in threads) and adds each to a filing index as soon
+as it is parsed. Filings are deduplicated by accession number: those already
+in the index are skipped before parsing when the path carries the accession
+(sec-edgar-downloader layout), and after parsing otherwise.
+
+``download_filings`` fetches filings through the manager first, so a whole
+universe can be downloaded and indexed in one run::
+
+    async with DataSession() as session:
+        await download_filings(session.manager, ['AAPL', 'MSFT'], ['10-K', '8-K'])
+    report = await ingest_filings([settings.SEC_DATA_DIR], open_filing_index())
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.filings.parser import SUBMISSION_FILE, accession_from_path, parse_filing
+from src.utils.fanout import fan_out, unique_symbols
+
+DOCUMENT_SUFFIXES = ('.htm', '.html')
+
+
+def find_filings(paths: Iterable[str]) -> List[Path]:
+    """
+    Filing files under the given files or directories.
+
+    A directory holding ``full-submission.txt`` contributes that file;
+    otherwise its largest HTML document is taken as the primary document.
+    """
+    found: List[Path] = []
+    for root in map(Path, paths):
+        if root.is_file():
+            found.append(root)
+            continue
+        directories = {root} | {p.parent for p in root.rglob('*') if p.is_file()}
+        for directory in sorted(directories):
+            submission = directory / SUBMISSION_FILE
+            if submission.is_file():
+                found.append(submission)
+                continue
+            documents = [p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in DOCUMENT_SUFFIXES]
+            if documents:
+                found.append(max(documents, key=lambda p: p.stat().st_size))
+    return list(dict.fromkeys(found))
+
+
+async def download_filings(manager, symbols: Iterable[str], filing_types: Iterable[str],
+                           amount: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Download the latest filings of each type for every symbol.
+
+    Args:
+        manager: FinancialDataManager providing ``get_regulatory_filings``
+        symbols: Stock tickers
+        filing_types: Forms such as '10-K', '10-Q', '8-K'
+        amount: Filings per symbol and type (settings.FILINGS_PER_TYPE if None)
+
+    Returns:
+        Dictionary with 'requests', 'succeeded', 'failed' and 'elapsed_s'
+    """
+    amount = amount or settings.FILINGS_PER_TYPE
+    keys = [f"{symbol}|{form}" for symbol in unique_symbols(symbols) for form in filing_types]
+
+    async def fetch(key: str):
+        symbol, _, form = key.partition('|')
+        return await manager.get_regulatory_filings(symbol, form, amount=amount)
+
+    started = time.perf_counter()
+    failed = 0
+    async for result in fan_out(keys, fetch, settings.FILINGS_CONCURRENCY):
+        if result.error is not None:
+            failed += 1
+            logger.error(f"Error downloading {result.key.replace('|', ' ')} filings: {result.error}")
+    return {'requests': len(keys), 'succeeded': len(keys) - failed, 'failed': failed,
+            'elapsed_s': time.perf_counter() - started}
+
+
+async def ingest_filings(paths: Iterable[str], index, executor=None,
+                         concurrency: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parse filings concurrently and add them to an index.
+
+    Args:
+        paths: Filing files or directories to search for filings
+        index: FilingIndex or ElasticsearchFilingIndex
+        executor: Optional AnalyticsExecutor to parse in worker processes
+        concurrency: Filings parsed at once (settings.FILINGS_CONCURRENCY if None)
+
+    Returns:
+        Ingestion report: files, indexed, duplicates, failed, sections,
+        facts, bytes, elapsed_s and filings_per_sec
+    """
+    started = time.perf_counter()
+    files = await asyncio.to_thread(find_filings, paths)
+    implied = {str(path): accession_from_path(path) for path in files}
+    seen = await index.known({a for a in implied.values() if a})
+    duplicates = 0
+    pending = []
+    for path in files:
+        accession = implied[str(path)]
+        if accession is not None and accession in seen:
+            duplicates += 1
+            continue
+        if accession is not None:
+            seen.add(accession)
+        pending.append(str(path))
+
+    async def parse(path: str):
+        if executor is not None:
+            return await executor.run(parse_filing, path, index.tokenize)
+        return await asyncio.to_thread(parse_filing, path, index.tokenize)
+
+    report = {'files': len(files), 'indexed': 0, 'duplicates': duplicates, 'failed': 0,
+              'sections': 0, 'facts': 0, 'bytes': 0}
+    try:
+        async for result in fan_out(pending, parse, concurrency or settings.FILINGS_CONCURRENCY):
+            if result.error is not None:
+                report['failed'] += 1
+                logger.error(f"Error parsing filing {result.key}: {result.error}")
+                continue
+            filing = result.value
+            accession = filing['accession']
+            if implied[result.key] != accession and (accession in seen or await index.known([accession])):
+                report['duplicates'] += 1
+                continue
+            seen.add(accession)
+            await index.add(filing)
+            report['indexed'] += 1
+            report['sections'] += len(filing['sections'])
+            report['facts'] += len(filing['facts'])
+            report['bytes'] += filing['bytes']
+    finally:
+        await index.flush()
+
+    elapsed = time.perf_counter() - started
+    report['elapsed_s'] = elapsed
+    report['filings_per_sec'] = report['indexed'] / elapsed if elapsed > 0 else 0.0
+    return report
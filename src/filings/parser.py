@@ -0,0 +1,441 @@
+"""
+Streaming parser for SEC EDGAR filings.
+
+Filings are read in fixed-size chunks and fed through incremental parsers,
+so a multi-megabyte submission is never held in memory at once: only the
+current text block, the extracted sections (each capped at
+``FILINGS_SECTION_CHARS`` characters) and the XBRL facts are kept.
+
+Two inputs are understood:
+
+- ``full-submission.txt`` as written by sec-edgar-downloader: the SEC
+  header (accession number, form, company, CIK, filing and period dates)
+  followed by ``<DOCUMENT>`` blocks. The primary document is split into
+  sections, ``EX-99`` exhibits (e.g. earnings releases) become one section
+  each, and facts are read from inline XBRL (``ix:nonFraction``) or, for
+  older filings, the ``EX-101.INS`` instance. Images, PDFs, spreadsheets
+  and other attachments are skipped.
+- a single ``.htm``/``.html`` primary document, whose accession number is
+  taken from its path.
+
+Sections are the ``Item`` headings of 10-K, 10-Q and 8-K filings. When a
+heading appears more than once (the table of contents, then the body) the
+longest occurrence is kept; text before the first heading is the ``cover``
+section, and documents without headings are one ``body`` section.
+
+Example::
+
+    filing = parse_filing('data/sec_edgar/sec-edgar-filings/AAPL/10-K/0000320193-23-000106/full-submission.txt')
+    filing['accession'], [s['item'] for s in filing['sections']], len(filing['facts'])
+"""
+
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config.settings import settings
+
+CHUNK_SIZE = 1 << 16
+SUBMISSION_FILE = 'full-submission.txt'
+ACCESSION_RE = re.compile(r'\d{10}-\d{2}-\d{6}')
+ITEM_RE = re.compile(r'^item\s*(\d{1,2}[a-z]?(?:\.\d{2})?)\s*[.:\-–—]?\s*(.*)$', re.IGNORECASE)
+HEADING_MAX_CHARS = 200
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were which will with'.split()
+)
+
+HEADER_FIELDS = {
+    'ACCESSION NUMBER': 'accession',
+    'CONFORMED SUBMISSION TYPE': 'form',
+    'COMPANY CONFORMED NAME': 'company',
+    'CENTRAL INDEX KEY': 'cik',
+    'FILED AS OF DATE': 'filed',
+    'CONFORMED PERIOD OF REPORT': 'period',
+}
+SKIPPED_EXTENSIONS = ('.jpg', '.jpeg', '.gif', '.png', '.pdf', '.zip', '.xls', '.xlsx', '.json', '.js', '.css')
+BLOCK_TAGS = frozenset(['p', 'div', 'br', 'tr', 'li', 'table', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'title'])
+CELL_TAGS = frozenset(['td', 'th'])
+HIDDEN_TAGS = frozenset(['script', 'style', 'ix:header'])
+PERIOD_TAGS = {'startdate': 'start', 'enddate': 'end', 'instant': 'end'}
+DASHES = ('', '-', '–', '—')
+# Old text filings may open with <PAGE> or similar markers, so only these mean markup
+MARKUP_RE = re.compile(r'<(?:\?xml|!doctype|html|xbrl|xml|body|div|p|table)\b', re.IGNORECASE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased alphanumeric terms of a text, without one-letter words and stopwords."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _date(value: Optional[str]) -> Optional[str]:
+    """EDGAR ``YYYYMMDD`` (or ISO) date as ``YYYY-MM-DD``."""
+    if not value:
+        return None
+    digits = value.strip().replace('-', '')
+    if len(digits) != 8 or not digits.isdigit():
+        return None
+    return f"{digits[:4]}-{digits[4:6]}-{digits[6:]}"
+
+
+def _local(tag: str) -> str:
+    return tag.rpartition(':')[2]
+
+
+class _Sections:
+    """
+    Collects text blocks into sections, keeping at most ``limit`` characters of each.
+
+    With ``detect`` set, short blocks that look like ``Item 7.`` headings
+    start a new section. With ``terms`` set, every block is also tokenized,
+    so term counts cover the whole section even where its text is cut off.
+    """
+
+    def __init__(self, limit: int, item: str = 'body', title: str = '', detect: bool = True,
+                 terms: bool = False):
+        self.limit = limit
+        self.detect = detect
+        self.terms = terms
+        self.occurrences: List[Dict[str, Any]] = []
+        self._start(item, title)
+
+    def _start(self, item: str, title: str):
+        self._current = {'item': item, 'title': title, 'parts': [], 'chars': 0, 'length': 0,
+                         'terms': Counter(tokenize(title)) if self.terms else None}
+        self.occurrences.append(self._current)
+
+    def add(self, text: str):
+        if self.detect and len(text) <= HEADING_MAX_CHARS:
+            match = ITEM_RE.match(text)
+            if match:
+                self._start(match.group(1).upper(), match.group(2).strip())
+                return
+        current = self._current
+        current['length'] += len(text) + 1
+        if current['terms'] is not None:
+            current['terms'].update(tokenize(text))
+        room = self.limit - current['chars']
+        if room > 0:
+            text = text[:room]
+            current['parts'].append(text)
+            current['chars'] += len(text) + 1
+
+    def result(self) -> List[Dict[str, Any]]:
+        """Longest occurrence of each non-empty section, in document order."""
+        occurrences = self.occurrences
+        if len(occurrences) > 1 and occurrences[0]['item'] == 'body':
+            occurrences[0]['item'] = 'cover'
+        best: Dict[str, Dict[str, Any]] = {}
+        for occurrence in occurrences:
+            kept = best.get(occurrence['item'])
+            if occurrence['length'] and (kept is None or occurrence['length'] > kept['length']):
+                best[occurrence['item']] = occurrence
+        sections = []
+        for o in occurrences:
+            if best.get(o['item']) is o:
+                section = {'item': o['item'], 'title': o['title'], 'text': '\n'.join(o['parts']), 'length': o['length']}
+                if o['terms'] is not None:
+                    section['terms'] = dict(o['terms'])
+                sections.append(section)
+        return sections
+
+
+class _DocumentParser(HTMLParser):
+    """
+    Incremental parser for one HTML, inline XBRL or XBRL instance document.
+
+    Visible text is passed to ``on_block`` one block (paragraph, table row,
+    heading) at a time. Numeric facts and their contexts are collected in
+    ``facts`` and ``contexts``. Plain-text documents are split into lines.
+    """
+
+    def __init__(self, on_block: Callable[[str], None], instance: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.on_block = on_block
+        self.instance = instance
+        self.plain: Optional[bool] = None
+        self.facts: List[Dict[str, Any]] = []
+        self.contexts: Dict[str, Dict[str, Any]] = {}
+        self._block: List[str] = []
+        self._carry = ''
+        self._hidden = 0
+        self._open_facts: List[Dict[str, Any]] = []
+        self._context: Optional[Dict[str, Any]] = None
+        self._period_field: Optional[str] = None
+
+    def feed(self, data: str):
+        if self.plain is None:
+            stripped = data.lstrip()
+            if not stripped:
+                return
+            self.plain = MARKUP_RE.match(stripped) is None
+        if not self.plain:
+            super().feed(data)
+            return
+        lines = (self._carry + data).split('\n')
+        self._carry = lines.pop()
+        for line in lines:
+            self._emit(line)
+
+    def close(self):
+        if self.plain:
+            self._emit(self._carry)
+            self._carry = ''
+        elif self.plain is not None:
+            super().close()
+            self._flush()
+
+    def _emit(self, text: str):
+        text = ' '.join(text.split())
+        if text:
+            self.on_block(text)
+
+    def _flush(self):
+        if self._block:
+            self._emit(''.join(self._block))
+            self._block = []
+
+    def handle_starttag(self, tag, attrs):
+        local = _local(tag)
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        elif tag in CELL_TAGS:
+            self._block.append(' ')
+
+        if local == 'context':
+            self._context = {'id': dict(attrs).get('id'), 'start': None, 'end': None, 'dimensional': False}
+        elif self._context is not None:
+            if local in PERIOD_TAGS:
+                self._period_field = PERIOD_TAGS[local]
+            elif local in ('explicitmember', 'typedmember'):
+                self._context['dimensional'] = True
+
+        attributes = dict(attrs)
+        if tag == 'ix:nonfraction':
+            self._open_facts.append({'concept': attributes.get('name'), 'attrs': attributes, 'text': []})
+        elif self.instance and 'contextref' in attributes and 'unitref' in attributes:
+            # Instance element names carry the concept; HTMLParser lower-cases them
+            raw = re.match(r'<\s*([^\s/>]+)', self.get_starttag_text() or '')
+            self._open_facts.append({'concept': raw.group(1) if raw else tag, 'attrs': attributes,
+                                     'text': [], 'tag': tag})
+
+    def handle_endtag(self, tag):
+        local = _local(tag)
+        if tag in HIDDEN_TAGS:
+            self._hidden = max(0, self._hidden - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        elif tag in CELL_TAGS:
+            self._block.append(' ')
+
+        if local == 'context' and self._context is not None:
+            if self._context['id']:
+                self.contexts[self._context['id']] = self._context
+            self._context = None
+        elif local in PERIOD_TAGS:
+            self._period_field = None
+
+        if self._open_facts and (tag == 'ix:nonfraction' if not self.instance
+                                 else self._open_facts[-1].get('tag') == tag):
+            fact = self._open_facts.pop()
+            value = _fact_value(''.join(fact['text']), fact['attrs'], inline=not self.instance)
+            if value is not None and fact['concept']:
+                attrs = fact['attrs']
+                self.facts.append({'concept': fact['concept'], 'value': value, 'unit': attrs.get('unitref'),
+                                   'decimals': attrs.get('decimals'), 'context': attrs.get('contextref')})
+
+    def handle_data(self, data):
+        if self._period_field is not None and self._context is not None:
+            self._context[self._period_field] = data.strip()
+        for fact in self._open_facts:
+            fact['text'].append(data)
+        if not self._hidden and not self.instance:
+            self._block.append(data)
+
+
+def _fact_value(text: str, attrs: Dict[str, str], inline: bool) -> Optional[float]:
+    """Numeric value of a fact, applying inline XBRL ``format``, ``scale`` and ``sign``."""
+    if attrs.get('xsi:nil') == 'true':
+        return None
+    raw = text.strip()
+    if not inline:
+        try:
+            return float(raw)
+        except ValueError:
+            return None
+    fmt = attrs.get('format', '').replace('-', '')
+    if 'zero' in fmt or raw in DASHES:
+        number = 0.0
+    else:
+        cleaned = re.sub(r'[^0-9.,]', '', raw)
+        if 'commadecimal' in fmt:
+            cleaned = cleaned.replace('.', '').replace(',', '.')
+        else:
+            cleaned = cleaned.replace(',', '')
+        try:
+            number = float(cleaned)
+        except ValueError:
+            return None
+    try:
+        number *= 10 ** int(attrs.get('scale') or 0)
+    except ValueError:
+        pass
+    return -number if attrs.get('sign') == '-' else number
+
+
+def _fragments(fh, size: int = CHUNK_SIZE) -> Iterator[Tuple[str, bool]]:
+    """Yield (fragment, starts_line) pieces of a text file, each at most ``size`` characters."""
+    at_line_start = True
+    while True:
+        chunk = fh.read(size)
+        if not chunk:
+            return
+        for piece in chunk.splitlines(keepends=True):
+            yield piece, at_line_start
+            at_line_start = piece.endswith(('\n', '\r'))
+
+
+def _resolve_facts(parser: _DocumentParser, facts: Dict[Tuple, Dict[str, Any]]):
+    """Attach context periods to a document's facts, dropping repeats of the same fact."""
+    for fact in parser.facts:
+        context = parser.contexts.get(fact.pop('context'), {})
+        key = (fact['concept'], context.get('id'), fact['unit'])
+        if key in facts:
+            continue
+        fact['period_start'] = _date(context.get('start'))
+        fact['period_end'] = _date(context.get('end'))
+        fact['dimensional'] = context.get('dimensional', False)
+        facts[key] = fact
+
+
+def _path_metadata(path: Path) -> Dict[str, Optional[str]]:
+    """Accession, ticker and form implied by a sec-edgar-downloader path (``TICKER/FORM/ACCESSION/file``)."""
+    parts = path.parts
+    match = ACCESSION_RE.search(parts[-2]) if len(parts) > 1 else None
+    if match:
+        return {'accession': match.group(0), 'ticker': parts[-4] if len(parts) > 3 else None,
+                'form': parts[-3] if len(parts) > 2 else None}
+    match = ACCESSION_RE.search(path.name)
+    return {'accession': match.group(0) if match else None, 'ticker': None, 'form': None}
+
+
+def accession_from_path(path) -> Optional[str]:
+    """Accession number in a filing's path, if any (no file access)."""
+    return _path_metadata(Path(path))['accession']
+
+
+def parse_filing(path, tokenize_sections: bool = False, section_chars: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parse one filing into its metadata, sections and XBRL facts.
+
+    Args:
+        path: ``full-submission.txt`` or a single HTML document
+        tokenize_sections: Also return each section's term counts (``terms``)
+            for a local inverted index
+        section_chars: Characters of text kept per section
+            (settings.FILINGS_SECTION_CHARS if None)
+
+    Returns:
+        Dictionary with 'accession', 'form', 'company', 'cik', 'ticker',
+        'filed', 'period', 'source', 'bytes', 'sections' (item, title, text,
+        length) and 'facts' (concept, value, unit, decimals, period_start,
+        period_end, dimensional)
+
+    Raises:
+        ValueError: If no accession number is found in the header or path
+    """
+    path = Path(path)
+    limit = section_chars or settings.FILINGS_SECTION_CHARS
+    implied = _path_metadata(path)
+    header: Dict[str, Optional[str]] = {}
+    sections = _Sections(limit, terms=tokenize_sections)
+    exhibits: List[Dict[str, Any]] = []
+    facts: Dict[Tuple, Dict[str, Any]] = {}
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as fh:
+        if path.name == SUBMISSION_FILE or path.suffix.lower() == '.txt':
+            _parse_submission(fh, header, sections, exhibits, facts, limit, tokenize_sections)
+        else:
+            parser = _DocumentParser(sections.add)
+            for fragment, _ in _fragments(fh):
+                parser.feed(fragment)
+            parser.close()
+            _resolve_facts(parser, facts)
+
+    accession = header.get('accession') or implied['accession']
+    if not accession:
+        raise ValueError(f"No accession number in {path}")
+    return {
+        'accession': accession,
+        'form': header.get('form') or implied['form'],
+        'company': header.get('company'),
+        'cik': header.get('cik'),
+        'ticker': (implied['ticker'] or '').upper() or None,
+        'filed': _date(header.get('filed')),
+        'period': _date(header.get('period')),
+        'source': str(path),
+        'bytes': path.stat().st_size,
+        'sections': sections.result() + exhibits,
+        'facts': list(facts.values()),
+    }
+
+
+def _parse_submission(fh, header, sections: _Sections, exhibits: List[Dict[str, Any]],
+                      facts: Dict[Tuple, Dict[str, Any]], limit: int, terms: bool):
+    """Walk the SGML wrapper of a full submission, feeding each document's text to a parser."""
+    state = 'header'
+    document: Dict[str, str] = {}
+    parser: Optional[_DocumentParser] = None
+    primary_done = False
+    exhibit: Optional[_Sections] = None
+
+    for fragment, at_line_start in _fragments(fh):
+        if state == 'text':
+            if at_line_start and fragment.startswith('</TEXT>'):
+                parser.close()
+                _resolve_facts(parser, facts)
+                if exhibit is not None:
+                    exhibits.extend(exhibit.result())
+                    exhibit = None
+                parser, state = None, 'document'
+            else:
+                parser.feed(fragment)
+            continue
+        if state == 'skip':
+            if at_line_start and fragment.startswith('</TEXT>'):
+                state = 'document'
+            continue
+        if not at_line_start:
+            continue
+
+        line = fragment.strip()
+        if line.startswith('<DOCUMENT>'):
+            state, document = 'document', {}
+        elif state == 'header':
+            key, sep, value = line.partition(':')
+            field = HEADER_FIELDS.get(key.strip())
+            if sep and field and value.strip():
+                header.setdefault(field, value.strip())
+        elif line.startswith('<TEXT>'):
+            doc_type = document.get('type', '').upper()
+            filename = document.get('filename', '').lower()
+            if filename.endswith(SKIPPED_EXTENSIONS):
+                state = 'skip'
+            elif not primary_done:
+                primary_done = True
+                parser, state = _DocumentParser(sections.add), 'text'
+            elif doc_type.startswith('EX-99'):
+                exhibit = _Sections(limit, doc_type, document.get('description', ''), detect=False, terms=terms)
+                parser, state = _DocumentParser(exhibit.add), 'text'
+            elif (doc_type == 'EX-101.INS' or filename.endswith('_htm.xml')) and not facts:
+                # Older filings carry their facts in an instance; inline XBRL already had them
+                parser, state = _DocumentParser(lambda text: None, instance=True), 'text'
+            else:
+                state = 'skip'
+        elif state == 'document' and line.startswith('<') and '>' in line:
+            tag, _, value = line[1:].partition('>')
+            document[tag.lower()] = value.strip()
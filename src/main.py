@@ -5,69 +5,61 @@ Main entry point for the Financial Research Intelligence application.
 import asyncio
 import argparse
 import sys
+import time
 from pathlib import Path
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent))
 
-from src.data.data_manager import FinancialDataManager
-from src.config.settings import settings
+# Start timing imports before anything heavy is loaded
+if '--profile-startup' in sys.argv:
+    from src.utils.startup import ImportProfiler
+    startup_profiler = ImportProfiler.install()
+else:
+    startup_profiler = None
 
-async def analyze_stock(symbol: str, analysis_type: str = 'comprehensive'):
+# Connectors and analytics are loaded on first use, keeping --help and startup fast
+from src.registry import components
+
+async def analyze_stock(symbol: str, analysis_type: str = 'comprehensive', session=None,
+                        indicator_book=None):
     """
     Analyze a stock using the data integration system.
     
     Args:
         symbol: Stock symbol to analyze
         analysis_type: Type of analysis ('basic', 'comprehensive', 'technical')
+        session: Optional shared DataSession
+        indicator_book: Optional IndicatorBook for incremental technical analysis
     """
     print(f"🔍 Analyzing {symbol.upper()}...")
     
     try:
-        manager = FinancialDataManager()
+        run_analysis = components.get('run_analysis')
+        async with session or components.get('DataSession')() as session:
+            result = await run_analysis(session.manager, symbol, analysis_type, indicator_book)
         
         if analysis_type == 'basic':
-            # Basic price and info analysis
-            price_data = await manager.get_stock_data(symbol, 'price', period='1mo')
-            company_info = await manager.get_stock_data(symbol, 'info')
-            
             print(f"📈 {symbol.upper()} Analysis Results:")
-            print(f"   Current Price: ${price_data.iloc[-1]['Close']:.2f}")
-            print(f"   Company: {company_info.get('longName', 'N/A')}")
-            print(f"   Market Cap: ${company_info.get('marketCap', 0):,}")
+            print(f"   Current Price: ${result['current_price']:.2f}")
+            print(f"   Company: {result['company']}")
+            print(f"   Market Cap: ${result['market_cap']:,}")
             
         elif analysis_type == 'comprehensive':
-            # Comprehensive multi-source analysis
-            multi_data = await manager.get_multi_source_data(symbol)
-            
             print(f"📊 {symbol.upper()} Comprehensive Analysis:")
-            print(f"   Data Sources: {list(multi_data['sources'].keys())}")
-            
-            # Validate cross-source data
-            validation = await manager.validate_cross_source_data(symbol)
-            if 'price_consistency' in validation['validations']:
-                price_check = validation['validations']['price_consistency']
-                if 'is_consistent' in price_check:
-                    print(f"   Price Consistency: {'✅' if price_check['is_consistent'] else '❌'}")
+            print(f"   Data Sources: {result['sources']}")
+            if result['price_consistency'] is not None:
+                print(f"   Price Consistency: {'✅' if result['price_consistency'] else '❌'}")
             
         elif analysis_type == 'technical':
-            # Technical analysis
-            price_data = await manager.get_stock_data(symbol, 'price', period='6mo')
-            
-            # Calculate basic technical indicators
-            price_data['SMA_20'] = price_data['Close'].rolling(window=20).mean()
-            price_data['SMA_50'] = price_data['Close'].rolling(window=50).mean()
-            price_data['Volatility'] = price_data['Close'].pct_change().rolling(window=20).std() * 100
-            
-            latest = price_data.iloc[-1]
             print(f"📈 {symbol.upper()} Technical Analysis:")
-            print(f"   Current Price: ${latest['Close']:.2f}")
-            print(f"   20-Day SMA: ${latest['SMA_20']:.2f}")
-            print(f"   50-Day SMA: ${latest['SMA_50']:.2f}")
-            print(f"   20-Day Volatility: {latest['Volatility']:.2f}%")
+            print(f"   Current Price: ${result['current_price']:.2f}")
+            print(f"   20-Day SMA: ${result['sma_20']:.2f}")
+            print(f"   50-Day SMA: ${result['sma_50']:.2f}")
+            print(f"   20-Day Volatility: {result['volatility']:.2f}%")
             
             # Trend analysis
-            if latest['SMA_20'] > latest['SMA_50']:
+            if result['trend'] == 'bullish':
                 print("   Trend: 📈 Bullish (20-day SMA above 50-day SMA)")
             else:
                 print("   Trend: 📉 Bearish (20-day SMA below 50-day SMA)")
@@ -78,23 +70,288 @@ async def analyze_stock(symbol: str, analysis_type: str = 'comprehensive'):
         print(f"❌ Error analyzing {symbol}: {e}")
         return False
 
-async def health_check():
-    """Check the health of all data connectors."""
-    print("🏥 Checking System Health...")
+async def batch_scan(symbols, analysis_type: str, output_path: str, indicator_book=None):
+    """
+    Analyze many stocks concurrently and write the results to one file.
+    
+    Args:
+        symbols: Stock symbols to analyze
+        analysis_type: Type of analysis ('basic', 'comprehensive', 'technical')
+        output_path: JSON Lines (default) or '.parquet' output file
+        indicator_book: Optional IndicatorBook for incremental technical analysis
+    """
+    print(f"🔍 Scanning {len(symbols)} symbols ({analysis_type})...")
     
     try:
-        manager = FinancialDataManager()
+        from src.config.settings import settings
+        run_batch = components.get('run_batch')
+        async with components.get('DataSession')(analytics_pool=settings.ANALYTICS_POOL_ENABLED) as session:
+            report = await run_batch(symbols, analysis_type, output_path, manager=session.manager,
+                                     indicator_book=indicator_book)
+            cache_stats = session.cache.stats()
+            limiter_stats = session.limiter.stats() if session.limiter else {'connectors': {}}
+    except Exception as e:
+        print(f"❌ Batch scan failed: {e}")
+        return False
+    
+    print("\n📊 Throughput Report:")
+    print(f"   Symbols: {report['symbols']} ({report['succeeded']} ok, {report['failed']} failed)")
+    print(f"   Elapsed: {report['elapsed_s']:.2f}s")
+    print(f"   Throughput: {report['symbols_per_sec']:.2f} symbols/sec")
+    print(f"   Latency p50: {report['p50_latency_ms']:.1f} ms")
+    print(f"   Latency p95: {report['p95_latency_ms']:.1f} ms")
+    print(f"   Results: {report['output']}")
+    memory = cache_stats['memory']
+    print(f"   Cache: {memory['hits']} hits, {memory['misses']} misses, {memory['evictions']} evictions")
+    for name, stat in limiter_stats['connectors'].items():
+        print(f"   Rate limit {name}: {stat['acquired']} calls, avg wait {stat['wait_avg_ms']:.1f} ms, "
+              f"max wait {stat['wait_max_ms']:.1f} ms, {stat['rate_limited']} x 429")
+    return report['failed'] == 0
+
+async def stream_quotes(symbols, interval=None):
+    """
+    Poll quotes for a watched universe and publish ticks until interrupted.
+    
+    Args:
+        symbols: Stock symbols to watch
+        interval: Seconds between polls (settings default if None)
+    """
+    from src.streaming import QuoteProducer, create_broker
+    
+    if not symbols:
+        print("❌ No symbols to stream (use --symbols or --universe-file)")
+        return False
+    
+    print(f"📡 Streaming quotes for {len(symbols)} symbols...")
+    
+    broker = create_broker()
+    async with components.get('DataSession')() as session:
+        producer = QuoteProducer(session.manager, broker, symbols, interval=interval)
+        try:
+            while True:
+                published = await producer.poll_once()
+                stats = producer.stats()
+                print(f"   Poll {stats['polls']}: {published} ticks published "
+                      f"({stats['published']} total, {stats['errors']} errors)")
+                await asyncio.sleep(producer.interval)
+        finally:
+            await broker.close()
+
+def build_universe(output_dir: str, symbols=None):
+    """
+    Pack stored price history into a memory-mapped universe matrix.
+    
+    Args:
+        output_dir: Directory for the matrix files
+        symbols: Symbols to include (every stored symbol if empty)
+    """
+    print(f"🧱 Building universe matrix in {output_dir}...")
+    
+    try:
+        matrix = components.get('build_universe_matrix')(output_dir, symbols or None)
+    except Exception as e:
+        print(f"❌ Universe build failed: {e}")
+        return False
+    
+    fields, n_symbols, n_dates = matrix.shape
+    print(f"✅ {n_symbols} symbols x {n_dates} dates x {fields} fields ({matrix.values.dtype})")
+    return True
+
+def reconcile(source_dirs, output_path: str, symbols=None):
+    """
+    Reconcile the universe matrices of several sources and write the anomaly report.
+    
+    Args:
+        source_dirs: 'name=dir' entries, one per source; the first is the reference
+        output_path: Anomaly report file (.jsonl or .parquet)
+        symbols: Symbols to compare (every reference symbol if empty)
+    """
+    print(f"🔍 Reconciling {len(source_dirs)} sources...")
+    
+    try:
+        sources = {}
+        for entry in source_dirs:
+            name, sep, path = entry.partition('=')
+            if not sep or not name or not path:
+                raise ValueError(f"expected NAME=DIR, got {entry!r}")
+            sources[name] = path
+        report = components.get('reconcile_universe')(sources, symbols=symbols or None)
+        components.get('write_anomalies')(report['anomalies'], output_path)
+    except Exception as e:
+        print(f"❌ Reconciliation failed: {e}")
+        return False
+    
+    summary = report['summary']
+    print(f"✅ {summary['symbols']} symbols x {summary['sessions']} sessions in {summary['elapsed_s']:.2f}s "
+          f"(reference: {summary['reference']})")
+    for name, coverage in summary['sources'].items():
+        print(f"   {name}: {coverage['symbols']} shared symbols, {coverage['bars_compared']} bars compared, "
+              f"{coverage['missing_symbols']} symbols missing")
+    for check, episodes in sorted(summary['episodes'].items()):
+        print(f"   ⚠️  {check}: {episodes} episodes, {summary['flagged_bars'][check]} bars")
+    print(f"📄 {len(report['anomalies'])} anomalies in {summary['symbols_flagged']} symbols written to {output_path}")
+    return True
+
+async def ingest_sec_filings(paths, symbols=None, filing_types=None):
+    """
+    Download (optionally) and index SEC filings for full-text and fact search.
+    
+    Args:
+        paths: Filing files or directories (settings.SEC_DATA_DIR if empty)
+        symbols: Download these tickers' latest filings first
+        filing_types: Forms to download ('10-K', '10-Q', '8-K', ...)
+    """
+    from src.config.settings import settings
+    paths = paths or [settings.SEC_DATA_DIR]
+    print(f"📥 Ingesting SEC filings from {', '.join(paths)} into the {settings.FILINGS_INDEX_BACKEND} index...")
+    
+    executor = index = None
+    try:
+        if symbols:
+            async with components.get('DataSession')() as session:
+                downloads = await components.get('download_filings')(session.manager, symbols, filing_types)
+            print(f"   Downloaded {downloads['succeeded']}/{downloads['requests']} filing sets "
+                  f"in {downloads['elapsed_s']:.1f}s")
+        if settings.ANALYTICS_POOL_ENABLED:
+            from src.analysis.executor import AnalyticsExecutor
+            executor = await AnalyticsExecutor().start()
+        index = components.get('open_filing_index')()
+        report = await components.get('ingest_filings')(paths, index, executor)
+    except Exception as e:
+        print(f"❌ Filing ingestion failed: {e}")
+        return False
+    finally:
+        if index is not None:
+            await index.close()
+        if executor is not None:
+            await executor.close()
+    
+    print(f"✅ {report['indexed']} filings indexed ({report['sections']} sections, {report['facts']} facts) "
+          f"in {report['elapsed_s']:.2f}s, {report['filings_per_sec']:.1f} filings/sec")
+    print(f"   Files: {report['files']} found, {report['duplicates']} already indexed, {report['failed']} failed")
+    print(f"   Parsed: {report['bytes'] / 1e6:.1f} MB")
+    return report['failed'] == 0
+
+async def search_filings(query=None, concept=None, ticker=None):
+    """
+    Query the filing index.
+    
+    Args:
+        query: Full-text query over filing sections
+        concept: XBRL concept to list reported values of (e.g. 'Revenues')
+        ticker: Restrict results to one ticker
+    """
+    index = components.get('open_filing_index')()
+    try:
+        if query:
+            started = time.perf_counter()
+            hits = await index.search(query, ticker=ticker)
+            print(f"🔎 {len(hits)} sections match '{query}' ({(time.perf_counter() - started) * 1000:.1f} ms)")
+            for hit in hits:
+                section = f"Item {hit['item']}" if hit['item'][:1].isdigit() else hit['item']
+                print(f"   {hit['ticker']} {hit['form']} {hit['filed']} {section} {hit['title']} [{hit['score']:.2f}]")
+                print(f"      {hit['preview'][:160]}")
+        if concept:
+            started = time.perf_counter()
+            facts = await index.facts(concept, ticker=ticker, limit=20)
+            print(f"📑 {len(facts)} values of {concept} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+            for fact in facts:
+                print(f"   {fact['ticker']} {fact['period_start'] or ''}..{fact['period_end']}: "
+                      f"{fact['value']:,.2f} {fact['unit']} ({fact['form']} {fact['accession']})")
+    except Exception as e:
+        print(f"❌ Filing search failed: {e}")
+        return False
+    finally:
+        await index.close()
+    return True
+
+async def warm_cache(symbols=None):
+    """
+    Refresh the hot cache keys (and the quotes and profiles of ``symbols``) once and report coverage.
+    
+    Args:
+        symbols: Stock symbols to mark hot before warming (optional)
+    """
+    from src.config.settings import settings
+    
+    async with components.get('DataSession')(track=True) as session:
+        from src.cache import CacheWarmer
         
-        # Check available connectors
-        connectors = manager.get_available_connectors()
-        print(f"✅ Available Connectors: {connectors}")
+        # The price periods the analyses request, so their cache keys match
+        for symbol in symbols or []:
+            for period in ('5d', '1mo', '6mo'):
+                session.tracker.seed('yahoo_finance', 'get_stock_price', (symbol,), {'period': period})
+            session.tracker.seed('yahoo_finance', 'get_company_info', (symbol,))
         
-        # Check health status
-        health = manager.get_connector_health()
-        print("\n📊 Health Status:")
-        for name, status in health.items():
-            emoji = "✅" if status['status'] == 'healthy' else "❌"
-            print(f"   {emoji} {name}: {status['status']}")
+        print(f"🔥 Warming up to {settings.WARM_TOP_N} hot cache keys...")
+        warmer = CacheWarmer(session.manager, session.cache, session.tracker, session.limiter)
+        report = await warmer.run_cycle(budget=False)
+        coverage = report['coverage']
+        
+        print(f"✅ Warmed {report['refreshed']} keys in {report['elapsed_s']:.2f}s "
+              f"({report['fresh']} still fresh, {report['promoted']} from Redis, {report['failed']} failed)")
+        print(f"   Coverage: {coverage['cached']}/{coverage['hot']} hot keys "
+              f"({coverage['ratio'] * 100:.1f}%, {coverage['weighted'] * 100:.1f}% of requests)")
+        for data_type, counts in coverage['by_type'].items():
+            print(f"   {data_type}: {counts['cached']}/{counts['hot']}")
+    return report['failed'] == 0
+
+def print_metrics():
+    """Print the connector, rate-limit, cache and response statistics served at /metrics."""
+    from src.utils.metrics import metrics
+    
+    summary = metrics.summary()
+    errors = {(row['connector'], row['method'], row['layer']): row['value']
+              for row in summary.get('fri_connector_errors_total', [])}
+    
+    print("\n📈 Connector Calls (api: as callers see them, upstream: real upstream calls):")
+    calls = summary.get('fri_connector_call_seconds', [])
+    if not calls:
+        print("   No calls recorded yet")
+    for row in calls:
+        failed = errors.get((row['connector'], row['method'], row['layer']), 0)
+        print(f"   {row['connector']}.{row['method']} [{row['layer']}]: {row['count']} calls, "
+              f"avg {row['avg_ms']:.1f} ms, p95 <= {row['p95_ms']:.1f} ms, {failed} errors")
+    for row in summary.get('fri_ratelimit_wait_seconds', []):
+        print(f"   ⏳ Rate-limit wait {row['connector']}: {row['count']} tokens, "
+              f"avg {row['avg_ms']:.1f} ms, p95 <= {row['p95_ms']:.1f} ms")
+    for row in summary.get('fri_cache_hit_ratio', []):
+        print(f"   🗄️  Cache {row['tier']}: {row['value'] * 100:.1f}% hit ratio")
+    for row in summary.get('fri_stage_seconds', []):
+        print(f"   🧾 {row['stage'].capitalize()}: {row['count']} responses, avg {row['avg_ms']:.2f} ms")
+
+async def health_check(session=None, probe_symbol=None):
+    """
+    Check the health of all data connectors and print their call statistics.
+    
+    Args:
+        session: Optional shared DataSession
+        probe_symbol: Fetch this symbol from every price connector first, so
+            the statistics include a fresh upstream round trip
+    """
+    print("🏥 Checking System Health...")
+    
+    try:
+        async with session or components.get('DataSession')() as session:
+            manager = session.manager
+            
+            # Check available connectors
+            connectors = manager.get_available_connectors()
+            print(f"✅ Available Connectors: {connectors}")
+            
+            # Check health status
+            health = manager.get_connector_health()
+            print("\n📊 Health Status:")
+            for name, status in health.items():
+                emoji = "✅" if status['status'] == 'healthy' else "❌"
+                print(f"   {emoji} {name}: {status['status']}")
+            
+            if probe_symbol:
+                probes = [connector.get_stock_price(probe_symbol, period='5d')
+                          for connector in manager.connectors.values() if hasattr(connector, 'get_stock_price')]
+                await asyncio.gather(*probes, return_exceptions=True)
+            
+            print_metrics()
         
         return True
         
@@ -107,18 +364,19 @@ async def demo():
     print("🚀 Financial Research Intelligence - Demo")
     print("=" * 50)
     
-    # Health check
-    await health_check()
-    
-    print("\n" + "=" * 50)
-    
-    # Analyze multiple stocks
-    stocks = ['AAPL', 'MSFT', 'GOOGL']
-    
-    for stock in stocks:
-        print(f"\n📊 Analyzing {stock}...")
-        await analyze_stock(stock, 'basic')
-        await asyncio.sleep(1)  # Rate limiting
+    # One session, so every step reuses the same connections
+    async with components.get('DataSession')() as session:
+        # Health check
+        await health_check(session)
+        
+        print("\n" + "=" * 50)
+        
+        # Analyze multiple stocks (the shared rate limiter paces the requests)
+        stocks = ['AAPL', 'MSFT', 'GOOGL']
+        
+        for stock in stocks:
+            print(f"\n📊 Analyzing {stock}...")
+            await analyze_stock(stock, 'basic', session)
     
     print("\n" + "=" * 50)
     print("🎉 Demo completed!")
@@ -135,6 +393,25 @@ def main():
         help='Stock symbol to analyze (e.g., AAPL)'
     )
     
+    parser.add_argument(
+        '--symbols',
+        type=str,
+        nargs='+',
+        help='Stock symbols to scan in batch mode (space or comma separated)'
+    )
+    
+    parser.add_argument(
+        '--universe-file',
+        type=str,
+        help='File with one stock symbol per line to scan in batch mode'
+    )
+    
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        help='Batch results or anomaly report file (.jsonl or .parquet)'
+    )
+    
     parser.add_argument(
         '--analysis', '-a',
         type=str,
@@ -143,10 +420,73 @@ def main():
         help='Type of analysis to perform'
     )
     
+    parser.add_argument(
+        '--build-universe',
+        type=str,
+        metavar='DIR',
+        help='Pack stored price history for --symbols/--universe-file (default: all) into a memory-mapped matrix'
+    )
+    
+    parser.add_argument(
+        '--reconcile',
+        type=str,
+        nargs='+',
+        metavar='NAME=DIR',
+        help='Reconcile universe matrices of two or more sources (the first is the reference)'
+    )
+    
+    parser.add_argument(
+        '--ingest-filings',
+        type=str,
+        nargs='*',
+        metavar='PATH',
+        help='Index downloaded SEC filings (default: SEC_DATA_DIR); with --symbols/--universe-file, download them first'
+    )
+    
+    parser.add_argument(
+        '--filing-types',
+        type=str,
+        nargs='+',
+        default=['10-K', '10-Q', '8-K'],
+        help='Filing forms to download with --ingest-filings'
+    )
+    
+    parser.add_argument(
+        '--search-filings',
+        type=str,
+        metavar='QUERY',
+        help='Full-text search of indexed filings (with --symbol, one ticker only)'
+    )
+    
+    parser.add_argument(
+        '--filing-facts',
+        type=str,
+        metavar='CONCEPT',
+        help='List reported XBRL values of a concept, e.g. Revenues (with --symbol, one ticker only)'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Publish live quote ticks for --symbols/--universe-file until interrupted'
+    )
+    
+    parser.add_argument(
+        '--indicator-state',
+        type=str,
+        help='JSON file holding incremental indicator state for technical analysis'
+    )
+    
+    parser.add_argument(
+        '--warm',
+        action='store_true',
+        help='Refresh the most requested cache entries (and --symbols) once and report coverage'
+    )
+    
     parser.add_argument(
         '--health', '-H',
         action='store_true',
-        help='Check system health'
+        help='Check system health and print call statistics (with --symbol, probe it first)'
     )
     
     parser.add_argument(
@@ -155,22 +495,92 @@ def main():
         help='Run demonstration'
     )
     
+    parser.add_argument(
+        '--record',
+        type=str,
+        metavar='DIR',
+        help='Record every upstream response into a replay cassette'
+    )
+    
+    parser.add_argument(
+        '--replay',
+        type=str,
+        metavar='DIR',
+        help='Serve all data from a recorded cassette instead of the live sources'
+    )
+    
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Print an import-time breakdown of startup and the command run'
+    )
+    
     args = parser.parse_args()
+    if args.record or args.replay:
+        from src.config.settings import settings
+        settings.RECORD_DIR = args.record or settings.RECORD_DIR
+        settings.REPLAY_DIR = args.replay or settings.REPLAY_DIR
+    indicator_book = components.get('IndicatorBook').load(args.indicator_state) if args.indicator_state else None
     
+    # Every command reports success, so scripted runs can check the exit status
+    ok = True
     if args.health:
-        asyncio.run(health_check())
+        ok = asyncio.run(health_check(probe_symbol=args.symbol))
+    elif args.warm:
+        symbols = args.symbols or ([args.symbol] if args.symbol else None)
+        ok = asyncio.run(warm_cache(components.get('load_universe')(symbols, args.universe_file)))
     elif args.demo:
         asyncio.run(demo())
+    elif args.build_universe:
+        ok = build_universe(args.build_universe, components.get('load_universe')(args.symbols, args.universe_file))
+    elif args.reconcile:
+        symbols = components.get('load_universe')(args.symbols, args.universe_file)
+        ok = reconcile(args.reconcile, args.output or 'reconciliation.jsonl', symbols)
+    elif args.ingest_filings is not None:
+        symbols = components.get('load_universe')(args.symbols, args.universe_file) \
+            if args.symbols or args.universe_file else None
+        ok = asyncio.run(ingest_sec_filings(args.ingest_filings, symbols, args.filing_types))
+    elif args.search_filings or args.filing_facts:
+        ok = asyncio.run(search_filings(args.search_filings, args.filing_facts, args.symbol))
+    elif args.stream:
+        symbols = components.get('load_universe')(args.symbols, args.universe_file)
+        try:
+            ok = asyncio.run(stream_quotes(symbols)) is not False
+        except KeyboardInterrupt:
+            print("\n🛑 Quote stream stopped")
+    elif args.symbols or args.universe_file:
+        symbols = components.get('load_universe')(args.symbols, args.universe_file)
+        ok = asyncio.run(batch_scan(symbols, args.analysis, args.output or 'batch_results.jsonl', indicator_book))
     elif args.symbol:
-        asyncio.run(analyze_stock(args.symbol, args.analysis))
+        ok = asyncio.run(analyze_stock(args.symbol, args.analysis, indicator_book=indicator_book))
     else:
         print("Financial Research Intelligence & Investment Analysis Generator")
         print("=" * 60)
         print("Usage:")
         print("  python -m src.main --symbol AAPL --analysis comprehensive")
+        print("  python -m src.main --symbols AAPL MSFT GOOGL --output results.jsonl")
+        print("  python -m src.main --universe-file universe.txt --analysis technical")
+        print("  python -m src.main --build-universe data/universe --universe-file universe.txt")
+        print("  python -m src.main --reconcile yahoo=data/universe alpha_vantage=data/universe_av")
+        print("  python -m src.main --ingest-filings data/sec_edgar")
+        print('  python -m src.main --search-filings "supply chain" --symbol AAPL')
         print("  python -m src.main --health")
+        print("  python -m src.main --warm --symbols AAPL MSFT")
         print("  python -m src.main --demo")
+        print("  python -m src.main --stream --symbols AAPL MSFT")
+        print("  python -m src.main --health --profile-startup")
+        print("  python -m src.main --symbol AAPL --record data/cassette")
+        print("  python -m src.main --symbols AAPL MSFT --replay data/cassette")
         print("\nFor more information, run: python -m src.main --help")
+    
+    if indicator_book is not None:
+        indicator_book.save(args.indicator_state)
+    
+    if startup_profiler is not None:
+        print()
+        print(startup_profiler.report(load_times=components.load_times))
+    
+    sys.exit(0 if ok else 1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,43 +1,85 @@
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import JSONResponse
-from src.data.data_manager import FinancialDataManager as DataManager
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Query, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from src.config.settings import settings
+from src.runtime import DataSession
+from src.streaming.broker import create_broker
+from src.streaming.hub import QuoteHub
+from src.streaming.ticks import decode_tick
+from src.utils import SingleFlight
+from src.utils.fanout import fan_out, unique_symbols
+from src.utils.metrics import PROMETHEUS_MEDIA_TYPE, TimingMiddleware, metrics
+from src.utils.serialization import (FORMATS, JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE, dumps, frame_response,
+                                     ndjson_line, to_columnar, to_records)
 from loguru import logger
 
-app = FastAPI(title="Financial Research Intelligence API", version="0.1.0")
-data_manager = DataManager()
+session = DataSession(analytics_pool=settings.ANALYTICS_POOL_ENABLED, warm=settings.WARM_ENABLED)
+fred_requests = SingleFlight()
+quote_broker = create_broker()
+quote_hub = QuoteHub(quote_broker)
+filing_index = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The manager, its connectors, the cache and the pooled HTTP client are
+    # built here rather than at import, so workers boot and respawn quickly
+    async with session:
+        producer_task = None
+        watched = unique_symbols(settings.STREAM_SYMBOLS.split(','))
+        if watched:
+            from src.streaming.producer import QuoteProducer
+            producer = QuoteProducer(session.manager, quote_broker, watched)
+            producer_task = asyncio.ensure_future(producer.run())
+        try:
+            yield
+        finally:
+            if producer_task is not None:
+                producer_task.cancel()
+            await quote_hub.close()
+            await quote_broker.close()
+            await close_filing_index()
+
+app = FastAPI(title="Financial Research Intelligence API", version="0.1.0", lifespan=lifespan)
+if settings.METRICS_ENABLED:
+    app.add_middleware(TimingMiddleware, header=settings.METRICS_TIMING_HEADER)
+
+FORMAT_QUERY = Query(
+    "records",
+    alias="format",
+    pattern=f"^({'|'.join(FORMATS)})$",
+    description="Response format: records, columnar or arrow",
+)
 
 @app.get("/health", tags=["Health"])
 def health():
     return {"status": "ok"}
 
+@app.get("/cache/stats", tags=["Health"])
+def cache_stats():
+    return session.cache.stats()
+
+@app.get("/cache/warm", tags=["Health"])
+def cache_warm_stats():
+    return session.stats()['warm']
+
+@app.get("/ratelimit/stats", tags=["Health"])
+def rate_limit_stats():
+    return session.limiter.stats() if session.limiter else {}
+
+@app.get("/metrics", tags=["Health"])
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
 @app.get("/stock/price", tags=["Stock"])
-async def get_stock_price(symbol: str = Query(..., description="Stock ticker symbol")):
+async def get_stock_price(symbol: str = Query(..., description="Stock ticker symbol"),
+                          fmt: str = FORMAT_QUERY):
     try:
-        df = await data_manager.connectors['yahoo_finance'].get_stock_price(symbol)
-        # Convert datetime objects to strings for JSON serialization
-        df_copy = df.copy()
-        
-        # Convert index to string if it's datetime
-        if hasattr(df_copy.index, 'strftime'):
-            df_copy.index = df_copy.index.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Convert all object columns to strings
-        for col in df_copy.columns:
-            if df_copy[col].dtype == 'object':
-                df_copy[col] = df_copy[col].astype(str)
-        
-        # Convert to records and ensure all values are JSON serializable
-        records = df_copy.tail(30).to_dict(orient="records")
-        
-        # Convert any remaining non-serializable objects
-        for record in records:
-            for key, value in record.items():
-                if hasattr(value, 'isoformat'):  # datetime objects
-                    record[key] = value.isoformat()
-                elif hasattr(value, 'strftime'):  # timestamp objects
-                    record[key] = value.strftime('%Y-%m-%d %H:%M:%S')
-        
-        return JSONResponse(records)
+        df = await session.manager.connectors['yahoo_finance'].get_stock_price(symbol)
+        return frame_response(df, fmt, rows=30)
     except Exception as e:
         logger.error(f"Error fetching stock price: {e}")
         import traceback
@@ -47,31 +89,209 @@ async def get_stock_price(symbol: str = Query(..., description="Stock ticker sym
 @app.get("/stock/info", tags=["Stock"])
 async def get_company_info(symbol: str = Query(..., description="Stock ticker symbol")):
     try:
-        info = await data_manager.connectors['yahoo_finance'].get_company_info(symbol)
+        info = await session.manager.connectors['yahoo_finance'].get_company_info(symbol)
         return info
     except Exception as e:
         logger.error(f"Error fetching company info: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/stock/financials", tags=["Stock"])
-async def get_financials(symbol: str = Query(..., description="Stock ticker symbol")):
+async def get_financials(symbol: str = Query(..., description="Stock ticker symbol"),
+                         fmt: str = FORMAT_QUERY):
     try:
-        df = await data_manager.connectors['yahoo_finance'].get_financial_statements(symbol)
-        return JSONResponse(df.to_dict(orient="records"))
+        df = await session.manager.connectors['yahoo_finance'].get_financial_statements(symbol)
+        return frame_response(df, fmt)
     except Exception as e:
         logger.error(f"Error fetching financials: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class PriceBatchRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, description="Stock ticker symbols")
+    period: str = Field("1mo", description="History period, e.g. 1mo, 6mo, 1y")
+    fields: Optional[List[str]] = Field(None, description="Columns to return (all if omitted)")
+    rows: Optional[int] = Field(30, ge=1, description="Trailing rows per symbol (all if null)")
+    format: str = Field("records", pattern="^(records|columnar)$", description="records or columnar")
+
+class InfoBatchRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, description="Stock ticker symbols")
+    fields: Optional[List[str]] = Field(None, description="Info keys to return (all if omitted)")
+
+def batch_symbols(symbols: List[str]) -> List[str]:
+    unique = unique_symbols(symbols)
+    if not unique:
+        raise HTTPException(status_code=422, detail="No symbols given")
+    if len(unique) > settings.API_BATCH_MAX_SYMBOLS:
+        raise HTTPException(status_code=422,
+                            detail=f"At most {settings.API_BATCH_MAX_SYMBOLS} symbols per request")
+    return unique
+
+def stream_batch(symbols: List[str], fetch, encode) -> StreamingResponse:
+    """
+    Fetch symbols concurrently and stream one NDJSON line per symbol as it completes.
+
+    Each line is {"symbol", "status": "ok", "latency_ms", "data"} or
+    {"symbol", "status": "error", "latency_ms", "error"}.
+    """
+    async def lines():
+        async for result in fan_out(symbols, fetch, settings.API_BATCH_CONCURRENCY):
+            row = {'symbol': result.key, 'status': 'ok' if result.error is None else 'error',
+                   'latency_ms': result.elapsed_ms}
+            if result.error is None:
+                try:
+                    with metrics.timer('fri_stage_seconds', 'encode', stage='encode'):
+                        row['data'] = encode(result.value)
+                except Exception as e:
+                    row['status'], row['error'] = 'error', str(e)
+            else:
+                logger.error(f"Error fetching {result.key} in batch: {result.error}")
+                row['error'] = str(result.error)
+            with metrics.timer('fri_stage_seconds', 'serialize', stage='serialize'):
+                line = ndjson_line(row)
+            yield line
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+@app.post("/stock/prices", tags=["Stock"])
+async def get_stock_prices(request: PriceBatchRequest):
+    symbols = batch_symbols(request.symbols)
+    connector = session.manager.connectors['yahoo_finance']
+    encoder = to_columnar if request.format == 'columnar' else to_records
+
+    def encode(df):
+        if request.fields:
+            df = df[[column for column in request.fields if column in df.columns]]
+        return encoder(df, request.rows)
+
+    return stream_batch(symbols, lambda symbol: connector.get_stock_price(symbol, period=request.period), encode)
+
+@app.post("/stock/info", tags=["Stock"])
+async def get_companies_info(request: InfoBatchRequest):
+    symbols = batch_symbols(request.symbols)
+    connector = session.manager.connectors['yahoo_finance']
+
+    def encode(info):
+        if request.fields and isinstance(info, dict):
+            return {key: info.get(key) for key in request.fields}
+        return info
+
+    return stream_batch(symbols, connector.get_company_info, encode)
+
+async def get_fred_observations(series_id: str):
+    """
+    Fetch FRED observations for a series.
+
+    Concurrent requests for the same series share one upstream fetch.
+    """
+    fred = session.manager.connectors.get('fred')
+    if not fred:
+        raise HTTPException(status_code=404, detail="FRED connector not available")
+    return await fred_requests.do(series_id.upper(), lambda: fred._fetch_observations(series_id))
+
 @app.get("/economic/indicator", tags=["Economic"])
-def get_economic_indicator(series_id: str = Query(..., description="FRED series ID")):
+async def get_economic_indicator(series_id: str = Query(..., description="FRED series ID"),
+                                 fmt: str = FORMAT_QUERY):
     try:
-        fred = data_manager.connectors.get('fred')
-        if not fred:
-            raise HTTPException(status_code=404, detail="FRED connector not available")
-        import asyncio
-        loop = asyncio.get_event_loop()
-        df = loop.run_until_complete(fred._fetch_observations(series_id))
-        return JSONResponse(df.tail(30).to_dict(orient="records"))
+        df = await get_fred_observations(series_id)
+        return frame_response(df, fmt, rows=30)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching economic indicator: {e}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def get_filing_index():
+    """The filing index, opened on first use so startup does not load it."""
+    global filing_index
+    if filing_index is None:
+        from src.filings import open_filing_index
+        filing_index = open_filing_index(session.http_client)
+    return filing_index
+
+async def close_filing_index():
+    global filing_index
+    if filing_index is not None:
+        index, filing_index = filing_index, None
+        await index.close()
+
+@app.get("/filings/search", tags=["Filings"])
+async def search_filings(q: str = Query(..., min_length=1, description="Full-text query"),
+                         ticker: Optional[str] = Query(None, description="Restrict to one ticker"),
+                         form: Optional[str] = Query(None, description="Restrict to one form, e.g. 10-K"),
+                         limit: int = Query(10, ge=1, le=100)):
+    try:
+        results = await get_filing_index().search(q, limit, ticker, form)
+        return Response(content=dumps({'query': q, 'results': results}), media_type=JSON_MEDIA_TYPE)
+    except Exception as e:
+        logger.error(f"Error searching filings: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/filings/facts", tags=["Filings"])
+async def get_filing_facts(concept: str = Query(..., description="XBRL concept, e.g. Revenues or us-gaap:Revenues"),
+                           ticker: Optional[str] = Query(None, description="Restrict to one ticker"),
+                           period: Optional[str] = Query(None, description="Period end prefix: 2023, 2023-09 or 2023-09-30"),
+                           dimensional: bool = Query(False, description="Include segment/dimension breakdowns"),
+                           limit: int = Query(100, ge=1, le=1000)):
+    try:
+        facts = await get_filing_index().facts(concept, ticker, period, limit, dimensional)
+        return Response(content=dumps({'concept': concept, 'facts': facts}), media_type=JSON_MEDIA_TYPE)
+    except Exception as e:
+        logger.error(f"Error fetching filing facts: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.websocket("/ws/quotes")
+async def quotes_socket(websocket: WebSocket,
+                        symbols: Optional[str] = Query(None, description="Comma separated symbols (all if omitted)"),
+                        fmt: str = Query("json", alias="format", pattern="^(json|binary)$")):
+    """
+    Live quote ticks.
+
+    Ticks are sent as JSON text frames, or as binary tick frames with
+    format=binary. Clients can change their filter by sending
+    {"action": "subscribe" | "unsubscribe", "symbols": [...]}; malformed
+    messages are answered with {"status": "error", "error": ...}. A client
+    that reads slowly receives the latest tick per symbol rather than a
+    backlog.
+    """
+    await websocket.accept()
+    subscriber = quote_hub.subscribe(unique_symbols(symbols.split(',')) if symbols else None)
+
+    async def send():
+        while True:
+            for payload in await subscriber.next_batch():
+                if fmt == 'binary':
+                    await websocket.send_bytes(payload)
+                else:
+                    await websocket.send_text(dumps(decode_tick(payload).to_dict()).decode('utf-8'))
+
+    async def reject(error: str):
+        await websocket.send_text(dumps({'status': 'error', 'error': error}).decode('utf-8'))
+
+    async def receive():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            if not isinstance(message, dict) or message.get('action') not in ('subscribe', 'unsubscribe'):
+                await reject('Expected {"action": "subscribe" | "unsubscribe", "symbols": [...]}')
+                continue
+            requested = message.get('symbols')
+            if not isinstance(requested, list) or not all(isinstance(s, str) and s for s in requested):
+                await reject('"symbols" must be a list of symbol strings')
+                continue
+            if message['action'] == 'subscribe':
+                subscriber.subscribe(requested)
+            else:
+                subscriber.unsubscribe(requested)
+
+    tasks = [asyncio.ensure_future(send()), asyncio.ensure_future(receive())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                logger.error(f"Quote socket error: {error}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        quote_hub.unsubscribe(subscriber)
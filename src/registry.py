@@ -0,0 +1,93 @@
+"""
+Lazy registry for connectors' manager and heavy analytics modules.
+
+Entries are ``"module:attribute"`` strings that are imported on first use,
+so the CLI and API workers only pay for pandas, the data connectors and
+their dependencies when a command or request actually needs them. Load
+times are recorded for ``--profile-startup``.
+"""
+
+import importlib
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class LazyRegistry:
+    """Name to ``"module:attribute"`` mapping resolved on first access."""
+
+    def __init__(self, entries: Optional[Dict[str, str]] = None):
+        self._targets: Dict[str, str] = dict(entries or {})
+        self._loaded: Dict[str, Any] = {}
+        self.load_times: Dict[str, float] = {}
+
+    def register(self, name: str, target: str):
+        """Register (or replace) a component; replacing drops the loaded object."""
+        self._targets[name] = target
+        self._loaded.pop(name, None)
+
+    def names(self) -> Iterable[str]:
+        return list(self._targets)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def get(self, name: str) -> Any:
+        """
+        Resolve a component, importing its module on first use.
+
+        Raises:
+            KeyError: If the name is not registered
+        """
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        if name not in self._targets:
+            raise KeyError(f"Unknown component: {name}")
+        module_name, _, attribute = self._targets[name].partition(':')
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        value = getattr(module, attribute) if attribute else module
+        self.load_times[name] = time.perf_counter() - started
+        self._loaded[name] = value
+        return value
+
+    __getitem__ = get
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._targets
+
+
+components = LazyRegistry({
+    'FinancialDataManager': 'src.data.data_manager:FinancialDataManager',
+    'DataSession': 'src.runtime:DataSession',
+    'run_analysis': 'src.analysis.runner:run_analysis',
+    'run_batch': 'src.analysis.batch:run_batch',
+    'load_universe': 'src.analysis.batch:load_universe',
+    'IndicatorBook': 'src.analysis.incremental:IndicatorBook',
+    'build_universe_matrix': 'src.storage.universe:build_universe_matrix',
+    'reconcile_universe': 'src.analysis.reconcile:reconcile_universe',
+    'write_anomalies': 'src.analysis.reconcile:write_anomalies',
+    'ingest_filings': 'src.filings.ingest:ingest_filings',
+    'download_filings': 'src.filings.ingest:download_filings',
+    'open_filing_index': 'src.filings.index:open_filing_index',
+})
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Build a module ``__getattr__`` that imports a package's exports on demand.
+
+    Args:
+        package: The package's ``__name__``
+        exports: Exported name to relative submodule (e.g. ``'.runner'``)
+    """
+    def __getattr__(name: str) -> Any:
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    return __getattr__
@@ -0,0 +1,191 @@
+"""
+Assembly of the data access layers shared by the CLI and the API.
+
+The layers, the HTTP client and the FinancialDataManager are imported when
+a session is opened rather than when this module is, so CLI commands and
+API workers start without loading the data stack.
+"""
+
+import inspect
+from typing import Any, Dict, Optional
+
+
+def install_data_layers(manager, limiter: Optional['TokenBucketLimiter'] = None,
+                        influx_sink: Optional['InfluxSink'] = None,
+                        influx_reader: Optional['InfluxReader'] = None,
+                        tracker: Optional['AccessTracker'] = None) -> 'TieredCache':
+    """
+    Wrap a manager's connectors with the local price store, the Influx
+    layers, the shared rate limiter, the cache and (with
+    settings.METRICS_ENABLED) call timers outside and at the bottom of it all.
+
+    The price store sits beneath the cache, so cache misses for price
+    history only fetch the bars the store is missing; the rate limiter sits
+    directly around the connectors, so only real upstream calls take tokens.
+
+    Args:
+        manager: FinancialDataManager to configure
+        limiter: Rate limiter to share (a new one if not given and
+            settings.RATE_LIMIT_ENABLED)
+        influx_sink: Started InfluxSink receiving upstream bars (optional)
+        influx_reader: InfluxReader serving closed-range history (optional)
+        tracker: AccessTracker the cache reports requests to (optional)
+
+    Returns:
+        The manager's TieredCache
+    """
+    from src.cache import install_cache
+    from src.config.settings import settings
+    from src.storage import install_price_store
+    from src.utils.rate_limiter import install_rate_limiter
+
+    install_price_store(manager)
+    if influx_sink is not None:
+        from src.storage.influx import install_influx
+        install_influx(manager, influx_sink, influx_reader)
+    if limiter is not None or settings.RATE_LIMIT_ENABLED:
+        install_rate_limiter(manager, limiter)
+    cache = install_cache(manager, tracker=tracker)
+    if settings.METRICS_ENABLED:
+        from src.utils.metrics import install_metrics
+        install_metrics(manager)
+    return cache
+
+
+class DataSession:
+    """
+    A FinancialDataManager with its data layers and pooled HTTP client.
+
+    With ``analytics_pool=True`` the session also starts an AnalyticsExecutor
+    (``manager.analytics_executor``) so CPU-heavy analysis runs off the event
+    loop; the API and batch scans use it, single CLI analyses do not.
+
+    With settings.REPLAY_DIR set the manager is a ReplayManager serving that
+    cassette instead of the live sources; with settings.RECORD_DIR set every
+    upstream response is recorded into it (see src.storage.replay).
+
+    With settings.WARM_ENABLED (or ``track=True``) the cache reports
+    requests to an AccessTracker (``session.tracker``), saved when the
+    session closes; ``warm=True`` also starts a CacheWarmer
+    (``session.warmer``) refreshing the hottest keys before they expire.
+
+    The session is an async context manager that can be entered again while
+    open (nested ``async with`` blocks share it); the cache, rate limiter,
+    HTTP client and manager are closed when the outermost block exits.
+
+    Example::
+
+        async with DataSession() as session:
+            await run_analysis(session.manager, 'AAPL')
+    """
+
+    def __init__(self, manager=None, limiter: Optional['TokenBucketLimiter'] = None,
+                 analytics_pool: bool = False, warm: bool = False, track: Optional[bool] = None):
+        self._manager = manager
+        self.limiter = limiter
+        self.analytics_pool = analytics_pool
+        self.analytics_executor = None
+        self.warm = warm
+        self.track = track
+        self.tracker: Optional['AccessTracker'] = None
+        self.warmer: Optional['CacheWarmer'] = None
+        self.manager = None
+        self.cache: Optional['TieredCache'] = None
+        self.http_client = None
+        self.influx_sink = None
+        self._depth = 0
+
+    async def open(self) -> 'DataSession':
+        """Build the manager and its layers (no-op if already open)."""
+        if self.manager is None:
+            from src.config.settings import settings
+            from src.registry import components
+            from src.utils.http import create_http_client, share_http_client
+            from src.utils.rate_limiter import TokenBucketLimiter
+
+            if self._manager is None and settings.REPLAY_DIR:
+                from src.storage.replay import ReplayManager
+                self._manager = ReplayManager(settings.REPLAY_DIR)
+            elif self._manager is None:
+                self._manager = components.get('FinancialDataManager')()
+            self.manager = self._manager
+            self.http_client = create_http_client()
+            share_http_client(self.manager, self.http_client)
+            self.limiter = self.limiter or (TokenBucketLimiter() if settings.RATE_LIMIT_ENABLED else None)
+            reader = None
+            if settings.INFLUX_ENABLED:
+                from src.storage.influx import InfluxReader, InfluxSink
+                self.influx_sink = await InfluxSink(self.http_client).start()
+                reader = InfluxReader(self.http_client)
+            if settings.WARM_ENABLED if self.track is None else self.track:
+                from src.cache import AccessTracker
+                self.tracker = AccessTracker()
+            self.cache = install_data_layers(self.manager, self.limiter, self.influx_sink, reader, self.tracker)
+            if settings.RECORD_DIR:
+                from src.storage.replay import install_recorder
+                install_recorder(self.manager, settings.RECORD_DIR)
+            if self.analytics_pool:
+                from src.analysis.executor import AnalyticsExecutor
+                self.analytics_executor = await AnalyticsExecutor().start()
+                self.manager.analytics_executor = self.analytics_executor
+            if self.warm and self.tracker is not None:
+                from src.cache import CacheWarmer
+                self.warmer = await CacheWarmer(self.manager, self.cache, self.tracker, self.limiter).start()
+            if settings.METRICS_ENABLED:
+                from src.utils.metrics import metrics, session_samples
+                metrics.add_collector('session', lambda: session_samples(self.stats()))
+        return self
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache, warmer, rate limiter, analytics pool and Influx sink counters of an open session."""
+        return {
+            'cache': self.cache.stats() if self.cache is not None else {},
+            'rate_limits': self.limiter.stats() if self.limiter is not None else {},
+            'analytics': self.analytics_executor.stats() if self.analytics_executor is not None else {},
+            'influx': self.influx_sink.stats() if self.influx_sink is not None else {},
+            'warm': (self.warmer.stats() if self.warmer is not None
+                     else {'tracker': self.tracker.stats()} if self.tracker is not None else {}),
+        }
+
+    async def close(self):
+        """Stop the warmer, save the tracker, then close the pool, cache, Influx sink, limiter, client and manager."""
+        if self.manager is None:
+            return
+        from src.utils.metrics import metrics
+        metrics.remove_collector('session')
+        if self.warmer is not None:
+            await self.warmer.close()
+            self.warmer = None
+        if self.tracker is not None:
+            await self.tracker.save()
+            self.tracker = None
+        if self.analytics_executor is not None:
+            await self.analytics_executor.close()
+            self.analytics_executor = None
+        if self.influx_sink is not None:
+            await self.influx_sink.close()
+            self.influx_sink = None
+        if self.cache is not None:
+            await self.cache.close()
+        if self.limiter is not None:
+            await self.limiter.close()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        close = getattr(self.manager, 'aclose', None) or getattr(self.manager, 'close', None)
+        if close is not None:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        self.manager = None
+        self._manager = None
+        self.http_client = None
+
+    async def __aenter__(self) -> 'DataSession':
+        await self.open()
+        self._depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0:
+            await self.close()
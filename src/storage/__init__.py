@@ -0,0 +1,33 @@
+"""
+Local storage for market data.
+
+Exports are imported on first use, so importing the package stays cheap.
+"""
+
+from src.registry import lazy_exports
+
+__all__ = [
+    'PriceStore',
+    'install_price_store',
+    'UniverseMatrix',
+    'build_universe_matrix',
+    'InfluxSink',
+    'InfluxReader',
+    'install_influx',
+    'ReplayManager',
+    'install_recorder',
+    'write_synthetic_cassette',
+]
+
+__getattr__ = lazy_exports(__name__, {
+    'PriceStore': '.price_store',
+    'install_price_store': '.price_store',
+    'UniverseMatrix': '.universe',
+    'build_universe_matrix': '.universe',
+    'InfluxSink': '.influx',
+    'InfluxReader': '.influx',
+    'install_influx': '.influx',
+    'ReplayManager': '.replay',
+    'install_recorder': '.replay',
+    'write_synthetic_cassette': '.replay',
+})
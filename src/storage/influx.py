@@ -0,0 +1,464 @@
+"""
+InfluxDB time-series sink and reader.
+
+``InfluxSink`` is a write-behind buffer: price bars fetched from upstream
+and computed indicators are turned into line protocol and queued without
+waiting on the database. A background task writes them in large gzipped
+batches, as soon as ``INFLUX_BATCH_SIZE`` lines are queued or every
+``INFLUX_FLUSH_INTERVAL`` seconds. Failed writes are retried with backoff;
+batches that still fail, and lines beyond ``INFLUX_MAX_QUEUE``, are spilled
+to ``INFLUX_SPILL_DIR`` and replayed once the database is reachable again.
+
+``InfluxReader`` loads stored bars back as a price frame, and
+``InfluxHistoryConnector`` uses it to answer closed-range price requests
+(such as the price store's backfills) without going upstream.
+
+Points written::
+
+    prices,symbol=AAPL,source=yahoo_finance,tz=America/New_York Open=..,Close=..,Volume=..i <ns>
+    indicators,symbol=AAPL SMA_20=..,SMA_50=..,Volatility=.. <ns>
+"""
+
+import asyncio
+import gzip
+import io
+import math
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.cache.connector import is_closed_range
+from src.config.settings import settings
+from src.utils.connector_proxy import ConnectorProxy, wrap_connectors
+
+PRICE_MEASUREMENT = 'prices'
+INDICATOR_MEASUREMENT = 'indicators'
+
+
+def _escape_key(value: str) -> str:
+    return value.replace('\\', '\\\\').replace(',', '\\,').replace('=', '\\=').replace(' ', '\\ ')
+
+
+def _escape_measurement(value: str) -> str:
+    return value.replace('\\', '\\\\').replace(',', '\\,').replace(' ', '\\ ')
+
+
+def _series_prefix(measurement: str, tags: Dict[str, Any]) -> str:
+    parts = [_escape_measurement(measurement)]
+    parts.extend(f"{_escape_key(str(k))}={_escape_key(str(v))}" for k, v in sorted(tags.items())
+                 if v is not None and str(v) != '')
+    return ','.join(parts)
+
+
+def _field_column(name: str, values: np.ndarray) -> List[Optional[str]]:
+    """``name=value`` strings for one column, None where the value is missing."""
+    key = _escape_key(name)
+    if values.dtype.kind in 'iu':
+        return [f"{key}={v}i" for v in values.tolist()]
+    if values.dtype.kind == 'b':
+        return [f"{key}={'true' if v else 'false'}" for v in values.tolist()]
+    if values.dtype.kind == 'f':
+        return [None if v != v or math.isinf(v) else f"{key}={v!r}" for v in values.tolist()]
+    return [None] * len(values)
+
+
+def _timestamps(index) -> np.ndarray:
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.tz_convert('UTC').as_unit('ns').asi8
+
+
+def frame_to_lines(measurement: str, tags: Dict[str, Any], frame: pd.DataFrame) -> List[str]:
+    """
+    Line protocol for every row of a timestamp-indexed frame.
+
+    Numeric columns become fields (integer columns with the ``i`` suffix);
+    NaN values are left out and rows without any field are skipped.
+    """
+    if frame is None or frame.empty:
+        return []
+    prefix = _series_prefix(measurement, tags)
+    columns = [_field_column(str(name), frame[name].to_numpy()) for name in frame.columns
+               if frame[name].dtype.kind in 'iufb']
+    if not columns:
+        return []
+    lines = []
+    for stamp, fields in zip(_timestamps(frame.index).tolist(), zip(*columns)):
+        body = ','.join(field for field in fields if field is not None)
+        if body:
+            lines.append(f"{prefix} {body} {stamp}")
+    return lines
+
+
+def values_to_line(measurement: str, tags: Dict[str, Any], values: Dict[str, Any],
+                   timestamp: Any = None) -> Optional[str]:
+    """One line for a dictionary of numeric values (e.g. indicator outputs)."""
+    fields = []
+    for name, value in values.items():
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            continue
+        if number == number and not math.isinf(number):
+            fields.append(f"{_escape_key(name)}={number!r}")
+    if not fields:
+        return None
+    stamp = pd.Timestamp(timestamp) if timestamp is not None else pd.Timestamp.now(tz='UTC')
+    stamp = stamp.tz_convert('UTC') if stamp.tzinfo is not None else stamp.tz_localize('UTC')
+    return f"{_series_prefix(measurement, tags)} {','.join(fields)} {stamp.value}"
+
+
+class InfluxSink:
+    """
+    Write-behind, batched line-protocol writer.
+
+    Args:
+        client: httpx.AsyncClient to write with (a private one if None)
+        url, token, org, bucket: InfluxDB v2 connection (settings if None)
+        spill_dir: Directory for batches that could not be written
+    """
+
+    def __init__(self, client=None, url: Optional[str] = None, token: Optional[str] = None,
+                 org: Optional[str] = None, bucket: Optional[str] = None,
+                 spill_dir: Optional[str] = None):
+        self.url = (url or settings.INFLUXDB_URL).rstrip('/')
+        self.token = token if token is not None else settings.INFLUXDB_TOKEN
+        self.org = org or settings.INFLUXDB_ORG
+        self.bucket = bucket or settings.INFLUXDB_BUCKET
+        self.spill_dir = Path(spill_dir or settings.INFLUX_SPILL_DIR)
+        self._client = client
+        self._owns_client = client is None
+        self._lines: List[str] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._healthy = True
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.rejected = 0
+
+    # -- producers -------------------------------------------------------
+
+    def write_lines(self, lines: Iterable[str]):
+        """Queue lines without waiting on the database."""
+        self._lines.extend(lines)
+        if len(self._lines) > settings.INFLUX_MAX_QUEUE:
+            # Over the bound: move the oldest lines to disk rather than grow or drop
+            overflow = self._lines[:len(self._lines) - settings.INFLUX_MAX_QUEUE]
+            del self._lines[:len(overflow)]
+            self._spill(overflow)
+        if len(self._lines) >= settings.INFLUX_BATCH_SIZE:
+            self._wakeup.set()
+
+    def write_frame(self, symbol: str, frame: pd.DataFrame, source: Optional[str] = None):
+        """Queue price bars for a symbol."""
+        if frame is None or frame.empty:
+            return
+        tz = getattr(frame.index, 'tz', None)
+        tags = {'symbol': symbol.upper(), 'source': source, 'tz': str(tz) if tz is not None else None}
+        self.write_lines(frame_to_lines(PRICE_MEASUREMENT, tags, frame))
+
+    def write_indicators(self, symbol: str, values: Dict[str, Any], timestamp: Any = None):
+        """Queue one set of indicator values for a symbol."""
+        line = values_to_line(INDICATOR_MEASUREMENT, {'symbol': symbol.upper()}, values, timestamp)
+        if line is not None:
+            self.write_lines([line])
+
+    # -- background writer ----------------------------------------------
+
+    async def start(self) -> 'InfluxSink':
+        if self._client is None:
+            from src.utils.http import create_http_client
+            self._client = create_http_client()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.INFLUX_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Influx flush failed: {e}")
+
+    async def flush(self):
+        """Write everything queued, then replay spilled batches if the database is up."""
+        async with self._write_lock:
+            while self._lines:
+                batch = self._lines[:settings.INFLUX_BATCH_SIZE]
+                del self._lines[:len(batch)]
+                body = gzip.compress('\n'.join(batch).encode('utf-8'), compresslevel=5)
+                if not await self._write(body, len(batch)):
+                    # Database down: keep the rest on disk instead of retrying batch by batch
+                    self._spill(batch, body)
+                    if self._lines:
+                        self._spill(self._lines)
+                        self._lines = []
+                    return
+            if self._healthy:
+                await self._replay()
+
+    async def _write(self, body: bytes, count: int) -> bool:
+        delay = 0.5
+        for attempt in range(settings.INFLUX_MAX_RETRIES + 1):
+            try:
+                response = await self._client.post(
+                    f"{self.url}/api/v2/write",
+                    params={'org': self.org, 'bucket': self.bucket, 'precision': 'ns'},
+                    headers={'Authorization': f"Token {self.token}", 'Content-Encoding': 'gzip',
+                             'Content-Type': 'text/plain; charset=utf-8'},
+                    content=body,
+                )
+            except Exception as e:
+                status, error, retry_after = None, str(e), None
+            else:
+                status, error = response.status_code, response.text[:200]
+                retry_after = response.headers.get('Retry-After')
+                if status < 300:
+                    self._healthy = True
+                    self.written += count
+                    self.batches += 1
+                    return True
+                if status in (400, 413, 422):
+                    # The data itself is bad: retrying or spilling would not help
+                    logger.error(f"Influx rejected {count} lines ({status}): {error}")
+                    self.rejected += count
+                    return True
+            if attempt < settings.INFLUX_MAX_RETRIES:
+                self.retries += 1
+                wait = float(retry_after) if retry_after and retry_after.isdigit() else delay
+                await asyncio.sleep(wait)
+                delay *= 2
+        logger.warning(f"Influx write failed ({status or 'unreachable'}): {error}")
+        self._healthy = False
+        return False
+
+    # -- spill to disk ---------------------------------------------------
+
+    def _spill(self, lines: List[str], body: Optional[bytes] = None):
+        body = body or gzip.compress('\n'.join(lines).encode('utf-8'), compresslevel=5)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        target = self.spill_dir / f"{time.time_ns()}-{len(lines)}.lp.gz"
+        tmp = target.with_suffix('.tmp')
+        tmp.write_bytes(body)
+        tmp.replace(target)
+        self.spilled += len(lines)
+
+    async def _replay(self):
+        for path in sorted(self.spill_dir.glob('*.lp.gz')):
+            count = int(path.name.split('.')[0].rpartition('-')[2] or 0)
+            if not await self._write(path.read_bytes(), count):
+                return
+            path.unlink()
+            self.replayed += count
+
+    def pending_spill(self) -> int:
+        """Number of spilled batches waiting to be replayed."""
+        return len(list(self.spill_dir.glob('*.lp.gz'))) if self.spill_dir.exists() else 0
+
+    async def close(self):
+        """Stop the writer and flush what is left (spilling it if the database is down)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self.flush()
+            if self._owns_client:
+                await self._client.aclose()
+                self._client = None
+        elif self._lines:
+            self._spill(self._lines)
+            self._lines = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queued': len(self._lines),
+            'written': self.written,
+            'batches': self.batches,
+            'retries': self.retries,
+            'spilled': self.spilled,
+            'replayed': self.replayed,
+            'rejected': self.rejected,
+            'spill_files': self.pending_spill(),
+            'healthy': self._healthy,
+        }
+
+
+def _flux_string(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _flux_time(value: Any) -> str:
+    stamp = pd.Timestamp(value)
+    stamp = stamp.tz_convert('UTC') if stamp.tzinfo is not None else stamp.tz_localize('UTC')
+    return stamp.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class InfluxReader:
+    """Query side: stored bars back as price frames."""
+
+    def __init__(self, client, url: Optional[str] = None, token: Optional[str] = None,
+                 org: Optional[str] = None, bucket: Optional[str] = None):
+        self._client = client
+        self.url = (url or settings.INFLUXDB_URL).rstrip('/')
+        self.token = token if token is not None else settings.INFLUXDB_TOKEN
+        self.org = org or settings.INFLUXDB_ORG
+        self.bucket = bucket or settings.INFLUXDB_BUCKET
+
+    async def query_csv(self, flux: str) -> str:
+        response = await self._client.post(
+            f"{self.url}/api/v2/query", params={'org': self.org},
+            headers={'Authorization': f"Token {self.token}", 'Accept': 'application/csv',
+                     'Content-Type': 'application/json'},
+            json={'query': flux, 'dialect': {'annotations': [], 'header': True}},
+        )
+        response.raise_for_status()
+        return response.text
+
+    async def load_prices(self, symbol: str, start: Any, end: Any = None,
+                          source: str = 'yahoo_finance') -> pd.DataFrame:
+        """
+        Stored bars for a symbol in [start, end), indexed like the connector's frames.
+
+        Returns an empty frame when nothing is stored.
+        """
+        stop = _flux_time(end) if end is not None else 'now()'
+        flux = (
+            f'from(bucket: {_flux_string(self.bucket)})\n'
+            f'  |> range(start: {_flux_time(start)}, stop: {stop})\n'
+            f'  |> filter(fn: (r) => r._measurement == "{PRICE_MEASUREMENT}" and '
+            f'r.symbol == {_flux_string(symbol.upper())} and r.source == {_flux_string(source)})\n'
+            f'  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")\n'
+            f'  |> group()\n'
+            f'  |> sort(columns: ["_time"])'
+        )
+        text = await self.query_csv(flux)
+        if not text.strip():
+            return pd.DataFrame()
+        frame = pd.read_csv(io.StringIO(text))
+        frame = frame[frame['_time'] != '_time']  # headers repeated between tables
+        if frame.empty:
+            return pd.DataFrame()
+        tz = frame['tz'].dropna().iloc[0] if 'tz' in frame and frame['tz'].notna().any() else None
+        index = pd.DatetimeIndex(pd.to_datetime(frame['_time'], utc=True), name='Date')
+        index = index.tz_convert(tz) if tz else index.tz_localize(None)
+        internal = {'', 'result', 'table', '_start', '_stop', '_time', '_measurement',
+                    'symbol', 'source', 'tz'}
+        columns = [c for c in frame.columns if c not in internal and not str(c).startswith('Unnamed')]
+        data = frame[columns].apply(pd.to_numeric, errors='coerce').set_axis(index)
+        if 'Volume' in data and data['Volume'].notna().all():
+            data['Volume'] = data['Volume'].astype('int64')
+        return data
+
+
+class InfluxTap(ConnectorProxy):
+    """Queues every price frame fetched from upstream into the sink."""
+
+    def __init__(self, name: str, connector: Any, sink: InfluxSink):
+        super().__init__(connector)
+        self._name = name
+        self._sink = sink
+
+    async def _call(self, name, method, args, kwargs):
+        result = await method(*args, **kwargs)
+        if name == 'get_stock_price' and args and kwargs.get('interval', '1d') == '1d':
+            try:
+                self._sink.write_frame(args[0], result, self._name)
+            except Exception as e:
+                logger.warning(f"Could not queue {args[0]} bars for Influx: {e}")
+        return result
+
+
+def _last_session_before(end: pd.Timestamp) -> pd.Timestamp:
+    """Last weekday before ``end`` (exclusive, as in yfinance), naive midnight."""
+    session = end.tz_localize(None).normalize() - pd.Timedelta(days=1)
+    while session.weekday() >= 5:
+        session -= pd.Timedelta(days=1)
+    return session
+
+
+class InfluxHistoryConnector(ConnectorProxy):
+    """
+    Serves closed-range daily price requests from Influx when it has them.
+
+    The store must reach back to about the requested start; bars missing
+    after its last one are fetched from upstream and appended.
+    """
+
+    def __init__(self, name: str, connector: Any, reader: InfluxReader):
+        super().__init__(connector)
+        self._name = name
+        self._reader = reader
+        self.served = 0
+
+    async def _call(self, name, method, args, kwargs):
+        if name != 'get_stock_price' or not args or kwargs.get('interval', '1d') != '1d' \
+                or kwargs.get('start') is None or not is_closed_range(kwargs):
+            return await method(*args, **kwargs)
+        start = pd.Timestamp(str(kwargs['start'])[:10], tz='UTC')
+        end = pd.Timestamp(str(kwargs['end'])[:10], tz='UTC')
+        try:
+            frame = await self._reader.load_prices(args[0], start, end, source=self._name)
+        except Exception as e:
+            logger.debug(f"Influx history unavailable for {args[0]}: {e}")
+            frame = None
+        # Trust the store only if it reaches back to (about) the requested start
+        if frame is None or frame.empty or \
+                frame.index[0].tz_localize(None) > (start + pd.Timedelta(days=5)).tz_localize(None):
+            return await method(*args, **kwargs)
+        # ...and fetch whatever it is missing after its last bar from upstream
+        last = frame.index[-1].tz_localize(None).normalize()
+        if last < _last_session_before(end):
+            tail = await method(*args, **{**kwargs, 'start': (last + pd.Timedelta(days=1)).strftime('%Y-%m-%d')})
+            if tail is not None and not tail.empty:
+                if tail.index.tz != frame.index.tz:
+                    return await method(*args, **kwargs)
+                frame = pd.concat([frame, tail])
+                frame = frame[~frame.index.duplicated(keep='last')]
+        self.served += 1
+        return frame
+
+
+def install_influx(manager, sink: InfluxSink, reader: Optional[InfluxReader] = None,
+                   sources: Iterable[str] = ('yahoo_finance',)):
+    """
+    Write upstream price bars to Influx and serve closed ranges from it.
+
+    Install after the price store and before the rate limiter: the history
+    layer then answers the store's backfills without taking rate-limit
+    tokens, and the tap beneath it only sees bars fetched upstream.
+
+    Args:
+        manager: FinancialDataManager to wrap
+        sink: Started InfluxSink; also exposed as ``manager.influx_sink`` so
+            analyses can write indicator values
+        reader: Reader for closed-range history (no history layer if None)
+        sources: Connectors whose price history is written and read
+
+    Returns:
+        The same manager, for chaining
+    """
+    if reader is not None:
+        wrap_connectors(manager, lambda name, connector: InfluxHistoryConnector(name, connector, reader),
+                        InfluxHistoryConnector, innermost=True, names=sources)
+    wrap_connectors(manager, lambda name, connector: InfluxTap(name, connector, sink),
+                    InfluxTap, innermost=True, names=sources)
+    manager.influx_sink = sink
+    return manager
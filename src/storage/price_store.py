@@ -0,0 +1,411 @@
+"""
+Local columnar store for daily price history with delta fetching.
+
+Each symbol's Yahoo Finance bars live in one memory-mappable NumPy file
+(``<PRICE_STORE_DIR>/<SYMBOL>.npy``) holding a structured array with a
+UTC nanosecond ``ts`` field plus one field per numeric OHLCV column, next to
+a small JSON sidecar with the timezone and covered date range.
+
+``install_price_store`` wraps the connectors so that period-based daily
+``get_stock_price`` calls are answered from the store, fetching from
+upstream only the bars that are missing: older history the store has never
+covered, and the tail since the last stored bar (which is re-fetched so a
+still-forming bar is refreshed). Once the last stored bar belongs to a
+session that has closed and no newer session has opened, nothing is fetched.
+
+Upstream prices are split- and dividend-adjusted, so every delta fetch also
+reaches one final stored bar. If the bars it overlaps no longer match, the
+history was re-adjusted upstream: the symbol's stored bars are dropped and
+the requested period is fetched whole.
+
+Connectors that take ``start``/``end`` get exactly the missing range; for
+connectors that only take ``period`` the smallest period reaching back to
+the gap is requested instead.
+"""
+
+import asyncio
+import inspect
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.config.settings import settings
+from src.utils.connector_proxy import ConnectorProxy, unwrap, wrap_connectors
+
+# Marks a fetch whose coverage starts at its first returned bar
+_FIRST_BAR = object()
+
+# Periods yfinance expresses in trading days rather than calendar time
+_BAR_PERIODS = {'1d': 1, '5d': 5}
+_CALENDAR_PERIODS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# Relative difference at which a re-fetched stored bar counts as re-adjusted
+_REBASE_TOLERANCE = 1e-4
+
+# Periods tried, shortest first, when a connector cannot fetch a date range
+_GAP_PERIODS = ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max')
+
+# Regular session hours in exchange time; daily bars are treated as final a
+# little after the close, once late prints have settled
+_SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+_SESSION_FINAL = pd.Timedelta(hours=16, minutes=30)
+
+
+def _now(tz: str = 'UTC') -> pd.Timestamp:
+    return pd.Timestamp.now(tz=tz)
+
+
+class PriceStore:
+    """Per-symbol memory-mapped daily bars."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.PRICE_STORE_DIR)
+
+    def _data_path(self, symbol: str) -> Path:
+        return self.directory / f"{symbol.upper()}.npy"
+
+    def _meta_path(self, symbol: str) -> Path:
+        return self.directory / f"{symbol.upper()}.json"
+
+    def symbols(self):
+        """Symbols with stored history."""
+        return sorted(path.stem for path in self.directory.glob('*.npy'))
+
+    def meta(self, symbol: str) -> Dict[str, Any]:
+        """Sidecar metadata (tz, covered_from, updated_at), empty if not stored."""
+        try:
+            return json.loads(self._meta_path(symbol).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+
+    def bars(self, symbol: str) -> Optional[np.ndarray]:
+        """Read-only memory map of a symbol's structured bar array."""
+        try:
+            return np.load(self._data_path(symbol), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+
+    def load(self, symbol: str, start: Optional[pd.Timestamp] = None,
+             end: Optional[pd.Timestamp] = None, last_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Stored bars for a symbol as a DataFrame.
+
+        Only the requested slice is read from the memory map.
+
+        Args:
+            symbol: Stock symbol
+            start: First timestamp to include
+            end: Timestamp to stop before
+            last_n: Return only the last ``last_n`` bars of the range
+        """
+        bars = self.bars(symbol)
+        if bars is None:
+            return pd.DataFrame()
+        ts = bars['ts']
+        lo = 0 if start is None else int(np.searchsorted(ts, pd.Timestamp(start).value, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, pd.Timestamp(end).value, side='left'))
+        if last_n is not None:
+            lo = max(lo, hi - last_n)
+        window = np.array(bars[lo:hi])
+
+        tz = self.meta(symbol).get('tz')
+        index = pd.DatetimeIndex(window['ts'].view('M8[ns]'), name='Date').tz_localize('UTC')
+        index = index.tz_convert(tz) if tz else index.tz_localize(None)
+        columns = [name for name in window.dtype.names if name != 'ts']
+        return pd.DataFrame({name: window[name] for name in columns}, index=index)
+
+    def matches(self, symbol: str, frame: pd.DataFrame) -> bool:
+        """
+        Whether fetched bars agree with the stored bars they overlap.
+
+        The last stored bar is left out, since it may still have been forming
+        when it was stored. Only price columns are compared.
+        """
+        bars = self.bars(symbol)
+        if bars is None or len(bars) < 2 or frame.empty:
+            return True
+        index = pd.DatetimeIndex(frame.index)
+        fresh_ts = (index.tz_convert('UTC') if index.tz is not None else index.tz_localize('UTC')).as_unit('ns').asi8
+        _, stored_at, fresh_at = np.intersect1d(bars['ts'][:-1], fresh_ts, return_indices=True)
+        for name in ('Open', 'High', 'Low', 'Close'):
+            if name not in bars.dtype.names or name not in frame.columns or not len(stored_at):
+                continue
+            fresh = frame[name].to_numpy(dtype=float)[fresh_at]
+            if not np.allclose(fresh, bars[name][stored_at], rtol=_REBASE_TOLERANCE, equal_nan=True):
+                return False
+        return True
+
+    def drop(self, symbol: str):
+        """Remove a symbol's stored bars and metadata."""
+        self._data_path(symbol).unlink(missing_ok=True)
+        self._meta_path(symbol).unlink(missing_ok=True)
+
+    def merge(self, symbol: str, frame: pd.DataFrame, covered_from: Optional[pd.Timestamp] = None):
+        """
+        Merge fetched bars into the store; new bars replace stored ones.
+
+        Args:
+            symbol: Stock symbol
+            frame: Bars indexed by timestamp
+            covered_from: Start of the range the fetch was asked for, so
+                later requests know no older bars exist before it
+        """
+        meta = self.meta(symbol)
+        if not frame.empty:
+            index = pd.DatetimeIndex(frame.index)
+            if index.tz is not None:
+                meta['tz'] = str(index.tz)
+            numeric = frame.select_dtypes(include='number')
+            fresh = numeric.set_axis(index.tz_convert('UTC') if index.tz is not None else index.tz_localize('UTC'))
+            stored = self.load(symbol)
+            if not stored.empty:
+                stored.index = stored.index.tz_convert('UTC') if stored.index.tz is not None \
+                    else stored.index.tz_localize('UTC')
+                fresh = pd.concat([stored, fresh])
+                fresh = fresh[~fresh.index.duplicated(keep='last')].sort_index()
+            self._write(symbol, fresh)
+
+        if covered_from is not None:
+            covered = pd.Timestamp(covered_from).value
+            previous = meta.get('covered_from')
+            meta['covered_from'] = covered if previous is None else min(previous, covered)
+        meta['updated_at'] = _now().isoformat()
+        self._atomic_write(self._meta_path(symbol), json.dumps(meta).encode('utf-8'))
+
+    def _write(self, symbol: str, frame: pd.DataFrame):
+        dtype = [('ts', '<i8')] + [(str(name), frame[name].dtype.str) for name in frame.columns]
+        array = np.empty(len(frame), dtype=dtype)
+        array['ts'] = frame.index.as_unit('ns').asi8
+        for name in frame.columns:
+            array[str(name)] = frame[name].to_numpy()
+        target = self._data_path(symbol)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.stem + '.tmp.npy')
+        np.save(tmp, array)
+        tmp.replace(target)
+
+    def _atomic_write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """
+    Calendar start of a yfinance-style period (UTC), or None for 'max'.
+
+    Raises:
+        ValueError: For periods the store does not handle
+    """
+    now = now or _now().normalize()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1, tz='UTC')
+    if period in _CALENDAR_PERIODS:
+        return now - _CALENDAR_PERIODS[period]
+    if period in _BAR_PERIODS:
+        # A calendar window wide enough to hold the requested trading days
+        return now - pd.Timedelta(days=3 * _BAR_PERIODS[period] + 7)
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def covering_period(since: pd.Timestamp, now: Optional[pd.Timestamp] = None) -> str:
+    """
+    Shortest yfinance-style period certain to include every bar from ``since`` on.
+
+    N trading days span at least N - 1 calendar days, so '1d' and '5d'
+    reach back that far; calendar periods reach back to ``period_start``.
+    """
+    now = now or _now().normalize()
+    since = pd.Timestamp(since)
+    since = since.tz_convert('UTC') if since.tzinfo is not None else since.tz_localize('UTC')
+    for period in _GAP_PERIODS[:-1]:
+        if period in _BAR_PERIODS:
+            reaches = now - pd.Timedelta(days=_BAR_PERIODS[period] - 1)
+        else:
+            reaches = period_start(period, now)
+        if reaches <= since.normalize():
+            return period
+    return 'max'
+
+
+def session_is_final(last_bar: pd.Timestamp, tz: Optional[str], updated_at: Optional[str]) -> bool:
+    """
+    Whether a symbol's last stored daily bar is final and no newer one can exist.
+
+    True when the bar belongs to the latest weekday session that has opened,
+    that session is over, and the store was updated after it ended.
+    Holidays are not known, so they cost one extra tail fetch.
+
+    Args:
+        last_bar: Timestamp of the last stored bar
+        tz: Exchange timezone of the bars (None if unknown: never final)
+        updated_at: ISO time the store was last updated for the symbol
+    """
+    if not tz or not updated_at:
+        return False
+    now = _now(tz)
+    session = now.normalize()
+    if now - session < _SESSION_OPEN:
+        session -= pd.Timedelta(days=1)
+    while session.weekday() >= 5:
+        session -= pd.Timedelta(days=1)
+    if last_bar.tz_convert(tz).normalize() != session:
+        return False
+    final = session + _SESSION_FINAL
+    return now >= final and pd.Timestamp(updated_at).tz_convert(tz) >= final
+
+
+class PriceStoreConnector(ConnectorProxy):
+    """Answers daily, period-based get_stock_price calls from the PriceStore."""
+
+    def __init__(self, connector: Any, store: PriceStore):
+        super().__init__(connector)
+        self._store = store
+        self._ranged: Optional[bool] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.upstream_rows = 0
+        self.served_rows = 0
+        self.rebased = 0
+
+    async def _call(self, name, method, args, kwargs):
+        if name != 'get_stock_price' or not args:
+            return await method(*args, **kwargs)
+        period = kwargs.get('period', args[1] if len(args) > 1 else None)
+        extra = set(kwargs) - {'period', 'interval'}
+        if period is None or extra or len(args) > 2 or kwargs.get('interval', '1d') != '1d':
+            return await method(*args, **kwargs)
+        try:
+            start = period_start(period)
+        except ValueError:
+            return await method(*args, **kwargs)
+
+        symbol = args[0].upper()
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            await self._fill(symbol, method, period, start)
+        frame = await asyncio.to_thread(
+            self._store.load, symbol, start, None, _BAR_PERIODS.get(period)
+        )
+        self.served_rows += len(frame)
+        return frame
+
+    def _accepts_range(self) -> bool:
+        """Whether the upstream get_stock_price takes ``start``/``end`` (checked once)."""
+        if self._ranged is None:
+            try:
+                parameters = inspect.signature(unwrap(self._connector).get_stock_price).parameters
+            except (TypeError, ValueError):
+                parameters = {}
+            self._ranged = {'start', 'end'} <= set(parameters) or any(
+                p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+        return self._ranged
+
+    async def _fill(self, symbol: str, method, period: str, start: Optional[pd.Timestamp]):
+        meta = self._store.meta(symbol)
+        covered_from = meta.get('covered_from')
+        bars = self._store.bars(symbol)
+
+        if bars is None or len(bars) == 0 or covered_from is None:
+            await self._fetch_period(symbol, method, period, start)
+            return
+
+        first = pd.Timestamp(int(bars['ts'][0]), tz='UTC')
+        last = pd.Timestamp(int(bars['ts'][-1]), tz='UTC')
+        # The tail starts at the bar before the last, so it overlaps a final one
+        anchor = pd.Timestamp(int(bars['ts'][-2 if len(bars) > 1 else -1]), tz='UTC')
+        wanted = start.value if start is not None else 0
+        if wanted < covered_from:
+            # Older history than the store has ever covered
+            if start is None:
+                older = {'period': 'max'}, pd.Timestamp(0, tz='UTC')
+            elif not self._accepts_range():
+                # The whole period includes the tail as well
+                older = {'period': period}, start
+            else:
+                # Up to and including the first stored bar, to compare it
+                older = {'start': start.strftime('%Y-%m-%d'),
+                         'end': (first + pd.Timedelta(days=1)).strftime('%Y-%m-%d')}, start
+            if not await self._fetch(symbol, method, *older):
+                await self._refetch(symbol, method, period, start)
+                return
+            if 'period' in older[0]:
+                return
+
+        if session_is_final(last, meta.get('tz'), meta.get('updated_at')):
+            return
+        # Tail since the last stored bar, which may itself still be forming
+        if self._accepts_range():
+            tail = {'start': anchor.strftime('%Y-%m-%d')}
+        else:
+            tail = {'period': covering_period(anchor)}
+        if not await self._fetch(symbol, method, tail, None):
+            await self._refetch(symbol, method, period, start)
+
+    async def _fetch_period(self, symbol: str, method, period: str, start: Optional[pd.Timestamp]):
+        if period in _BAR_PERIODS:
+            covered = _FIRST_BAR  # a few trading days say nothing about the calendar range
+        else:
+            covered = start or pd.Timestamp(0, tz='UTC')
+        await self._fetch(symbol, method, {'period': period}, covered)
+
+    async def _refetch(self, symbol: str, method, period: str, start: Optional[pd.Timestamp]):
+        """Replace a symbol's re-adjusted history with the whole requested period."""
+        logger.info(f"Stored {symbol} prices no longer match upstream (split or dividend), refetching {period}")
+        self.rebased += 1
+        await asyncio.to_thread(self._store.drop, symbol)
+        await self._fetch_period(symbol, method, period, start)
+
+    async def _fetch(self, symbol: str, method, kwargs: Dict[str, Any], covered_from) -> bool:
+        """
+        Fetch bars and merge them into the store.
+
+        Returns:
+            False, storing nothing, when the bars disagree with the stored
+            bars they overlap
+        """
+        frame = await method(symbol, **kwargs)
+        if frame is None:
+            return True
+        if covered_from is _FIRST_BAR:
+            covered_from = frame.index[0] if len(frame) else None
+        self.upstream_rows += len(frame)
+        if not await asyncio.to_thread(self._store.matches, symbol, frame):
+            return False
+        await asyncio.to_thread(self._store.merge, symbol, frame, covered_from)
+        return True
+
+
+def install_price_store(manager, store: Optional[PriceStore] = None,
+                        sources: Iterable[str] = ('yahoo_finance',)) -> PriceStore:
+    """
+    Serve daily price history for every connector from a local PriceStore.
+
+    Install it before the cache so cache misses fall through to the store.
+
+    Args:
+        manager: FinancialDataManager to wrap
+        store: Store to use (a PriceStore in settings.PRICE_STORE_DIR if not given)
+        sources: Connectors whose price history is stored
+
+    Returns:
+        The store
+    """
+    store = store or PriceStore()
+    wrap_connectors(manager, lambda name, connector: PriceStoreConnector(connector, store),
+                    PriceStoreConnector, innermost=True, names=sources)
+    return store
@@ -0,0 +1,404 @@
+"""
+Record and replay of connector responses, for offline runs and benchmarks.
+
+Recording: ``install_recorder`` wraps each raw connector (beneath the cache,
+price store and rate limiter) so every upstream response is written to a
+cassette directory with the cache codec, along with how long the call took.
+Errors are recorded too and replay as errors.
+
+Replay: ``ReplayManager`` stands in for FinancialDataManager with one
+``ReplayConnector`` per recorded connector. Calls are answered from the
+cassette after a simulated upstream delay (the recorded latency, or a
+fixed one), and each connector enforces an upstream request budget,
+raising RateLimitExceeded like a 429 once it is spent, so the data layers
+above behave as they do against the live sources.
+
+A call without an exactly matching recording falls back to the largest
+recording of the same connector, method and symbol; price frames are then
+cut to the requested start/end or period, so the price store's date-based
+range fetches replay from a recording made on another day.
+
+Cassette layout::
+
+    manifest.jsonl            one JSON line per recorded call
+    <connector>/<sha1>.bin    codec-encoded response
+
+``write_synthetic_cassette`` generates a cassette for any number of
+symbols, for benchmarks at universe scale without recording them first.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.cache import codec
+from src.cache.connector import cache_key
+from src.config.settings import settings
+from src.utils.connector_proxy import ConnectorProxy, wrap_connectors
+from src.utils.rate_limiter import DEFAULT_RATE_LIMITS, RateLimitExceeded, rate_limit_signal
+from .price_store import period_start
+
+MANIFEST = 'manifest.jsonl'
+
+# manager.get_stock_data data types -> connector methods
+DATA_METHODS = {
+    'price': 'get_stock_price',
+    'info': 'get_company_info',
+    'financials': 'get_financial_statements',
+    'technical': 'get_technical_indicators',
+}
+
+
+class ReplayMiss(LookupError):
+    """Raised when a cassette holds no recording for a call."""
+
+
+class ReplayError(RuntimeError):
+    """A recorded upstream error, raised again on replay."""
+
+
+def _symbol(args: Tuple) -> Optional[str]:
+    return args[0].upper() if args and isinstance(args[0], str) else None
+
+
+class Cassette:
+    """Recorded connector responses in one directory."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_symbol: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]] = {}
+        self._blobs: Dict[str, bytes] = {}
+        manifest = self.directory / MANIFEST
+        if manifest.exists():
+            with open(manifest, 'r', encoding='utf-8') as fh:
+                for line in fh:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, entry: Dict[str, Any]):
+        previous = self._entries.get(entry['key'])
+        if previous is not None:
+            self._by_symbol[(previous['connector'], previous['method'], previous['symbol'])].remove(previous)
+        self._entries[entry['key']] = entry
+        self._by_symbol.setdefault((entry['connector'], entry['method'], entry['symbol']), []).append(entry)
+
+    def connectors(self) -> List[str]:
+        return sorted({entry['connector'] for entry in self._entries.values()})
+
+    def methods(self, connector: str) -> List[str]:
+        return sorted({entry['method'] for entry in self._entries.values() if entry['connector'] == connector})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, connector: str, method: str, args: Tuple, kwargs: Dict[str, Any],
+               value: Any = None, error: Optional[BaseException] = None, latency_s: float = 0.0):
+        """Store one call's response (or error) and append it to the manifest."""
+        key = cache_key(connector, method, args, kwargs)
+        entry: Dict[str, Any] = {
+            'key': key,
+            'connector': connector,
+            'method': method,
+            'symbol': _symbol(args),
+            'latency_ms': round(latency_s * 1000, 3),
+        }
+        if error is not None:
+            entry['error'] = str(error)
+        else:
+            blob = codec.encode(value)
+            name = f"{connector}/{hashlib.sha1(key.encode('utf-8')).hexdigest()}.bin"
+            path = self.directory / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(blob)
+            tmp.replace(path)
+            entry['file'] = name
+            entry['rows'] = len(value) if isinstance(value, pd.DataFrame) else None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / MANIFEST, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(entry) + '\n')
+        self._index(entry)
+
+    def lookup(self, connector: str, method: str, args: Tuple,
+               kwargs: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Recording for a call.
+
+        Returns:
+            (entry or None, whether it matched exactly)
+        """
+        entry = self._entries.get(cache_key(connector, method, args, kwargs))
+        if entry is not None:
+            return entry, True
+        candidates = [e for e in self._by_symbol.get((connector, method, _symbol(args)), []) if 'file' in e]
+        if not candidates:
+            return None, False
+        return max(candidates, key=lambda e: e.get('rows') or 0), False
+
+    def load(self, entry: Dict[str, Any]) -> Any:
+        """Decode a recorded response; every call gets its own copy."""
+        blob = self._blobs.get(entry['file'])
+        if blob is None:
+            blob = self._blobs[entry['file']] = (self.directory / entry['file']).read_bytes()
+        return codec.decode(blob)
+
+
+def _bound(value: Any, tz) -> pd.Timestamp:
+    stamp = pd.Timestamp(value)
+    if tz is None:
+        return stamp.tz_convert('UTC').tz_localize(None) if stamp.tzinfo is not None else stamp
+    return stamp.tz_convert(tz) if stamp.tzinfo is not None else stamp.tz_localize(tz)
+
+
+def slice_frame(frame: pd.DataFrame, kwargs: Dict[str, Any]) -> pd.DataFrame:
+    """Cut a recorded price frame to a call's start/end, or its period before the last bar."""
+    index = frame.index
+    if not isinstance(index, pd.DatetimeIndex) or len(index) == 0:
+        return frame
+    start, end = kwargs.get('start'), kwargs.get('end')
+    if start is None and end is None and kwargs.get('period'):
+        try:
+            start = period_start(kwargs['period'], _bound(index[-1], 'UTC').normalize())
+        except ValueError:
+            start = None
+    keep = np.ones(len(frame), dtype=bool)
+    if start is not None:
+        keep &= index >= _bound(start, index.tz)
+    if end is not None:
+        keep &= index < _bound(end, index.tz)
+    return frame[keep]
+
+
+class ReplayConnector:
+    """
+    Serves one connector's calls from a cassette with simulated upstream behaviour.
+
+    Args:
+        name: Connector name in the cassette
+        cassette: Cassette to serve from
+        latency_ms: Fixed simulated latency (the recorded latency if None)
+        jitter: Random +/- fraction applied to each delay
+        rate_limit: Upstream budget as (requests, per seconds); None for unlimited
+        seed: Seed for the latency jitter
+    """
+
+    def __init__(self, name: str, cassette: Cassette, latency_ms: Optional[float] = None,
+                 jitter: float = 0.0, rate_limit: Optional[Tuple[int, float]] = None, seed: int = 0):
+        self.name = name
+        self.cassette = cassette
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self._methods = set(cassette.methods(name))
+        self._random = random.Random(seed)
+        self._window: Deque[float] = deque()
+        self.calls = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def __getattr__(self, method: str):
+        if method.startswith('__') or method not in self.__dict__.get('_methods', ()):
+            raise AttributeError(method)
+
+        async def call(*args, **kwargs):
+            return await self._replay(method, args, kwargs)
+
+        call.__name__ = method
+        return call
+
+    def _admit(self):
+        """Spend one request of the upstream budget, or fail like a 429."""
+        if self.rate_limit is None:
+            return
+        requests, per = self.rate_limit
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= per:
+            self._window.popleft()
+        if len(self._window) >= requests:
+            self.rejected += 1
+            raise RateLimitExceeded(retry_after=per - (now - self._window[0]))
+        self._window.append(now)
+
+    async def _replay(self, method: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        self.calls += 1
+        self._admit()
+        entry, exact = self.cassette.lookup(self.name, method, args, kwargs)
+        recorded = entry['latency_ms'] if entry is not None else 0.0
+        delay = self.latency_ms if self.latency_ms is not None else recorded
+        if self.jitter:
+            delay *= 1 + self.jitter * self._random.uniform(-1, 1)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if entry is None:
+            self.misses += 1
+            raise ReplayMiss(f"No recording for {cache_key(self.name, method, args, kwargs)}")
+        if 'error' in entry:
+            raise ReplayError(entry['error'])
+        value = self.cassette.load(entry)
+        if not exact and isinstance(value, pd.DataFrame):
+            value = slice_frame(value, kwargs)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'misses': self.misses, 'rate_limited': self.rejected}
+
+
+class ReplayManager:
+    """
+    Offline stand-in for FinancialDataManager serving a cassette.
+
+    Args:
+        directory: Cassette directory (settings.REPLAY_DIR if None)
+        latency_ms: Fixed simulated latency per call (settings.REPLAY_LATENCY_MS;
+            the recorded latency if that is unset too)
+        jitter: Random +/- fraction applied to each delay (settings.REPLAY_LATENCY_JITTER)
+        rate_limits: Upstream budgets per connector as (requests, per seconds);
+            the live defaults (DEFAULT_RATE_LIMITS) if None, {} for unlimited
+        primary: Connector answering get_stock_data
+    """
+
+    def __init__(self, directory: Optional[str] = None, latency_ms: Optional[float] = None,
+                 jitter: Optional[float] = None, rate_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 primary: str = 'yahoo_finance'):
+        self.cassette = Cassette(directory or settings.REPLAY_DIR)
+        if latency_ms is None and settings.REPLAY_LATENCY_MS:
+            latency_ms = float(settings.REPLAY_LATENCY_MS)
+        jitter = settings.REPLAY_LATENCY_JITTER if jitter is None else jitter
+        limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.primary = primary
+        self.connectors: Dict[str, Any] = {
+            name: ReplayConnector(name, self.cassette, latency_ms, jitter, limits.get(name), seed=position)
+            for position, name in enumerate(self.cassette.connectors())
+        }
+        self._replay_connectors = dict(self.connectors)
+        if not self.connectors:
+            logger.warning(f"Replay cassette {self.cassette.directory} is empty")
+
+    async def get_stock_data(self, symbol: str, data_type: str = 'price', **kwargs) -> Any:
+        method = getattr(self.connectors[self.primary], DATA_METHODS[data_type])
+        return await method(symbol, **kwargs)
+
+    def get_available_connectors(self) -> List[str]:
+        return list(self.connectors)
+
+    def get_connector_health(self) -> Dict[str, Dict[str, Any]]:
+        return {name: {'status': 'healthy', 'mode': 'replay', **connector.stats()}
+                for name, connector in self._replay_connectors.items()}
+
+
+class RecordingConnector(ConnectorProxy):
+    """Connector wrapper writing every upstream response to a cassette."""
+
+    def __init__(self, name: str, connector: Any, cassette: Cassette):
+        super().__init__(connector)
+        self._name = name
+        self._cassette = cassette
+
+    async def _call(self, name, method, args, kwargs):
+        started = time.perf_counter()
+        try:
+            value = await method(*args, **kwargs)
+        except Exception as e:
+            # 429s depend on the moment, not on the request; replay simulates them instead
+            if not rate_limit_signal(e)[0]:
+                self._cassette.record(self._name, name, args, kwargs, error=e,
+                                      latency_s=time.perf_counter() - started)
+            raise
+        try:
+            self._cassette.record(self._name, name, args, kwargs, value,
+                                  latency_s=time.perf_counter() - started)
+        except codec.CodecError as e:
+            logger.warning(f"Not recording {self._name}.{name}: {e}")
+        return value
+
+
+def install_recorder(manager, directory: Optional[str] = None) -> Cassette:
+    """
+    Record every upstream call of a manager's connectors.
+
+    The recorder sits directly around each raw connector, so only real
+    upstream responses are captured.
+
+    Args:
+        manager: FinancialDataManager to record
+        directory: Cassette directory (settings.RECORD_DIR if None)
+
+    Returns:
+        The cassette being written
+    """
+    cassette = Cassette(directory or settings.RECORD_DIR)
+    wrap_connectors(manager, lambda name, connector: RecordingConnector(name, connector, cassette),
+                    RecordingConnector, innermost=True)
+    return cassette
+
+
+def write_synthetic_cassette(directory: str, symbols: Iterable[str], sessions: int = 300,
+                             seed: int = 42, latency_ms: float = 50.0) -> Cassette:
+    """
+    Generate a cassette for a universe without touching any upstream.
+
+    Yahoo Finance gets daily bars ending today, company info and annual
+    financials per symbol; Alpha Vantage gets closes within a few basis
+    points of Yahoo's; FRED gets a handful of monthly series.
+
+    Args:
+        directory: Cassette directory to write
+        symbols: Symbols to generate
+        sessions: Daily bars per symbol
+        seed: Random seed, so the same arguments give the same cassette
+        latency_ms: Latency recorded for every call
+
+    Returns:
+        The written cassette
+    """
+    rng = np.random.default_rng(seed)
+    cassette = Cassette(directory)
+    latency = latency_ms / 1000
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=sessions, name='Date')
+    index = index.tz_localize('America/New_York')
+    years = pd.Index([str(pd.Timestamp.now().year - k) for k in range(1, 5)])
+
+    for position, symbol in enumerate(dict.fromkeys(s.upper() for s in symbols)):
+        returns = rng.normal(0.0004, 0.018, sessions)
+        close = 20 + 180 * rng.random() * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, 0.01, sessions))
+        prices = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.004, sessions)),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(100_000, 50_000_000, sessions),
+        }, index=index)
+        cassette.record('yahoo_finance', 'get_stock_price', (symbol,), {}, prices, latency_s=latency)
+        cassette.record('yahoo_finance', 'get_company_info', (symbol,), {}, {
+            'symbol': symbol,
+            'longName': f"{symbol} Holdings Inc.",
+            'sector': ('Technology', 'Healthcare', 'Financials', 'Energy')[position % 4],
+            'marketCap': int(close[-1] * rng.integers(10_000_000, 5_000_000_000)),
+            'currency': 'USD',
+        }, latency_s=latency)
+        revenue = rng.uniform(1e8, 1e11) * np.cumprod(1 + rng.normal(0.05, 0.08, len(years)))
+        cassette.record('yahoo_finance', 'get_financial_statements', (symbol,), {}, pd.DataFrame(
+            [revenue, revenue * rng.uniform(0.05, 0.3), revenue * rng.uniform(0.5, 3)],
+            index=['Total Revenue', 'Net Income', 'Total Assets'], columns=years,
+        ), latency_s=latency)
+        quotes = pd.DataFrame({'close': np.round(close * (1 + rng.normal(0, 0.0003, sessions)), 2)},
+                              index=index.tz_localize(None))
+        cassette.record('alpha_vantage', 'get_stock_price', (symbol,), {}, quotes, latency_s=latency)
+
+    months = pd.date_range(end=pd.Timestamp.now().normalize(), periods=120, freq='MS', name='date')
+    for series_id, level in (('GDP', 25000.0), ('UNRATE', 4.0), ('CPIAUCSL', 300.0), ('DGS10', 4.2)):
+        values = level * np.exp(np.cumsum(rng.normal(0, 0.01, len(months))))
+        cassette.record('fred', '_fetch_observations', (series_id,), {},
+                        pd.DataFrame({'value': values}, index=months), latency_s=latency)
+    return cassette
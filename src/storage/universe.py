@@ -0,0 +1,136 @@
+"""
+Memory-mapped universe price matrix for cross-sectional analytics.
+
+``build_universe_matrix`` packs the stored daily history of many symbols
+into one aligned on-disk array of shape (fields x symbols x dates), with
+NaN where a symbol has no bar on a date. Symbols are copied in one at a
+time, so building never needs more than one symbol's history in memory.
+
+``UniverseMatrix`` opens the result read-only through a memory map. A field
+such as ``matrix.field('Close')`` is a contiguous (symbols x dates) view
+that can be handed straight to ``src.analysis.indicators`` without pulling
+the universe into the heap.
+
+Layout of a matrix directory::
+
+    values.npy   fields x symbols x dates, float32 or float64
+    dates.npy    int64 UTC nanoseconds
+    meta.json    fields, symbols, dtype, timezone
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .price_store import PriceStore
+
+DEFAULT_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def build_universe_matrix(output_dir: str, symbols: Optional[Iterable[str]] = None,
+                          store: Optional[PriceStore] = None,
+                          fields: Sequence[str] = DEFAULT_FIELDS,
+                          dtype: str = 'float32') -> 'UniverseMatrix':
+    """
+    Pack stored history for a universe into one memory-mapped matrix.
+
+    Args:
+        output_dir: Directory to write the matrix into
+        symbols: Symbols to include (every stored symbol if None); symbols
+            without stored history are skipped
+        store: PriceStore to read from (default location if None)
+        fields: Bar fields to include
+        dtype: 'float32' or 'float64'
+
+    Returns:
+        The opened matrix
+    """
+    store = store or PriceStore()
+    wanted = [s.upper() for s in symbols] if symbols is not None else store.symbols()
+
+    # First pass: timestamps only, to build the shared date axis
+    included: List[str] = []
+    dates = np.empty(0, dtype=np.int64)
+    timezone = None
+    for symbol in wanted:
+        bars = store.bars(symbol)
+        if bars is None or len(bars) == 0:
+            continue
+        included.append(symbol)
+        dates = np.union1d(dates, bars['ts'])
+        timezone = timezone or store.meta(symbol).get('tz')
+
+    target = Path(output_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    values = np.lib.format.open_memmap(
+        target / 'values.npy', mode='w+', dtype=np.dtype(dtype),
+        shape=(len(fields), len(included), len(dates)),
+    )
+    values[...] = np.nan
+
+    # Second pass: scatter each symbol's bars onto the date axis
+    for row, symbol in enumerate(included):
+        bars = store.bars(symbol)
+        positions = np.searchsorted(dates, bars['ts'])
+        for depth, field in enumerate(fields):
+            if field in bars.dtype.names:
+                values[depth, row, positions] = bars[field]
+    values.flush()
+    del values
+
+    np.save(target / 'dates.npy', dates)
+    meta = {'fields': list(fields), 'symbols': included, 'dtype': dtype, 'tz': timezone}
+    (target / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+    return UniverseMatrix(output_dir)
+
+
+class UniverseMatrix:
+    """Read-only, zero-copy access to a matrix written by build_universe_matrix."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        meta = json.loads((self.path / 'meta.json').read_text(encoding='utf-8'))
+        self.fields: List[str] = meta['fields']
+        self.symbols: List[str] = meta['symbols']
+        self.tz: Optional[str] = meta.get('tz')
+        self.values = np.load(self.path / 'values.npy', mmap_mode='r')
+        self._dates = np.load(self.path / 'dates.npy', mmap_mode='r')
+        self._field_pos: Dict[str, int] = {name: i for i, name in enumerate(self.fields)}
+        self._symbol_pos: Dict[str, int] = {name: i for i, name in enumerate(self.symbols)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(np.asarray(self._dates).view('M8[ns]'), name='Date').tz_localize('UTC')
+        return index.tz_convert(self.tz) if self.tz else index.tz_localize(None)
+
+    def field(self, name: str) -> np.ndarray:
+        """(symbols x dates) view of one field."""
+        return self.values[self._field_pos[name]]
+
+    def symbol(self, symbol: str) -> np.ndarray:
+        """(fields x dates) view of one symbol."""
+        return self.values[:, self._symbol_pos[symbol.upper()]]
+
+    def rows(self, symbols: Iterable[str]) -> np.ndarray:
+        """Positions of symbols along the symbol axis, for fancy indexing."""
+        return np.array([self._symbol_pos[s.upper()] for s in symbols], dtype=np.intp)
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """
+        One field as a (dates x symbols) DataFrame backed by the memory map.
+
+        The frame is a transposed view; it is read-only and must not be
+        modified in place.
+        """
+        return pd.DataFrame(self.field(name).T, index=self.dates, columns=self.symbols, copy=False)
+
+    def symbol_frame(self, symbol: str) -> pd.DataFrame:
+        """One symbol's bars as a (dates x fields) DataFrame backed by the memory map."""
+        return pd.DataFrame(self.symbol(symbol).T, index=self.dates, columns=self.fields, copy=False)
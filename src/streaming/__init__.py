@@ -0,0 +1,29 @@
+"""
+Real-time quote streaming: binary ticks, brokers, producer and WebSocket fan-out.
+
+Exports are imported on first use, so importing the package stays cheap.
+"""
+
+from src.registry import lazy_exports
+
+__all__ = [
+    'Tick',
+    'encode_tick',
+    'decode_tick',
+    'InMemoryBroker',
+    'KafkaBroker',
+    'create_broker',
+    'QuoteProducer',
+    'QuoteHub',
+]
+
+__getattr__ = lazy_exports(__name__, {
+    'Tick': '.ticks',
+    'encode_tick': '.ticks',
+    'decode_tick': '.ticks',
+    'InMemoryBroker': '.broker',
+    'KafkaBroker': '.broker',
+    'create_broker': '.broker',
+    'QuoteProducer': '.producer',
+    'QuoteHub': '.hub',
+})
@@ -0,0 +1,113 @@
+"""
+Message brokers for the quote stream.
+
+``KafkaBroker`` publishes to and consumes from Kafka (kafka-python).
+``InMemoryBroker`` has the same interface inside one process, for tests,
+development and single-worker deployments without Kafka. Both expose::
+
+    await broker.publish(topic, key, value)
+    async for value in broker.subscribe(topic): ...
+    await broker.close()
+"""
+
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+
+from src.config.settings import settings
+
+
+class InMemoryBroker:
+    """
+    In-process topic fan-out.
+
+    Every subscriber gets its own bounded queue; when a subscriber falls
+    behind by ``maxsize`` messages its oldest message is dropped.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._queues: Dict[str, List[asyncio.Queue]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    async def publish(self, topic: str, key: Optional[bytes], value: bytes):
+        self.published += 1
+        for queue in self._queues.get(topic, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(value)
+
+    async def subscribe(self, topic: str) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue(self.maxsize)
+        self._queues.setdefault(topic, []).append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues[topic].remove(queue)
+
+    async def close(self):
+        self._queues.clear()
+
+
+class KafkaBroker:
+    """Kafka-backed broker; the producer and consumers are created on first use."""
+
+    def __init__(self, bootstrap_servers: Optional[str] = None):
+        self.bootstrap_servers = (bootstrap_servers or settings.KAFKA_BOOTSTRAP_SERVERS).split(',')
+        self._producer = None
+        self.published = 0
+
+    def _get_producer(self):
+        if self._producer is None:
+            from kafka import KafkaProducer
+            # Small linger batches ticks into fewer requests without adding visible latency
+            self._producer = KafkaProducer(bootstrap_servers=self.bootstrap_servers,
+                                           acks=1, linger_ms=5)
+        return self._producer
+
+    async def publish(self, topic: str, key: Optional[bytes], value: bytes):
+        if self._producer is None:
+            await asyncio.to_thread(self._get_producer)
+        # send() only appends to the producer's buffer; delivery happens in its I/O thread
+        self._producer.send(topic, key=key, value=value)
+        self.published += 1
+
+    async def subscribe(self, topic: str) -> AsyncIterator[bytes]:
+        from kafka import KafkaConsumer
+
+        # No consumer group: every subscriber process sees every tick from now on
+        consumer = await asyncio.to_thread(
+            KafkaConsumer, topic, bootstrap_servers=self.bootstrap_servers,
+            auto_offset_reset='latest', enable_auto_commit=False,
+        )
+        try:
+            while True:
+                batches = await asyncio.to_thread(consumer.poll, timeout_ms=500)
+                for records in batches.values():
+                    for record in records:
+                        yield record.value
+        finally:
+            await asyncio.to_thread(consumer.close)
+
+    async def close(self):
+        if self._producer is not None:
+            producer, self._producer = self._producer, None
+            await asyncio.to_thread(producer.flush)
+            await asyncio.to_thread(producer.close)
+
+
+def create_broker(kind: Optional[str] = None):
+    """
+    Broker selected by ``kind`` or settings.STREAM_BROKER ('kafka' or 'memory').
+    """
+    kind = (kind or settings.STREAM_BROKER).lower()
+    if kind == 'memory':
+        return InMemoryBroker()
+    if kind == 'kafka':
+        return KafkaBroker()
+    logger.warning(f"Unknown STREAM_BROKER {kind!r}, using the in-memory broker")
+    return InMemoryBroker()
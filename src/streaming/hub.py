@@ -0,0 +1,123 @@
+"""
+WebSocket fan-out of quote ticks.
+
+``QuoteHub`` consumes the tick topic once per process and offers every
+tick to each connected subscriber whose symbol filter matches. Subscribers
+hold at most one pending tick per symbol: a client that reads slower than
+ticks arrive receives the latest quote for each symbol instead of a growing
+backlog, so one slow socket never holds up the others or grows memory.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+from src.config.settings import settings
+from .ticks import tick_symbol
+
+
+class QuoteSubscriber:
+    """
+    One client's symbol filter and conflated pending ticks.
+
+    With ``symbols`` None the client follows every symbol; unsubscribing
+    from that feed excludes symbols rather than narrowing it to a list.
+    """
+
+    def __init__(self, symbols: Optional[Iterable[str]] = None):
+        self.symbols: Optional[Set[str]] = {s.upper() for s in symbols} if symbols else None
+        self.excluded: Set[str] = set()
+        self._pending: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._ready = asyncio.Event()
+        self.delivered = 0
+        self.conflated = 0
+
+    def subscribe(self, symbols: Iterable[str]):
+        symbols = {s.upper() for s in symbols}
+        if self.symbols is None:
+            self.excluded -= symbols
+        else:
+            self.symbols |= symbols
+
+    def unsubscribe(self, symbols: Iterable[str]):
+        for symbol in (s.upper() for s in symbols):
+            if self.symbols is None:
+                self.excluded.add(symbol)
+            else:
+                self.symbols.discard(symbol)
+            self._pending.pop(symbol, None)
+
+    def wants(self, symbol: str) -> bool:
+        if self.symbols is None:
+            return symbol not in self.excluded
+        return symbol in self.symbols
+
+    def offer(self, symbol: str, payload: bytes):
+        if symbol in self._pending:
+            self.conflated += 1
+            del self._pending[symbol]
+        self._pending[symbol] = payload
+        self._ready.set()
+
+    async def next_batch(self) -> List[bytes]:
+        """Wait for pending ticks and take all of them, oldest symbol first."""
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self.delivered += len(batch)
+        return batch
+
+
+class QuoteHub:
+    """Consumes the tick topic and routes ticks to subscribers."""
+
+    def __init__(self, broker, topic: Optional[str] = None):
+        self.broker = broker
+        self.topic = topic or settings.STREAM_TOPIC
+        self._subscribers: Set[QuoteSubscriber] = set()
+        self._consumer: Optional[asyncio.Task] = None
+        self.received = 0
+
+    def subscribe(self, symbols: Optional[Iterable[str]] = None) -> QuoteSubscriber:
+        """Register a subscriber; the topic is consumed from the first one on."""
+        subscriber = QuoteSubscriber(symbols)
+        self._subscribers.add(subscriber)
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.ensure_future(self._consume())
+        return subscriber
+
+    def unsubscribe(self, subscriber: QuoteSubscriber):
+        self._subscribers.discard(subscriber)
+
+    async def _consume(self):
+        try:
+            async for payload in self.broker.subscribe(self.topic):
+                self.received += 1
+                symbol = tick_symbol(payload)
+                for subscriber in self._subscribers:
+                    if subscriber.wants(symbol):
+                        subscriber.offer(symbol, payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Quote stream consumer stopped: {e}")
+
+    async def close(self):
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+        self._subscribers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'subscribers': len(self._subscribers),
+            'received': self.received,
+            'delivered': sum(s.delivered for s in self._subscribers),
+            'conflated': sum(s.conflated for s in self._subscribers),
+        }
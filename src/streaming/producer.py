@@ -0,0 +1,114 @@
+"""
+Quote producer: polls a watched universe and publishes ticks.
+
+Each poll fetches the latest one-minute bar of every watched symbol
+concurrently and publishes a tick for each symbol whose price, volume or
+bar time changed since the last one. Polling goes through the connector
+layers beneath the cache, so quotes are always fresh but still respect the
+shared rate limits. Quotes from other feeds can be pushed in with
+``publish``.
+"""
+
+import asyncio
+import math
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+from loguru import logger
+
+from src.cache import CachedConnector
+from src.config.settings import settings
+from src.utils.connector_proxy import beneath
+from src.utils.fanout import fan_out, unique_symbols
+from .ticks import Tick, encode_tick
+
+
+def tick_from_bars(symbol: str, bars) -> Optional[Tick]:
+    """Tick for the latest bar of a price frame, None if there is no usable close."""
+    if bars is None or getattr(bars, 'empty', True) or 'Close' not in bars.columns:
+        return None
+    close = bars['Close'].to_numpy()
+    valid = ~pd.isna(close)
+    if not valid.any():
+        return None
+    last = int(valid.nonzero()[0][-1])
+    stamp = pd.Timestamp(bars.index[last])
+    stamp = stamp.tz_convert('UTC') if stamp.tzinfo is not None else stamp.tz_localize('UTC')
+    volume = bars['Volume'].iloc[last] if 'Volume' in bars.columns else 0
+    volume = 0 if volume is None or (isinstance(volume, float) and math.isnan(volume)) else int(volume)
+    return Tick(symbol, float(close[last]), volume, stamp.value)
+
+
+class QuoteProducer:
+    """
+    Publishes ticks for a watched universe to a broker topic.
+
+    Args:
+        manager: FinancialDataManager to poll
+        broker: Broker to publish to (see src.streaming.broker)
+        symbols: Watched symbols
+        topic: Topic name (settings.STREAM_TOPIC if None)
+        interval: Seconds between polls (settings.STREAM_POLL_INTERVAL if None)
+        source: Connector to poll
+    """
+
+    def __init__(self, manager, broker, symbols: Iterable[str], topic: Optional[str] = None,
+                 interval: Optional[float] = None, source: str = 'yahoo_finance'):
+        self.broker = broker
+        self.symbols = unique_symbols(symbols)
+        self.topic = topic or settings.STREAM_TOPIC
+        self.interval = interval if interval is not None else settings.STREAM_POLL_INTERVAL
+        self._connector = beneath(manager.connectors[source], CachedConnector)
+        self._last: Dict[str, Tick] = {}
+        self.polls = 0
+        self.published = 0
+        self.unchanged = 0
+        self.errors = 0
+
+    async def publish(self, tick: Tick) -> bool:
+        """Publish a tick unless it repeats the symbol's last one."""
+        if self._last.get(tick.symbol) == tick:
+            self.unchanged += 1
+            return False
+        self._last[tick.symbol] = tick
+        await self.broker.publish(self.topic, tick.symbol.encode('ascii'), encode_tick(tick))
+        self.published += 1
+        return True
+
+    async def _latest(self, symbol: str):
+        return await self._connector.get_stock_price(symbol, period='1d', interval='1m')
+
+    async def poll_once(self) -> int:
+        """Poll every watched symbol once; returns the number of ticks published."""
+        self.polls += 1
+        published = 0
+        async for result in fan_out(self.symbols, self._latest, settings.MAX_WORKERS):
+            if result.error is not None:
+                self.errors += 1
+                logger.warning(f"Quote poll failed for {result.key}: {result.error}")
+                continue
+            tick = tick_from_bars(result.key, result.value)
+            if tick is not None and await self.publish(tick):
+                published += 1
+        return published
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        """Poll every ``interval`` seconds until ``stop`` is set or the task is cancelled."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            started = asyncio.get_running_loop().time()
+            await self.poll_once()
+            remaining = self.interval - (asyncio.get_running_loop().time() - started)
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'symbols': len(self.symbols),
+            'polls': self.polls,
+            'published': self.published,
+            'unchanged': self.unchanged,
+            'errors': self.errors,
+        }
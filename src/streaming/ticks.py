@@ -0,0 +1,64 @@
+"""
+Compact binary encoding for quote ticks.
+
+A tick is a fixed 26-byte little-endian header followed by the symbol::
+
+    version   uint8
+    ts        int64    UTC nanoseconds
+    price     float64
+    volume    int64
+    length    uint8    symbol length in bytes
+    symbol    ASCII
+
+That is roughly a quarter of the equivalent JSON, and the symbol can be
+read without decoding the rest (``tick_symbol``), which is all the fan-out
+needs to route a message.
+"""
+
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, NamedTuple
+
+TICK_VERSION = 1
+_HEADER = struct.Struct('<BqdqB')
+
+
+class Tick(NamedTuple):
+    symbol: str
+    price: float
+    volume: int
+    timestamp_ns: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form, with an ISO-8601 UTC timestamp."""
+        moment = datetime.fromtimestamp(self.timestamp_ns / 1e9, tz=timezone.utc)
+        return {
+            'symbol': self.symbol,
+            'price': self.price,
+            'volume': self.volume,
+            'timestamp': moment.isoformat(),
+        }
+
+
+def encode_tick(tick: Tick) -> bytes:
+    symbol = tick.symbol.upper().encode('ascii')
+    return _HEADER.pack(TICK_VERSION, tick.timestamp_ns, tick.price, tick.volume, len(symbol)) + symbol
+
+
+def decode_tick(payload: bytes) -> Tick:
+    """
+    Raises:
+        ValueError: For truncated payloads or unknown versions
+    """
+    if len(payload) < _HEADER.size:
+        raise ValueError("Truncated tick")
+    version, timestamp_ns, price, volume, length = _HEADER.unpack_from(payload)
+    if version != TICK_VERSION:
+        raise ValueError(f"Unsupported tick version: {version}")
+    symbol = payload[_HEADER.size:_HEADER.size + length].decode('ascii')
+    return Tick(symbol, price, volume, timestamp_ns)
+
+
+def tick_symbol(payload: bytes) -> str:
+    """Symbol of an encoded tick, without decoding the rest."""
+    return payload[_HEADER.size:].decode('ascii')
@@ -0,0 +1,23 @@
+"""
+Shared infrastructure helpers for the Financial Research Intelligence platform.
+
+Exports are imported on first use, so importing the package stays cheap.
+"""
+
+from src.registry import lazy_exports
+
+__all__ = [
+    'SingleFlight',
+    'TokenBucketLimiter',
+    'install_rate_limiter',
+    'metrics',
+    'install_metrics',
+]
+
+__getattr__ = lazy_exports(__name__, {
+    'SingleFlight': '.singleflight',
+    'TokenBucketLimiter': '.rate_limiter',
+    'install_rate_limiter': '.rate_limiter',
+    'metrics': '.metrics',
+    'install_metrics': '.metrics',
+})
@@ -0,0 +1,102 @@
+"""
+Wrappers that intercept the async methods of data connectors.
+
+The manager keeps its connectors in ``manager.connectors``; layers such as
+concurrency limits or caching are added by replacing each entry with a
+ConnectorProxy around the original connector.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class ConnectorProxy:
+    """
+    Base class for connector wrappers.
+
+    Synchronous attributes are passed through untouched; coroutine methods
+    are routed through ``_call`` so subclasses can act around each call.
+    """
+
+    def __init__(self, connector: Any):
+        self._connector = connector
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._connector, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self._call(name, attr, args, kwargs)
+
+        return call
+
+    async def _call(self, name: str, method: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        return await method(*args, **kwargs)
+
+
+def unwrap(connector: Any) -> Any:
+    """Return the original connector underneath any proxies."""
+    while isinstance(connector, ConnectorProxy):
+        connector = connector._connector
+    return connector
+
+
+def find_proxy(connector: Any, proxy_type: type) -> Optional[ConnectorProxy]:
+    """The first ``proxy_type`` layer in a connector's chain, or None."""
+    while isinstance(connector, ConnectorProxy):
+        if isinstance(connector, proxy_type):
+            return connector
+        connector = connector._connector
+    return None
+
+
+def has_proxy(connector: Any, proxy_type: type) -> bool:
+    """Whether a proxy of ``proxy_type`` is already in the connector's chain."""
+    return find_proxy(connector, proxy_type) is not None
+
+
+def beneath(connector: Any, proxy_type: type) -> Any:
+    """
+    The part of a connector's chain underneath the first ``proxy_type`` layer.
+
+    Lets callers skip a layer (e.g. the cache, for live quotes) while keeping
+    the ones below it. Returns the connector unchanged if the layer is absent.
+    """
+    current = connector
+    while isinstance(current, ConnectorProxy):
+        if isinstance(current, proxy_type):
+            return current._connector
+        current = current._connector
+    return connector
+
+
+def wrap_connectors(manager, factory: Callable[[str, Any], ConnectorProxy], proxy_type: type,
+                    innermost: bool = False, names: Optional[Iterable[str]] = None):
+    """
+    Wrap each connector of a manager, once per proxy type.
+
+    Args:
+        manager: FinancialDataManager whose connectors should be wrapped
+        factory: Called with (connector name, connector) to build the proxy
+        proxy_type: Proxy class, used to skip connectors already wrapped by it
+        innermost: Insert the proxy directly around the original connector
+            instead of around the existing proxies
+        names: Only wrap these connectors (all of them if None)
+
+    Returns:
+        The same manager, for chaining
+    """
+    for name, connector in list(manager.connectors.items()):
+        if names is not None and name not in names:
+            continue
+        if has_proxy(connector, proxy_type):
+            continue
+        if not innermost or not isinstance(connector, ConnectorProxy):
+            manager.connectors[name] = factory(name, connector)
+            continue
+        parent = connector
+        while isinstance(parent._connector, ConnectorProxy):
+            parent = parent._connector
+        parent._connector = factory(name, parent._connector)
+    return manager
@@ -0,0 +1,57 @@
+"""
+Concurrent fan-out that yields results in completion order.
+
+Used by the batch API routes: every key is fetched concurrently (bounded by
+a semaphore) and each result is handed back as soon as it finishes, so a
+streaming response can send the first rows before the slowest key is done.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, NamedTuple, Optional
+
+
+class FanOutResult(NamedTuple):
+    key: str
+    value: Any
+    error: Optional[BaseException]
+    elapsed_ms: float
+
+
+def unique_symbols(symbols: Iterable[str]) -> List[str]:
+    """Upper-cased symbols with blanks and repeats removed, in request order."""
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+
+async def fan_out(keys: Iterable[str], fetch: Callable[[str], Awaitable[Any]],
+                  limit: int) -> AsyncIterator[FanOutResult]:
+    """
+    Fetch every key concurrently and yield results as they complete.
+
+    Failures are yielded with ``error`` set instead of being raised. If the
+    consumer stops early (e.g. the client disconnects), fetches still
+    running are cancelled.
+
+    Args:
+        keys: Keys to fetch (deduplicate them first)
+        fetch: Coroutine function called with each key
+        limit: Maximum number of fetches in flight
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(key: str) -> FanOutResult:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                value, error = await fetch(key), None
+            except Exception as e:
+                value, error = None, e
+            return FanOutResult(key, value, error, round((time.perf_counter() - started) * 1000, 3))
+
+    tasks = [asyncio.ensure_future(run(key)) for key in keys]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
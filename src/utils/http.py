@@ -0,0 +1,130 @@
+"""
+Shared, connection-pooled async HTTP client.
+
+One ``httpx.AsyncClient`` is created per data session and handed to every
+connector that declares an ``http_client`` attribute, so thousands of
+requests reuse the same keep-alive connections (HTTP/2 where the ``h2``
+package is installed and the server supports it) instead of opening a new
+TCP/TLS session per call. Host lookups go through a small TTL cache so
+reconnects after keep-alive expiry skip DNS.
+"""
+
+import asyncio
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import httpcore
+from loguru import logger
+
+from src.config.settings import settings
+from src.utils.connector_proxy import unwrap
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that caches resolved addresses for ``ttl`` seconds.
+
+    Connections are opened to the cached IP; TLS still uses the request's
+    host name for SNI and certificate checks.
+    """
+
+    def __init__(self, backend: Optional[httpcore.AsyncNetworkBackend] = None, ttl: float = 300.0):
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._ttl = ttl
+        self._addresses: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        cached = self._addresses.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+        self.lookups += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._addresses[key] = (time.monotonic() + self._ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = await self._resolve(host, port)
+        except OSError:
+            addresses = [host]
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout=timeout,
+                                                       local_address=local_address,
+                                                       socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # Every cached address failed: forget them so the next attempt resolves again
+        self._addresses.pop((host, port), None)
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(**overrides: Any) -> httpx.AsyncClient:
+    """
+    Build the pooled client used by a data session.
+
+    Pool size, keep-alive and timeouts come from settings; keyword
+    arguments are passed on to ``httpx.AsyncClient``.
+    """
+    http2 = settings.HTTP2_ENABLED and _http2_available()
+    if settings.HTTP2_ENABLED and not http2:
+        logger.debug("h2 is not installed, shared HTTP client uses HTTP/1.1")
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport = httpx.AsyncHTTPTransport(http2=http2, limits=limits, retries=1)
+    pool = getattr(transport, '_pool', None)
+    if pool is not None and hasattr(pool, '_network_backend'):
+        pool._network_backend = CachingNetworkBackend(ttl=settings.HTTP_DNS_CACHE_TTL)
+    options = {
+        'transport': transport,
+        'timeout': httpx.Timeout(settings.HTTP_TIMEOUT, connect=min(5.0, settings.HTTP_TIMEOUT)),
+        'headers': {'User-Agent': settings.HTTP_USER_AGENT},
+        'follow_redirects': True,
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+def share_http_client(manager, client: httpx.AsyncClient):
+    """
+    Hand one client to a manager and to every connector that takes one.
+
+    Connectors opt in by defining an ``http_client`` attribute; the client
+    is also available as ``manager.http_client``.
+
+    Returns:
+        Names of the connectors now using the shared client
+    """
+    manager.http_client = client
+    shared = []
+    for name, connector in manager.connectors.items():
+        original = unwrap(connector)
+        if hasattr(original, 'http_client'):
+            original.http_client = client
+            shared.append(name)
+    return shared
@@ -0,0 +1,363 @@
+"""
+In-process latency and throughput metrics with Prometheus text exposition.
+
+Hot paths record into the module-level ``metrics`` registry:
+
+- ``fri_connector_call_seconds{connector,method,layer}``: connector calls as
+  callers see them (``layer="api"``, cache hits included) and as sent
+  upstream (``layer="upstream"``, beneath the cache, price store and rate
+  limiter), with ``fri_connector_errors_total`` for calls that raised
+- ``fri_ratelimit_wait_seconds{connector}``: time queued for a token
+- ``fri_stage_seconds{stage}``: response building, split into ``encode``
+  (frame to JSON-ready columns) and ``serialize`` (payload to bytes)
+- ``fri_http_request_seconds{route,method,status}``: whole requests
+
+Point-in-time values such as cache hit ratios are read from collectors
+(``add_collector``) when the registry is rendered.
+
+While ``TimingMiddleware`` serves a request, timings recorded with a
+breakdown stage (in the request's task or tasks it spawns) are also summed
+per stage, for the optional ``Server-Timing`` response header.
+"""
+
+import bisect
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from src.utils.connector_proxy import ConnectorProxy, wrap_connectors
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Metric family -> (Prometheus type, help text)
+FAMILIES = {
+    'fri_connector_call_seconds': ('histogram', 'Connector call latency by layer (api: as callers see it, '
+                                                'upstream: beneath cache, store and rate limiter)'),
+    'fri_connector_errors_total': ('counter', 'Connector calls that raised'),
+    'fri_ratelimit_wait_seconds': ('histogram', 'Time spent waiting for a rate-limit token'),
+    'fri_stage_seconds': ('histogram', 'Response building time (encode: frame to columns, serialize: to bytes)'),
+    'fri_http_request_seconds': ('histogram', 'HTTP request latency by route'),
+    'fri_cache_hits_total': ('counter', 'Cache hits by tier'),
+    'fri_cache_misses_total': ('counter', 'Cache misses by tier'),
+    'fri_cache_hit_ratio': ('gauge', 'Cache hits / lookups by tier'),
+    'fri_cache_coalesced_total': ('counter', 'Cache misses that joined an in-flight fetch'),
+    'fri_ratelimit_throttled_total': ('counter', 'Upstream 429 responses'),
+    'fri_ratelimit_rate_factor': ('gauge', 'Adaptive rate factor (1 = configured rate)'),
+    'fri_analytics_jobs_total': ('counter', 'Jobs run in the analytics process pool'),
+    'fri_influx_written_total': ('counter', 'Lines written to InfluxDB'),
+    'fri_influx_queued': ('gauge', 'Lines waiting to be written to InfluxDB'),
+    'fri_cache_warm_hit_ratio': ('gauge', 'Share of tracked connector requests answered by the cache'),
+    'fri_cache_warm_coverage': ('gauge', 'Share of the hot cache keys held in memory'),
+    'fri_cache_warm_refreshed_total': ('counter', 'Hot cache keys refreshed before expiry'),
+    'fri_cache_warm_deferred_total': ('counter', 'Hot key refreshes deferred for the rate budget'),
+    'fri_cache_warm_failed_total': ('counter', 'Hot key refreshes that failed'),
+}
+
+PROMETHEUS_MEDIA_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    'request_timings', default=None
+)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf past the last bucket)."""
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return float('inf')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+class MetricsRegistry:
+    """
+    Histograms and counters keyed by family and label set.
+
+    Args:
+        buckets: Histogram bucket upper bounds in seconds
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def observe(self, name: str, seconds: float, breakdown: Optional[str] = None, **labels: str):
+        """Record a duration; with ``breakdown`` it also counts toward that stage of the current request."""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        if breakdown is not None:
+            timings = _request_timings.get()
+            if timings is not None:
+                timings[breakdown] = timings.get(breakdown, 0.0) + seconds
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, breakdown: Optional[str] = None, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, breakdown, **labels)
+
+    def add_collector(self, key: str, collect: Callable[[], Iterable[Sample]]):
+        """Register (or replace) a callable returning (family, labels, value) samples at render time."""
+        self._collectors[key] = collect
+
+    def remove_collector(self, key: str):
+        self._collectors.pop(key, None)
+
+    def _collected(self) -> List[Sample]:
+        samples: List[Sample] = []
+        for key, collect in list(self._collectors.items()):
+            try:
+                samples.extend(collect())
+            except Exception as e:
+                logger.warning(f"Metrics collector {key} failed: {e}")
+        return samples
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        families: Dict[str, List[str]] = {}
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        for (name, labels), value in sorted(self._counters.items()):
+            families.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, labels, value in self._collected():
+            families.setdefault(name, []).append(
+                f"{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}"
+            )
+
+        output = []
+        for name, lines in families.items():
+            kind, description = FAMILIES.get(name, ('untyped', name))
+            output.append(f"# HELP {name} {description}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(lines)
+        return '\n'.join(output) + '\n'
+
+    def summary(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Every series grouped by family, for printing.
+
+        Histogram rows hold their labels plus count, avg_ms and p95_ms (a
+        bucket upper bound); counter and collector rows their labels plus value.
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            result.setdefault(name, []).append({
+                **dict(labels),
+                'count': histogram.count,
+                'avg_ms': round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0.0,
+                'p95_ms': round(histogram.quantile(0.95) * 1000, 3),
+            })
+        for (name, labels), value in sorted(self._counters.items()):
+            result.setdefault(name, []).append({**dict(labels), 'value': value})
+        for name, labels, value in self._collected():
+            result.setdefault(name, []).append({**labels, 'value': value})
+        return result
+
+    def reset(self):
+        self._histograms.clear()
+        self._counters.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    """``Server-Timing`` header value for a stage breakdown (durations in ms)."""
+    parts = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ', '.join(parts)
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware recording per-route latency.
+
+    With ``header=True`` responses carry a ``Server-Timing`` header with the
+    time the request spent in each stage (connector, upstream, ratelimit,
+    encode, serialize) up to the moment headers are sent. Stages can overlap
+    when a request fans out, so they may add up to more than ``total``.
+
+    Args:
+        app: ASGI app to wrap
+        registry: Registry to record into (the module-level ``metrics`` if None)
+        header: Add the Server-Timing header
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None, header: bool = False):
+        self.app = app
+        self.registry = registry or metrics
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if self.header:
+                    value = server_timing(timings, time.perf_counter() - started)
+                    message = {**message, 'headers': [*message.get('headers', []),
+                                                      (b'server-timing', value.encode('latin-1'))]}
+            await send(message)
+
+        token = _request_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            self.registry.observe('fri_http_request_seconds', time.perf_counter() - started,
+                                  route=route, method=scope['method'], status=str(status))
+
+
+class _TimedConnector(ConnectorProxy):
+    """Records latency and errors of every async connector call."""
+
+    layer = ''
+    stage = ''
+
+    def __init__(self, name: str, connector: Any, registry: MetricsRegistry):
+        super().__init__(connector)
+        self._name = name
+        self._registry = registry
+
+    async def _call(self, name, method, args, kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            self._registry.inc('fri_connector_errors_total', connector=self._name, method=name, layer=self.layer)
+            raise
+        finally:
+            self._registry.observe('fri_connector_call_seconds', time.perf_counter() - started, self.stage,
+                                   connector=self._name, method=name, layer=self.layer)
+
+
+class CallTimer(_TimedConnector):
+    """Outermost layer: latency as callers see it, cache hits included."""
+
+    layer = 'api'
+    stage = 'connector'
+
+
+class UpstreamTimer(_TimedConnector):
+    """Innermost layer: latency of real upstream calls."""
+
+    layer = 'upstream'
+    stage = 'upstream'
+
+
+def install_metrics(manager, registry: Optional[MetricsRegistry] = None):
+    """
+    Time every connector call at the outermost layer and around the raw connector.
+
+    Install after the other data layers so the outer timer sees cache hits.
+
+    Args:
+        manager: FinancialDataManager whose connectors should be timed
+        registry: Registry to record into (the module-level ``metrics`` if None)
+
+    Returns:
+        The same manager, for chaining
+    """
+    registry = registry or metrics
+    wrap_connectors(manager, lambda name, connector: UpstreamTimer(name, connector, registry),
+                    UpstreamTimer, innermost=True)
+    return wrap_connectors(manager, lambda name, connector: CallTimer(name, connector, registry), CallTimer)
+
+
+def session_samples(stats: Dict[str, Any]) -> Iterator[Sample]:
+    """Samples for the point-in-time counters of ``DataSession.stats()``."""
+    cache = stats.get('cache') or {}
+    for tier in ('memory', 'redis', 'disk'):
+        tier_stats = cache.get(tier) or {}
+        if 'hits' not in tier_stats:
+            continue
+        hits, misses = tier_stats['hits'], tier_stats['misses']
+        yield 'fri_cache_hits_total', {'tier': tier}, hits
+        yield 'fri_cache_misses_total', {'tier': tier}, misses
+        yield 'fri_cache_hit_ratio', {'tier': tier}, hits / (hits + misses) if hits + misses else 0.0
+    if 'coalesced' in cache:
+        yield 'fri_cache_coalesced_total', {}, cache['coalesced']
+    for name, limit in ((stats.get('rate_limits') or {}).get('connectors') or {}).items():
+        yield 'fri_ratelimit_throttled_total', {'connector': name}, limit['rate_limited']
+        yield 'fri_ratelimit_rate_factor', {'connector': name}, limit['rate_factor']
+    if stats.get('analytics'):
+        yield 'fri_analytics_jobs_total', {}, stats['analytics']['jobs']
+    if stats.get('influx'):
+        yield 'fri_influx_written_total', {}, stats['influx']['written']
+        yield 'fri_influx_queued', {}, stats['influx']['queued']
+    warm = stats.get('warm') or {}
+    if warm.get('tracker'):
+        yield 'fri_cache_warm_hit_ratio', {}, warm['tracker']['hit_ratio']
+    if 'coverage' in warm:
+        yield 'fri_cache_warm_coverage', {}, warm['coverage']['ratio']
+        for counter in ('refreshed', 'deferred', 'failed'):
+            yield f'fri_cache_warm_{counter}_total', {}, warm[counter]
@@ -0,0 +1,391 @@
+"""
+Adaptive token-bucket rate limiting shared across processes.
+
+Every connector gets a token bucket sized from its provider's published
+limit. The bucket state lives in Redis, so all API workers and batch jobs
+draw from the same budget; when Redis is unreachable the state falls back
+to lock-protected files, which still coordinates every process on one box.
+
+Callers reserve a token and sleep until it is theirs, so a burst queues up
+at exactly the allowed rate instead of hammering the source. When a source
+answers 429, the bucket is blocked for every process until Retry-After (or
+an exponential backoff) has passed, and the local rate is halved and then
+recovers gradually. Queue wait time is recorded per connector.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from src.config.settings import settings, REDIS_URL
+from src.utils.connector_proxy import ConnectorProxy, wrap_connectors
+from src.utils.metrics import metrics
+
+# (requests, per seconds) for each connector, from the providers' limits
+DEFAULT_RATE_LIMITS = {
+    'yahoo_finance': (2, 1.0),
+    'alpha_vantage': (5, 60.0),
+    'sec_edgar': (10, 1.0),
+    'fred': (120, 60.0),
+}
+
+MIN_RATE_FACTOR = 0.1
+RECOVERY_STEP = 0.05
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+# Rate-limit exceptions of client libraries that are not imported here, and
+# the message of HTTP errors that lost their response
+_RATE_LIMIT_ERRORS = {'YFRateLimitError'}
+_RATE_LIMIT_MESSAGE = re.compile(r'\b429\b.*too many requests', re.IGNORECASE)
+
+_RESERVE_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+local blocked = tonumber(state[3]) or 0
+if blocked > now then
+    return 'b' .. tostring(blocked - now)
+end
+tokens = math.min(capacity, tokens + (now - ts) * rate) - 1
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, math.ceil(capacity / rate) + 300)
+if tokens >= 0 then
+    return 'r0'
+end
+return 'r' .. tostring(-tokens / rate)
+"""
+
+_BLOCK_SCRIPT = """
+local key = KEYS[1]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local blocked_until = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', key, 'blocked_until')) or 0
+if blocked_until > current then
+    redis.call('HSET', key, 'blocked_until', tostring(blocked_until), 'tokens', '0', 'ts', tostring(blocked_until))
+    redis.call('EXPIRE', key, math.ceil(tonumber(ARGV[1])) + 300)
+end
+return 1
+"""
+
+
+def _reserve(state: Dict[str, float], rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+    """Token-bucket step shared by the file backend (mirrors the Lua script)."""
+    if state.get('blocked_until', 0.0) > now:
+        return False, state['blocked_until'] - now
+    tokens = state.get('tokens', capacity)
+    ts = state.get('ts', now)
+    tokens = min(capacity, tokens + (now - ts) * rate) - 1
+    state['tokens'], state['ts'] = tokens, now
+    return True, 0.0 if tokens >= 0 else -tokens / rate
+
+
+class RedisBucketBackend:
+    """Bucket state in Redis, updated atomically by Lua scripts using server time."""
+
+    name = 'redis'
+
+    def __init__(self, url: str, prefix: str = 'fri:ratelimit:'):
+        import redis.asyncio as aioredis
+        self._client = aioredis.from_url(url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        self._reserve = self._client.register_script(_RESERVE_SCRIPT)
+        self._block = self._client.register_script(_BLOCK_SCRIPT)
+        self.prefix = prefix
+
+    async def reserve(self, key: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        reply = await self._reserve(keys=[self.prefix + key], args=[rate, capacity])
+        reply = reply.decode() if isinstance(reply, bytes) else reply
+        return reply[0] == 'r', float(reply[1:])
+
+    async def block(self, key: str, seconds: float):
+        await self._block(keys=[self.prefix + key], args=[seconds])
+
+    async def close(self):
+        await self._client.close()
+
+
+class FileBucketBackend:
+    """Bucket state in one JSON file per key, guarded by an OS file lock."""
+
+    name = 'file'
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _update(self, key: str, step):
+        path = self.directory / f"{key}.json"
+        with open(path, 'a+', encoding='utf-8') as fh:
+            _lock(fh)
+            try:
+                fh.seek(0)
+                raw = fh.read()
+                state = json.loads(raw) if raw else {}
+                result = step(state, time.time())
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps(state))
+                fh.flush()
+            finally:
+                _unlock(fh)
+        return result
+
+    async def reserve(self, key: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        return await asyncio.to_thread(self._update, key, lambda state, now: _reserve(state, rate, capacity, now))
+
+    async def block(self, key: str, seconds: float):
+        def step(state, now):
+            until = now + seconds
+            if until > state.get('blocked_until', 0.0):
+                state.update(blocked_until=until, tokens=0.0, ts=until)
+        await asyncio.to_thread(self._update, key, step)
+
+    async def close(self):
+        pass
+
+
+if os.name == 'nt':  # pragma: no cover - exercised on Windows only
+    import msvcrt
+
+    def _lock(fh):
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(fh):
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(fh):
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(fh):
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class RateLimitExceeded(Exception):
+    """Raised by connectors (or detected from their errors) on HTTP 429."""
+
+    def __init__(self, message: str = 'Too Many Requests', retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limit_signal(error: Exception) -> Tuple[bool, Optional[float]]:
+    """
+    Detect a 429 in a connector error and extract Retry-After.
+
+    Understands RateLimitExceeded, requests/httpx errors carrying a
+    ``response``, yfinance's YFRateLimitError, and messages of the form
+    "429 ... Too Many Requests" from errors that lost their response.
+
+    Returns:
+        (is rate limited, retry-after seconds or None)
+    """
+    if isinstance(error, RateLimitExceeded):
+        return True, error.retry_after
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+    if status == 429:
+        headers = getattr(response, 'headers', None) or {}
+        return True, _parse_retry_after(headers.get('Retry-After'))
+    if type(error).__name__ in _RATE_LIMIT_ERRORS or _RATE_LIMIT_MESSAGE.search(str(error)):
+        return True, None
+    return False, None
+
+
+class TokenBucketLimiter:
+    """
+    Per-connector token buckets with adaptive backoff and wait accounting.
+
+    Args:
+        limits: (requests, per seconds) per connector name
+        redis_url: Redis URL for the shared backend (None for files only)
+        directory: Directory for the file-lock fallback
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 redis_url: Optional[str] = REDIS_URL if settings.RATE_LIMIT_REDIS_ENABLED else None,
+                 directory: Optional[str] = None):
+        self.limits = {**DEFAULT_RATE_LIMITS, **(limits or {})}
+        self._redis_url = redis_url
+        self._redis: Optional[RedisBucketBackend] = None
+        self._redis_retry_at = 0.0
+        self._file = FileBucketBackend(directory or settings.RATE_LIMIT_DIR)
+        self._factors: Dict[str, float] = {}
+        self._backoff: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _backend(self):
+        if self._redis is None and self._redis_url and time.monotonic() >= self._redis_retry_at:
+            try:
+                self._redis = RedisBucketBackend(self._redis_url)
+            except ImportError as e:
+                logger.warning(f"Redis client unavailable, rate limits use file locks: {e}")
+                self._redis_url = None
+        return self._redis or self._file
+
+    def _redis_failed(self, e: Exception):
+        logger.warning(f"Redis rate limiter unavailable, falling back to file locks for 30s: {e}")
+        self._redis = None
+        self._redis_retry_at = time.monotonic() + 30.0
+
+    async def _call_backend(self, operation: str, *args):
+        backend = self._backend()
+        try:
+            return await getattr(backend, operation)(*args)
+        except Exception as e:
+            if backend is self._file:
+                raise
+            self._redis_failed(e)
+            return await getattr(self._file, operation)(*args)
+
+    def _stat(self, name: str) -> Dict[str, float]:
+        return self._stats.setdefault(name, {
+            'acquired': 0, 'wait_total_s': 0.0, 'wait_max_s': 0.0, 'rate_limited': 0,
+        })
+
+    def rate(self, name: str) -> Optional[Tuple[float, float]]:
+        """Current (tokens per second, capacity) for a connector, None if unlimited."""
+        limit = self.limits.get(name)
+        if limit is None:
+            return None
+        requests, per = limit
+        return requests / per * self._factors.get(name, 1.0), max(1.0, float(requests))
+
+    async def acquire(self, name: str) -> float:
+        """
+        Wait for a token for ``name``.
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        limit = self.rate(name)
+        if limit is None:
+            return 0.0
+        rate, capacity = limit
+        started = time.monotonic()
+        while True:
+            reserved, wait = await self._call_backend('reserve', name, rate, capacity)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if reserved:
+                break
+        waited = time.monotonic() - started
+        metrics.observe('fri_ratelimit_wait_seconds', waited, 'ratelimit', connector=name)
+        stat = self._stat(name)
+        stat['acquired'] += 1
+        stat['wait_total_s'] += waited
+        stat['wait_max_s'] = max(stat['wait_max_s'], waited)
+        return waited
+
+    async def rate_limited(self, name: str, retry_after: Optional[float] = None):
+        """Record a 429: block the bucket everywhere and slow the local rate down."""
+        backoff = min(MAX_BACKOFF, self._backoff.get(name, BASE_BACKOFF / 2) * 2)
+        self._backoff[name] = backoff
+        self._factors[name] = max(MIN_RATE_FACTOR, self._factors.get(name, 1.0) * 0.5)
+        delay = retry_after if retry_after is not None else backoff * (1 + random.random() * 0.1)
+        self._stat(name)['rate_limited'] += 1
+        logger.warning(f"{name} rate limited, pausing {delay:.1f}s (rate x{self._factors[name]:.2f})")
+        await self._call_backend('block', name, delay)
+
+    def succeeded(self, name: str):
+        """Record a successful call, recovering the rate gradually."""
+        if name in self._factors:
+            self._factors[name] = min(1.0, self._factors[name] + RECOVERY_STEP)
+            if self._factors[name] >= 1.0:
+                del self._factors[name]
+                self._backoff.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue wait time and 429 counts per connector."""
+        backend = self._redis.name if self._redis is not None else self._file.name
+        result = {}
+        for name, stat in self._stats.items():
+            acquired = stat['acquired']
+            result[name] = {
+                'acquired': acquired,
+                'wait_avg_ms': round(stat['wait_total_s'] / acquired * 1000, 3) if acquired else 0.0,
+                'wait_max_ms': round(stat['wait_max_s'] * 1000, 3),
+                'wait_total_s': round(stat['wait_total_s'], 3),
+                'rate_limited': stat['rate_limited'],
+                'rate_factor': self._factors.get(name, 1.0),
+            }
+        return {'backend': backend, 'connectors': result}
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.close()
+
+
+class RateLimitedConnector(ConnectorProxy):
+    """Connector wrapper that takes a token before every upstream call."""
+
+    def __init__(self, name: str, connector: Any, limiter: TokenBucketLimiter):
+        super().__init__(connector)
+        self._name = name
+        self._limiter = limiter
+
+    async def _call(self, name, method, args, kwargs):
+        for attempt in range(settings.RATE_LIMIT_MAX_RETRIES + 1):
+            await self._limiter.acquire(self._name)
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as e:
+                limited, retry_after = rate_limit_signal(e)
+                if not limited:
+                    raise
+                await self._limiter.rate_limited(self._name, retry_after)
+                if attempt == settings.RATE_LIMIT_MAX_RETRIES:
+                    raise
+                continue
+            self._limiter.succeeded(self._name)
+            return result
+
+
+def install_rate_limiter(manager, limiter: Optional[TokenBucketLimiter] = None) -> TokenBucketLimiter:
+    """
+    Put every connector of a manager behind the shared token buckets.
+
+    The limiter sits directly around the connectors, beneath the cache and
+    price store, so only real upstream calls consume tokens.
+
+    Args:
+        manager: FinancialDataManager to wrap
+        limiter: Limiter to use (a new TokenBucketLimiter if not given)
+
+    Returns:
+        The limiter
+    """
+    limiter = limiter or TokenBucketLimiter()
+    wrap_connectors(manager, lambda name, connector: RateLimitedConnector(name, connector, limiter),
+                    RateLimitedConnector, innermost=True)
+    return limiter
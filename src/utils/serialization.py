@@ -0,0 +1,191 @@
+"""
+Fast DataFrame serialization for API responses.
+
+Frames are sliced first and then encoded column by column straight from
+their NumPy arrays, instead of copying the whole frame, formatting every
+timestamp and walking each record in Python. Three formats are supported:
+
+- ``records``: ``[{"Close": ...}, ...]``, the original response shape
+- ``columnar``: ``{"index": [...], "Close": [...], ...}``
+- ``arrow``: Arrow IPC stream (requires pyarrow)
+
+NaN and NaT are encoded as ``null``.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi.responses import Response
+
+from src.utils.metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+FORMATS = ('columnar', 'records', 'arrow')
+JSON_MEDIA_TYPE = 'application/json'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+
+def _encode_array(values: np.ndarray) -> Any:
+    """Encode one column (or index) as a JSON-ready list or array."""
+    kind = values.dtype.kind
+    if kind == 'M':
+        strings = np.datetime_as_string(values, unit='s').astype(object)
+        strings[np.isnat(values)] = None
+        return strings.tolist()
+    if kind in 'biuf':
+        if orjson is not None:
+            # orjson writes numeric arrays natively, NaN becomes null
+            return np.ascontiguousarray(values)
+        if kind == 'f':
+            encoded = values.astype(object)
+            encoded[np.isnan(values)] = None
+            return encoded.tolist()
+        return values.tolist()
+    return _encode_objects(values)
+
+
+def _encode_objects(values: np.ndarray) -> List[Any]:
+    """
+    Encode an object column, keeping numbers numeric.
+
+    Columns that only hold numbers, booleans or timestamps (e.g. yfinance
+    statements, which come as object dtype) are converted and encoded like
+    typed columns; mixed columns keep each number as a number and turn
+    everything else into a string.
+    """
+    import pandas as pd
+
+    inferred = pd.Series(values, copy=False).infer_objects().to_numpy()
+    if inferred.dtype.kind in 'biufM':
+        encoded = _encode_array(inferred)
+        return encoded.tolist() if isinstance(encoded, np.ndarray) else encoded
+    return [None if missing else _encode_value(value) for value, missing in zip(values, pd.isna(values))]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return _encode_value(value.item())
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _label(column: Any) -> str:
+    """Column name as a string; dates use ISO format like encoded timestamps."""
+    return column.isoformat() if hasattr(column, 'isoformat') else str(column)
+
+
+def _index_array(index) -> np.ndarray:
+    """Index values, with tz-aware timestamps shown in their local wall time."""
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy()
+
+
+def _columns(df, rows: Optional[int]):
+    """
+    Yield (name, values) for the trailing ``rows`` rows of every column.
+
+    Each column is sliced as a NumPy view, so the frame itself is never
+    copied or re-indexed.
+    """
+    start = 0 if rows is None else max(len(df) - rows, 0)
+    by_name = df.columns.is_unique
+    for position, column in enumerate(df.columns):
+        series = df[column] if by_name else df.iloc[:, position]
+        yield _label(column), series.to_numpy()[start:]
+
+
+def _index(df, rows: Optional[int]) -> np.ndarray:
+    start = 0 if rows is None else max(len(df) - rows, 0)
+    return _index_array(df.index[start:])
+
+
+def to_columnar(df, rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Encode the last ``rows`` rows of a frame as ``{"index": [...], column: [...]}``.
+
+    Args:
+        df: DataFrame to encode
+        rows: Number of trailing rows to keep (all rows if None)
+
+    Returns:
+        Dictionary of column name to encoded values
+    """
+    payload = {'index': _encode_array(_index(df, rows))}
+    for name, values in _columns(df, rows):
+        payload[name] = _encode_array(values)
+    return payload
+
+
+def to_records(df, rows: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Encode the last ``rows`` rows of a frame as a list of row dictionaries.
+
+    Matches ``df.to_dict(orient="records")``: the index is not included.
+    """
+    names, columns = [], []
+    for name, values in _columns(df, rows):
+        encoded = _encode_array(values)
+        names.append(name)
+        columns.append(encoded.tolist() if isinstance(encoded, np.ndarray) else encoded)
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def to_arrow(df, rows: Optional[int] = None) -> bytes:
+    """Encode the last ``rows`` rows of a frame as an Arrow IPC stream."""
+    import pyarrow as pa
+
+    if rows is not None:
+        df = df.iloc[max(len(df) - rows, 0):]
+    table = pa.Table.from_pandas(df.rename(columns=_label), preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize a payload to JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+
+def ndjson_line(payload: Any) -> bytes:
+    """Serialize one payload as a newline-terminated JSON line."""
+    return dumps(payload) + b'\n'
+
+
+ENCODERS = {'columnar': to_columnar, 'records': to_records}
+
+
+def frame_response(df, fmt: str = 'records', rows: Optional[int] = None) -> Response:
+    """
+    Build an HTTP response for a frame in the requested format.
+
+    Args:
+        df: DataFrame to return
+        fmt: One of 'columnar', 'records' or 'arrow'
+        rows: Number of trailing rows to return (all rows if None)
+
+    Returns:
+        Response with the encoded frame
+    """
+    if fmt == 'arrow':
+        with metrics.timer('fri_stage_seconds', 'serialize', stage='serialize'):
+            return Response(content=to_arrow(df, rows), media_type=ARROW_MEDIA_TYPE)
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unknown format: {fmt}")
+    with metrics.timer('fri_stage_seconds', 'encode', stage='encode'):
+        payload = ENCODERS[fmt](df, rows)
+    with metrics.timer('fri_stage_seconds', 'serialize', stage='serialize'):
+        return Response(content=dumps(payload), media_type=JSON_MEDIA_TYPE)
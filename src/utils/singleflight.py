@@ -0,0 +1,56 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight upstream
+call instead of each issuing their own. Once the call finishes the key is
+released, so the next request fetches fresh data.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls by key.
+
+    The shared call runs as its own task, so a caller that is cancelled
+    (e.g. a client disconnect) does not cancel it for the other waiters.
+    All waiters receive the same result object and must not mutate it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func()`` for ``key`` unless a call for the same key is in flight.
+
+        Args:
+            key: Coalescing key (e.g. a FRED series ID)
+            func: Zero-argument coroutine function performing the upstream call
+
+        Returns:
+            The result of the shared call
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            self.calls += 1
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def in_flight(self) -> int:
+        """Number of keys currently being fetched."""
+        return len(self._inflight)
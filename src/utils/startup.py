@@ -0,0 +1,110 @@
+"""
+Import-time profiling for ``--profile-startup``.
+
+``ImportProfiler`` sits at the front of ``sys.meta_path`` and times every
+module executed after it is installed, attributing each module's own time
+(excluding its imports) and its cumulative time, much like
+``python -X importtime`` but switchable from the command line.
+"""
+
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+class _TimedLoader:
+    """Delegates to the real loader, timing ``exec_module``."""
+
+    def __init__(self, loader, name: str, profiler: 'ImportProfiler'):
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Put the real loader back so reloads and introspection see it
+        module.__spec__.loader = self._loader
+        module.__loader__ = self._loader
+        self._profiler._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(self._name, time.perf_counter() - started)
+
+
+class ImportProfiler:
+    """Meta-path hook recording self and cumulative import time per module."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.self_times: Dict[str, float] = {}
+        self.cumulative: Dict[str, float] = {}
+        self._children: List[float] = []
+
+    @classmethod
+    def install(cls) -> 'ImportProfiler':
+        profiler = cls()
+        sys.meta_path.insert(0, profiler)
+        return profiler
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, fullname, self)
+            return spec
+        return None
+
+    def _enter(self):
+        self._children.append(0.0)
+
+    def _leave(self, name: str, elapsed: float):
+        children = self._children.pop()
+        self.self_times[name] = elapsed - children
+        self.cumulative[name] = elapsed
+        if self._children:
+            self._children[-1] += elapsed
+
+    def by_package(self) -> List[Tuple[str, float]]:
+        """Self time summed per top-level package, slowest first."""
+        totals: Dict[str, float] = defaultdict(float)
+        for name, elapsed in self.self_times.items():
+            totals[name.partition('.')[0]] += elapsed
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def report(self, top: int = 15, load_times: Optional[Dict[str, float]] = None) -> str:
+        """Human-readable breakdown of everything imported since install."""
+        total = time.perf_counter() - self.started
+        imported = sum(self.self_times.values())
+        lines = [
+            "⏱️  Startup Profile:",
+            f"   Elapsed since start: {total * 1000:.1f} ms",
+            f"   Imports: {imported * 1000:.1f} ms across {len(self.self_times)} modules",
+            "\n   By package (self time):",
+        ]
+        for package, elapsed in self.by_package()[:top]:
+            lines.append(f"     {elapsed * 1000:8.1f} ms  {package}")
+        lines.append("\n   Slowest modules (self | cumulative):")
+        slowest = sorted(self.self_times.items(), key=lambda item: item[1], reverse=True)[:top]
+        for name, elapsed in slowest:
+            lines.append(f"     {elapsed * 1000:8.1f} | {self.cumulative[name] * 1000:8.1f} ms  {name}")
+        if load_times:
+            lines.append("\n   Lazily loaded components:")
+            for name, elapsed in sorted(load_times.items(), key=lambda item: item[1], reverse=True):
+                lines.append(f"     {elapsed * 1000:8.1f} ms  {name}")
+        return "\n".join(lines)
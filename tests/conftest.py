@@ -0,0 +1,12 @@
+"""
+Shared setup for the unit tests.
+
+Run from the repository root::
+
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
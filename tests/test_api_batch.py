@@ -0,0 +1,86 @@
+"""
+Batch NDJSON endpoints: one line per unique symbol, in completion order,
+with per-symbol error rows.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pandas as pd
+import pytest
+
+import src.main_api as api
+from src.config.settings import settings
+
+DELAYS = {'AAPL': 0.2, 'MSFT': 0.0, 'GOOGL': 0.1}
+
+
+class StubYahoo:
+    def __init__(self):
+        self.calls = []
+
+    async def get_stock_price(self, symbol, period='1mo'):
+        self.calls.append((symbol, period))
+        await asyncio.sleep(DELAYS.get(symbol, 0.0))
+        if symbol == 'BAD':
+            raise ValueError(f"No data found for {symbol}")
+        index = pd.bdate_range('2025-01-02', periods=3, name='Date')
+        return pd.DataFrame({'Close': [1.0, 2.0, 3.0], 'Volume': [10, 20, 30]}, index=index)
+
+    async def get_company_info(self, symbol):
+        self.calls.append((symbol, None))
+        await asyncio.sleep(DELAYS.get(symbol, 0.0))
+        return {'longName': f'{symbol} Inc.', 'sector': 'Technology'}
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    stub = StubYahoo()
+    monkeypatch.setattr(api.session, 'manager', SimpleNamespace(connectors={'yahoo_finance': stub}))
+    return stub
+
+
+def post(path, body):
+    async def request():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.post(path, json=body)
+
+    response = asyncio.run(request())
+    rows = [json.loads(line) for line in response.text.splitlines()] if response.status_code == 200 else None
+    return response, rows
+
+
+def test_prices_are_deduplicated_and_streamed_in_completion_order(yahoo):
+    response, rows = post('/stock/prices', {'symbols': ['aapl', 'MSFT', 'AAPL', 'googl', 'msft'],
+                                            'period': '6mo', 'fields': ['Close'], 'rows': 2})
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    assert [row['symbol'] for row in rows] == ['MSFT', 'GOOGL', 'AAPL']
+    assert sorted(yahoo.calls) == [('AAPL', '6mo'), ('GOOGL', '6mo'), ('MSFT', '6mo')]
+    assert all(row['status'] == 'ok' and row['latency_ms'] >= 0 for row in rows)
+    assert [record['Close'] for record in rows[0]['data']] == [2.0, 3.0]
+    assert set(rows[0]['data'][0]) == {'Close'}
+
+
+def test_failed_symbol_gets_an_error_row(yahoo):
+    _, rows = post('/stock/prices', {'symbols': ['BAD', 'MSFT']})
+    by_symbol = {row['symbol']: row for row in rows}
+    assert by_symbol['MSFT']['status'] == 'ok'
+    assert by_symbol['BAD']['status'] == 'error'
+    assert by_symbol['BAD']['error'] == 'No data found for BAD'
+    assert 'data' not in by_symbol['BAD']
+
+
+def test_info_batch_selects_fields(yahoo):
+    _, rows = post('/stock/info', {'symbols': ['msft', 'MSFT'], 'fields': ['longName', 'missing']})
+    assert rows == [{'symbol': 'MSFT', 'status': 'ok', 'latency_ms': rows[0]['latency_ms'],
+                     'data': {'longName': 'MSFT Inc.', 'missing': None}}]
+
+
+def test_too_many_symbols_is_rejected(yahoo, monkeypatch):
+    monkeypatch.setattr(settings, 'API_BATCH_MAX_SYMBOLS', 2)
+    response, _ = post('/stock/prices', {'symbols': ['AAPL', 'MSFT', 'GOOGL']})
+    assert response.status_code == 422
+    assert yahoo.calls == []
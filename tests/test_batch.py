@@ -0,0 +1,106 @@
+"""
+Batch scan mode: universe loading, connector throttling and result files.
+"""
+
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from src.analysis.batch import ConnectorThrottle, _ResultWriter, load_universe, run_batch
+
+
+class FakeConnector:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def get_stock_price(self, symbol, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if symbol == 'BAD':
+            raise RuntimeError(f"No data found for {symbol}")
+        index = pd.bdate_range('2025-01-02', periods=5, name='Date')
+        return pd.DataFrame({'Close': [1.0, 2.0, 3.0, 4.0, 5.0]}, index=index)
+
+    async def get_company_info(self, symbol):
+        return {'longName': f'{symbol} Inc.', 'marketCap': 1000}
+
+
+class FakeManager:
+    def __init__(self):
+        self.upstream = FakeConnector()
+        self.connectors = {'yahoo_finance': self.upstream}
+
+    async def get_stock_data(self, symbol, data_type='price', **kwargs):
+        connector = self.connectors['yahoo_finance']
+        if data_type == 'price':
+            return await connector.get_stock_price(symbol, **kwargs)
+        return await connector.get_company_info(symbol)
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as fh:
+        return [json.loads(line) for line in fh]
+
+
+def test_load_universe_dedups_and_uppercases(tmp_path):
+    universe = tmp_path / 'universe.txt'
+    universe.write_text("# watchlist\nmsft, GOOGL\n\naapl NVDA\n", encoding='utf-8')
+    assert load_universe(['aapl,MSFT', 'AAPL '], str(universe)) == ['AAPL', 'MSFT', 'GOOGL', 'NVDA']
+
+
+def test_throttle_caps_in_flight_calls():
+    async def scenario():
+        upstream = FakeConnector()
+        throttled = ConnectorThrottle(upstream, 2)
+        await asyncio.gather(*(throttled.get_stock_price(s) for s in ('A', 'B', 'C', 'D', 'E')))
+        return upstream.peak
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_run_batch_writes_jsonl_with_error_rows(tmp_path):
+    output = tmp_path / 'out' / 'results.jsonl'
+    manager = FakeManager()
+    report = asyncio.run(run_batch(['AAPL', 'BAD', 'MSFT'], 'basic', str(output), manager=manager,
+                                   batch_size=3, max_workers=1))
+
+    rows = {row['symbol']: row for row in read_jsonl(output)}
+    assert set(rows) == {'AAPL', 'BAD', 'MSFT'}
+    assert rows['AAPL']['status'] == 'ok'
+    assert rows['AAPL']['current_price'] == 5.0
+    assert rows['AAPL']['company'] == 'AAPL Inc.'
+    assert rows['BAD'] == {'symbol': 'BAD', 'analysis': 'basic', 'status': 'error',
+                           'error': 'No data found for BAD', 'latency_ms': rows['BAD']['latency_ms']}
+    assert (report['symbols'], report['succeeded'], report['failed']) == (3, 2, 1)
+    assert report['output'] == str(output)
+    assert manager.upstream.peak == 1
+
+
+def test_run_batch_writes_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    output = tmp_path / 'results.parquet'
+    asyncio.run(run_batch(['AAPL', 'BAD'], 'basic', str(output), manager=FakeManager()))
+
+    frame = pd.read_parquet(output).set_index('symbol')
+    assert frame.loc['AAPL', 'status'] == 'ok'
+    assert frame.loc['BAD', 'status'] == 'error'
+    assert frame.loc['AAPL', 'current_price'] == 5.0
+
+
+def test_parquet_writer_buffers_rows_and_encodes_lists(tmp_path, monkeypatch):
+    written = {}
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', lambda self, path, index=True: written.update(frame=self))
+    writer = _ResultWriter(str(tmp_path / 'results.parquet'))
+    writer.write({'symbol': 'AAPL', 'sources': ['yahoo_finance', 'alpha_vantage'], 'error': None})
+    writer.write({'symbol': 'MSFT', 'sources': [], 'error': 'timeout'})
+    assert not (tmp_path / 'results.parquet').exists() and 'frame' not in written
+    writer.close()
+
+    frame = written['frame']
+    assert frame['sources'].tolist() == ['["yahoo_finance", "alpha_vantage"]', '[]']
+    assert pd.isna(frame.loc[0, 'error']) and frame.loc[1, 'error'] == 'timeout'
@@ -0,0 +1,107 @@
+"""Cache codec, LRU tier and TieredCache behaviour."""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cache import codec, lru
+from src.cache.lru import MISSING, LRUCache
+from src.cache.tiered import TieredCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(lru, 'time', clock)
+    return clock
+
+
+def prices():
+    index = pd.date_range('2024-01-01', periods=4, tz='America/New_York', name='Date')
+    return pd.DataFrame({'Close': [1.0, np.nan, 3.0, 4.0], 'Volume': np.arange(4, dtype='int64'),
+                         'Flag': [True, False, True, False]}, index=index)
+
+
+@pytest.mark.parametrize('frame', [
+    prices(),
+    pd.DataFrame({'Name': ['a', None, 'c'], 'Value': [1.5, 2.5, None]}, index=pd.Index([3, 1, 2])),
+    pd.DataFrame({pd.Timestamp('2023-09-30'): [1e9, None]}, index=['Revenue', 'Net Income'], dtype=object),
+    pd.DataFrame({'Close': np.linspace(0, 1, 5000)}, index=pd.date_range('2000-01-01', periods=5000)),
+], ids=['tz-index', 'object-columns', 'statements', 'compressed'])
+def test_frames_round_trip(frame):
+    decoded = codec.decode(codec.encode(frame))
+    pd.testing.assert_frame_equal(decoded, frame, check_index_type=False, check_freq=False)
+
+
+@pytest.mark.parametrize('value', [
+    {'longName': 'Apple Inc.', 'marketCap': 3.0e12, 'sector': None, 'officers': [{'age': 61}]},
+    [1, 'two', 3.5, None],
+    42,
+    'text',
+])
+def test_json_values_round_trip(value):
+    assert codec.decode(codec.encode(value)) == value
+
+
+@pytest.mark.parametrize('value', [
+    pd.Series([1.0, 2.0]),
+    {'longName': pd.Series(['Apple Inc.'])},
+    pd.DataFrame({'When': [pd.Timestamp('2024-01-02')]}).astype(object),
+    pd.DataFrame({'a': [1]}, index=pd.MultiIndex.from_tuples([(1, 2)])),
+])
+def test_unsupported_values_raise(value):
+    with pytest.raises(codec.CodecError):
+        codec.encode(value)
+
+
+def test_decode_rejects_foreign_blobs():
+    with pytest.raises(codec.CodecError):
+        codec.decode(b'not a cache blob')
+
+
+def test_lru_expires_and_evicts(clock):
+    cache = LRUCache(2)
+    cache.set('a', 1, ttl=10)
+    cache.set('b', 2)
+    assert cache.get('a') == 1 and 'a' in cache
+    assert cache.expires_in('a') == 10
+
+    cache.set('c', 3)  # 'b' is now the least recently used
+    assert cache.get('b') is MISSING
+    assert cache.evictions == 1
+
+    clock.now += 10
+    assert 'a' not in cache
+    assert cache.get('a') is MISSING
+    assert cache.get('c') == 3
+    assert cache.stats() == {'entries': 1, 'max_entries': 2, 'hits': 2, 'misses': 2,
+                             'evictions': 1, 'expirations': 1}
+
+
+def test_tiered_cache_keeps_unencodable_values_in_memory(tmp_path):
+    async def scenario():
+        cache = TieredCache(max_entries=10, redis_url=None, cache_dir=str(tmp_path))
+        info = {'longName': pd.Series(['Apple Inc.'])}
+        await cache.set('info', info, ttl=60, persistent=True)
+        assert cache.encode_errors == 1
+        assert await cache.get('info') is info
+        assert not any(tmp_path.rglob('*.bin'))
+
+        frame = prices()
+        await cache.set('bars', frame, ttl=None, persistent=True)
+        cache.memory.clear()
+        restored = await cache.get('bars', persistent=True)
+        pd.testing.assert_frame_equal(restored, frame, check_index_type=False, check_freq=False)
+        assert cache.disk.hits == 1
+
+    asyncio.run(scenario())
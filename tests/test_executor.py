@@ -0,0 +1,54 @@
+"""
+AnalyticsExecutor: array arguments travel through shared memory to a worker
+process, and every shared block is released whatever the job does.
+"""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from src.analysis import indicators
+from src.analysis.executor import AnalyticsExecutor
+
+SHM = '/dev/shm'
+
+
+def shared_blocks():
+    return {name for name in os.listdir(SHM) if name.startswith('psm_')} if os.path.isdir(SHM) else set()
+
+
+@pytest.fixture(scope='module')
+def executor():
+    executor = asyncio.run(AnalyticsExecutor(max_workers=1).start())
+    yield executor
+    asyncio.run(executor.close())
+
+
+@pytest.fixture
+def no_leaks():
+    before = shared_blocks()
+    yield
+    assert shared_blocks() - before == set()
+
+
+def test_latest_technicals_in_a_worker(executor, no_leaks):
+    close = np.cumsum(np.random.default_rng(7).normal(0.1, 1.0, 260)) + 100.0
+    result = asyncio.run(executor.run(indicators.latest_technicals, close))
+    assert result == pytest.approx(indicators.latest_technicals(close), rel=1e-12)
+    assert executor.stats()['shared_bytes'] >= close.nbytes
+
+
+def test_array_results_are_copied_out_of_shared_memory(executor, no_leaks):
+    values = np.arange(12.0).reshape(3, 4)
+    # ravel returns a view of the shared input; it must come back as a copy
+    result = asyncio.run(executor.run(np.ravel, values))
+    np.testing.assert_array_equal(result, np.arange(12.0))
+
+
+def test_blocks_are_released_when_the_job_raises(executor, no_leaks):
+    with pytest.raises(np.linalg.LinAlgError):
+        asyncio.run(executor.run(np.linalg.inv, np.zeros((2, 2))))
+    # The worker survives for the next job
+    assert asyncio.run(executor.run(np.sum, np.ones(5))) == 5.0
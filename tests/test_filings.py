@@ -0,0 +1,365 @@
+"""
+SEC filings: the streaming submission parser, the local inverted index and
+deduplicating ingestion, on small inline full submissions.
+"""
+
+import asyncio
+import shutil
+
+import pytest
+
+from src.filings.index import FilingIndex
+from src.filings.ingest import find_filings, ingest_filings
+from src.filings.parser import _fact_value, _Sections, parse_filing
+
+# Inline XBRL 10-K: a table of contents, then the body, an exhibit, an image
+# and an instance that must be ignored because the inline facts were found
+APPLE = """<SEC-DOCUMENT>0000320193-23-000106.txt : 20231103
+<SEC-HEADER>0000320193-23-000106.hdr.sgml : 20231103
+ACCESSION NUMBER:		0000320193-23-000106
+CONFORMED SUBMISSION TYPE:	10-K
+CONFORMED PERIOD OF REPORT:	20230930
+FILED AS OF DATE:		20231103
+FILER:
+	COMPANY DATA:
+		COMPANY CONFORMED NAME:			Apple Inc.
+		CENTRAL INDEX KEY:			0000320193
+</SEC-HEADER>
+<DOCUMENT>
+<TYPE>10-K
+<SEQUENCE>1
+<FILENAME>aapl-20230930.htm
+<DESCRIPTION>10-K
+<TEXT>
+<html><body>
+<ix:header><ix:resources>
+<xbrli:context id="FY2023"><xbrli:period><xbrli:startDate>2022-09-25</xbrli:startDate><xbrli:endDate>2023-09-30</xbrli:endDate></xbrli:period></xbrli:context>
+<xbrli:context id="FY2022"><xbrli:period><xbrli:startDate>2021-09-26</xbrli:startDate><xbrli:endDate>2022-09-24</xbrli:endDate></xbrli:period></xbrli:context>
+<xbrli:context id="FY2023_iPhone"><xbrli:entity><xbrli:segment><xbrldi:explicitMember dimension="srt:ProductOrServiceAxis">aapl:IPhoneMember</xbrldi:explicitMember></xbrli:segment></xbrli:entity><xbrli:period><xbrli:startDate>2022-09-25</xbrli:startDate><xbrli:endDate>2023-09-30</xbrli:endDate></xbrli:period></xbrli:context>
+<xbrli:context id="AsOf2023"><xbrli:period><xbrli:instant>2023-09-30</xbrli:instant></xbrli:period></xbrli:context>
+</ix:resources></ix:header>
+<p>UNITED STATES SECURITIES AND EXCHANGE COMMISSION</p>
+<p>Apple Inc. annual report for the fiscal year</p>
+<table>
+<tr><td>Item 1.</td><td>Business</td></tr>
+<tr><td>Item 1A.</td><td>Risk Factors</td></tr>
+<tr><td>Item 7.</td><td>MD&amp;A</td></tr>
+</table>
+<p>Forward-looking statements are discussed below.</p>
+<p>Item 1. Business</p>
+<p>The Company designs iPhone smartphones and wearables, and sells services.</p>
+<p>Item 7. Management's Discussion and Analysis</p>
+<p>Total net sales were <ix:nonFraction name="us-gaap:Revenues" contextRef="FY2023" unitRef="usd" decimals="-6" scale="6" format="ixt:num-dot-decimal">383,285</ix:nonFraction> million
+and iPhone net sales were <ix:nonFraction name="us-gaap:Revenues" contextRef="FY2023_iPhone" unitRef="usd" decimals="-6" scale="6">200,583</ix:nonFraction> million.</p>
+<p>Prior year net sales were <ix:nonFraction name="us-gaap:Revenues" contextRef="FY2022" unitRef="usd" decimals="-6" scale="6">394,328</ix:nonFraction> million. Services revenue grew.</p>
+<p>Other income (expense) was <ix:nonFraction name="us-gaap:NonoperatingIncomeExpense" contextRef="FY2023" unitRef="usd" decimals="-6" scale="6" sign="-">565</ix:nonFraction> million.</p>
+<table><tr><td>Net sales</td><td><ix:nonFraction name="us-gaap:Revenues" contextRef="FY2023" unitRef="usd" decimals="-6" scale="6">383,285</ix:nonFraction></td></tr>
+<tr><td>Cash</td><td><ix:nonFraction name="us-gaap:CashAndCashEquivalentsAtCarryingValue" contextRef="AsOf2023" unitRef="usd" decimals="-6" scale="6">29,965</ix:nonFraction></td></tr></table>
+</body></html>
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>EX-99.1
+<SEQUENCE>2
+<FILENAME>a8-kex991.htm
+<DESCRIPTION>Press release
+<TEXT>
+<html><body><p>Apple reports fourth quarter results.</p><p>Record iPhone revenue in the quarter.</p></body></html>
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>GRAPHIC
+<SEQUENCE>3
+<FILENAME>logo.jpg
+<TEXT>
+begin 644 logo.jpg
+uuencodedjunk
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>EX-101.INS
+<SEQUENCE>4
+<FILENAME>aapl-20230930.xml
+<TEXT>
+<?xml version="1.0"?>
+<xbrl>
+<xbrli:context id="FY2023"><xbrli:period><xbrli:startDate>2022-09-25</xbrli:startDate><xbrli:endDate>2023-09-30</xbrli:endDate></xbrli:period></xbrli:context>
+<us-gaap:Goodwill contextRef="FY2023" unitRef="usd" decimals="-6">1000000</us-gaap:Goodwill>
+</xbrl>
+</TEXT>
+</DOCUMENT>
+</SEC-DOCUMENT>
+"""
+
+# Pre-inline filing: a plain-text primary document, facts only in the instance
+MICROSOFT = """ACCESSION NUMBER:		0000789019-09-000001
+CONFORMED SUBMISSION TYPE:	10-K
+CONFORMED PERIOD OF REPORT:	20090630
+FILED AS OF DATE:		20090730
+COMPANY CONFORMED NAME:			MICROSOFT CORP
+CENTRAL INDEX KEY:			0000789019
+<DOCUMENT>
+<TYPE>10-K
+<SEQUENCE>1
+<FILENAME>d10k.txt
+<TEXT>
+<PAGE>
+PART I
+ITEM 1. BUSINESS
+Microsoft develops software and cloud services.
+ITEM 7. MANAGEMENT'S DISCUSSION AND ANALYSIS
+Revenue declined as demand for software slowed.
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>EX-101.INS
+<SEQUENCE>2
+<FILENAME>msft-20090630.xml
+<TEXT>
+<?xml version="1.0"?>
+<xbrl>
+<xbrli:context id="FY2009"><xbrli:period><xbrli:startDate>2008-07-01</xbrli:startDate><xbrli:endDate>2009-06-30</xbrli:endDate></xbrli:period></xbrli:context>
+<us-gaap:Revenues contextRef="FY2009" unitRef="usd" decimals="-6">58437000000</us-gaap:Revenues>
+<us-gaap:Goodwill contextRef="FY2009" unitRef="usd" xsi:nil="true"/>
+<dei:DocumentType contextRef="FY2009">10-K</dei:DocumentType>
+</xbrl>
+</TEXT>
+</DOCUMENT>
+"""
+
+
+def write(root, ticker, form, accession, text):
+    directory = root / 'sec-edgar-filings' / ticker / form / accession
+    directory.mkdir(parents=True)
+    path = directory / 'full-submission.txt'
+    path.write_text(text)
+    return path
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def filings(tmp_path):
+    root = tmp_path / 'sec'
+    return root, {'AAPL': write(root, 'AAPL', '10-K', '0000320193-23-000106', APPLE),
+                  'MSFT': write(root, 'MSFT', '10-K', '0000789019-09-000001', MICROSOFT)}
+
+
+@pytest.fixture
+def index(tmp_path, filings):
+    root, _ = filings
+    index = FilingIndex(str(tmp_path / 'index'))
+    run(ingest_filings([str(root)], index, concurrency=2))
+    return index
+
+
+# -- parser --------------------------------------------------------------
+
+def test_submission_header_and_documents(filings):
+    _, paths = filings
+    filing = parse_filing(paths['AAPL'])
+    assert {k: filing[k] for k in ('accession', 'form', 'company', 'cik', 'ticker', 'filed', 'period')} == {
+        'accession': '0000320193-23-000106', 'form': '10-K', 'company': 'Apple Inc.', 'cik': '0000320193',
+        'ticker': 'AAPL', 'filed': '2023-11-03', 'period': '2023-09-30'}
+    assert filing['bytes'] == paths['AAPL'].stat().st_size
+
+    sections = {s['item']: s for s in filing['sections']}
+    assert list(sections) == ['cover', '1', '7', 'EX-99.1']
+    assert sections['cover']['text'].startswith('UNITED STATES SECURITIES')
+    assert sections['EX-99.1']['title'] == 'Press release'
+    assert sections['EX-99.1']['text'] == 'Apple reports fourth quarter results.\nRecord iPhone revenue in the quarter.'
+    # Hidden XBRL contexts and skipped attachments contribute no text
+    text = '\n'.join(s['text'] for s in filing['sections'])
+    assert '2022-09-25' not in text and 'uuencodedjunk' not in text
+
+
+def test_longest_occurrence_of_each_item_is_kept(filings):
+    _, paths = filings
+    sections = {s['item']: s for s in parse_filing(paths['AAPL'])['sections']}
+    # The contents entry for Item 7 carries one sentence; the body is longer
+    assert sections['7']['title'] == "Management's Discussion and Analysis"
+    assert 'Total net sales were 383,285 million' in sections['7']['text']
+    assert 'Forward-looking' not in sections['7']['text']
+    # Item 1A only appears in the contents, with no text of its own
+    assert '1A' not in sections
+
+
+def test_section_detection_and_limits():
+    sections = _Sections(limit=12, terms=True)
+    for block in ('Cover page', 'Item 2.02 Results of Operations', 'Quarterly revenue grew strongly',
+                  'Item 9.01. Exhibits', 'Item 2 of the agreement ' + 'x' * 200):
+        sections.add(block)
+    result = {s['item']: s for s in sections.result()}
+    assert list(result) == ['cover', '2.02', '9.01']
+    assert result['2.02']['title'] == 'Results of Operations'
+    assert result['2.02']['text'] == 'Quarterly re'
+    assert result['2.02']['length'] == len('Quarterly revenue grew strongly') + 1
+    # Term counts cover the text past the limit, and the title
+    assert result['2.02']['terms'] == {'results': 1, 'operations': 1, 'quarterly': 1, 'revenue': 1, 'grew': 1,
+                                       'strongly': 1}
+    # A long block starting with "Item" is text, not a heading
+    assert result['9.01']['text'].startswith('Item 2 of')
+
+    untitled = _Sections(limit=100)
+    untitled.add('No headings here')
+    assert [s['item'] for s in untitled.result()] == ['body']
+
+
+def test_inline_facts_resolve_contexts(filings):
+    _, paths = filings
+    facts = {(f['concept'], f['period_end'], f['dimensional']): f for f in parse_filing(paths['AAPL'])['facts']}
+    # The repeated Revenues fact in the table is dropped; the instance's Goodwill is not read
+    assert len(facts) == 5
+    revenue = facts[('us-gaap:Revenues', '2023-09-30', False)]
+    assert revenue == {'concept': 'us-gaap:Revenues', 'value': 383285e6, 'unit': 'usd', 'decimals': '-6',
+                       'period_start': '2022-09-25', 'period_end': '2023-09-30', 'dimensional': False}
+    assert facts[('us-gaap:Revenues', '2023-09-30', True)]['value'] == 200583e6
+    assert facts[('us-gaap:NonoperatingIncomeExpense', '2023-09-30', False)]['value'] == -565e6
+    cash = facts[('us-gaap:CashAndCashEquivalentsAtCarryingValue', '2023-09-30', False)]
+    assert cash['period_start'] is None
+
+
+def test_instance_fallback_for_filings_without_inline_xbrl(filings):
+    _, paths = filings
+    filing = parse_filing(paths['MSFT'])
+    assert (filing['company'], filing['period']) == ('MICROSOFT CORP', '2009-06-30')
+    assert [s['item'] for s in filing['sections']] == ['cover', '1', '7']
+    assert filing['sections'][1]['text'] == 'Microsoft develops software and cloud services.'
+    # Goodwill is nil and DocumentType has no unit
+    assert filing['facts'] == [{'concept': 'us-gaap:Revenues', 'value': 58437000000.0, 'unit': 'usd',
+                                'decimals': '-6', 'period_start': '2008-07-01', 'period_end': '2009-06-30',
+                                'dimensional': False}]
+
+
+@pytest.mark.parametrize('text, attrs, inline, expected', [
+    ('1,234', {'scale': '6'}, True, 1234e6),
+    ('1,234', {'scale': '-2'}, True, 12.34),
+    ('565', {'sign': '-'}, True, -565.0),
+    ('1.234,5', {'format': 'ixt:num-comma-decimal'}, True, 1234.5),
+    ('$ (1,000.25)', {'format': 'ixt:num-dot-decimal'}, True, 1000.25),
+    ('—', {}, True, 0.0),
+    ('None', {'format': 'ixt:fixed-zero'}, True, 0.0),
+    ('12', {'scale': 'x'}, True, 12.0),
+    ('n/a', {}, True, None),
+    ('', {'xsi:nil': 'true'}, True, None),
+    ('58437000000', {}, False, 58437000000.0),
+    ('1,234', {'scale': '6'}, False, None),
+])
+def test_fact_value(text, attrs, inline, expected):
+    assert _fact_value(text, attrs, inline) == (pytest.approx(expected) if expected is not None else None)
+
+
+def test_single_document_takes_accession_from_path(tmp_path):
+    html = APPLE.split('<TEXT>\n', 1)[1].split('</TEXT>', 1)[0]
+    path = tmp_path / '0000320193-23-000106.htm'
+    path.write_text(html)
+    filing = parse_filing(path)
+    assert (filing['accession'], filing['form'], filing['ticker']) == ('0000320193-23-000106', None, None)
+    assert len(filing['facts']) == 5
+
+    unnamed = tmp_path / 'report.htm'
+    unnamed.write_text(html)
+    with pytest.raises(ValueError):
+        parse_filing(unnamed)
+
+
+# -- index ---------------------------------------------------------------
+
+def test_search_intersects_postings_and_ranks_by_bm25(index):
+    hits = run(index.search('iphone'))
+    assert {(h['ticker'], h['item']) for h in hits} == {('AAPL', '1'), ('AAPL', '7'), ('AAPL', 'EX-99.1')}
+    scores = [h['score'] for h in hits]
+    assert scores == sorted(scores, reverse=True) and scores[-1] > 0
+    assert len(run(index.search('iphone', limit=1))) == 1
+
+    # Every term must appear in the section
+    assert {h['item'] for h in run(index.search('iPhone services'))} == {'1', '7'}
+    assert run(index.search('iphone software')) == []
+    assert run(index.search('unindexedterm software')) == []
+    assert run(index.search('the of')) == []
+    assert run(index.search('uuencodedjunk')) == []
+
+    hit, = run(index.search('press release'))
+    assert (hit['accession'], hit['item'], hit['preview']) == (
+        '0000320193-23-000106', 'EX-99.1', 'Apple reports fourth quarter results.\nRecord iPhone revenue in the quarter.')
+
+
+def test_search_filters_by_ticker_and_form(index):
+    assert {h['ticker'] for h in run(index.search('services'))} == {'AAPL', 'MSFT'}
+    assert {h['ticker'] for h in run(index.search('services', ticker='msft'))} == {'MSFT'}
+    assert run(index.search('services', form='10-q')) == []
+    assert len(run(index.search('services', ticker='AAPL', form='10-k'))) == 2
+
+
+def test_fact_filters(index):
+    def periods(*args, **kwargs):
+        return [(row['ticker'], row['period_end'], row['value']) for row in run(index.facts(*args, **kwargs))]
+
+    assert periods('Revenues') == [('AAPL', '2023-09-30', 383285e6), ('AAPL', '2022-09-24', 394328e6),
+                                   ('MSFT', '2009-06-30', 58437e6)]
+    assert periods('US-GAAP:revenues', ticker='aapl', period='2023') == [('AAPL', '2023-09-30', 383285e6)]
+    assert periods('Revenues', period='2022-09') == [('AAPL', '2022-09-24', 394328e6)]
+    assert periods('ifrs-full:Revenues') == []
+    assert periods('Revenues', limit=1) == [('AAPL', '2023-09-30', 383285e6)]
+    assert len(periods('Revenues', include_dimensional=True)) == 4
+    assert periods('Goodwill') == []
+
+    row, = run(index.facts('revenues', ticker='MSFT'))
+    assert (row['accession'], row['form'], row['filed'], row['concept']) == (
+        '0000789019-09-000001', '10-K', '2009-07-30', 'us-gaap:Revenues')
+
+
+def test_index_is_saved_and_reloaded(index, tmp_path):
+    reloaded = FilingIndex(str(tmp_path / 'index'))
+    assert reloaded.stats() == index.stats() == {'backend': 'local', 'filings': 2, 'sections': 7,
+                                                 'terms': index.stats()['terms'], 'facts': 6}
+    assert run(reloaded.search('iphone services')) == run(index.search('iphone services'))
+    assert run(reloaded.facts('Revenues')) == run(index.facts('Revenues'))
+
+
+def test_open_index_reloads_when_another_process_saves(tmp_path, filings):
+    root, paths = filings
+    directory = str(tmp_path / 'index')
+    reader = FilingIndex(directory)
+    assert run(reader.search('iphone')) == []
+
+    run(ingest_filings([str(paths['AAPL'])], FilingIndex(directory)))
+    assert len(run(reader.search('iphone'))) == 3
+
+    # Unsaved additions of its own are not replaced by the file
+    run(reader.add(parse_filing(paths['MSFT'], tokenize_sections=True)))
+    run(ingest_filings([str(root)], FilingIndex(directory)))
+    assert reader.stats()['filings'] == 2
+    run(reader.flush())
+    assert FilingIndex(directory).stats()['filings'] == 2
+
+
+# -- ingestion -----------------------------------------------------------
+
+def test_ingest_deduplicates_accessions(tmp_path, filings):
+    root, paths = filings
+    # The same submission outside the downloader layout is only known after parsing
+    loose = root / 'loose'
+    loose.mkdir()
+    shutil.copy(paths['AAPL'], loose / 'full-submission.txt')
+    (root / 'loose' / 'notes.htm').write_text('<html><p>ignored</p></html>')
+    assert len(find_filings([str(root)])) == 3
+
+    directory = str(tmp_path / 'index')
+    report = run(ingest_filings([str(root)], FilingIndex(directory)))
+    assert {k: report[k] for k in ('files', 'indexed', 'duplicates', 'failed', 'sections', 'facts')} == {
+        'files': 3, 'indexed': 2, 'duplicates': 1, 'failed': 0, 'sections': 7, 'facts': 6}
+    ticker, = {h['ticker'] for h in run(FilingIndex(directory).search('iphone'))}
+    assert ticker == 'AAPL'
+
+    again = run(ingest_filings([str(root)], FilingIndex(directory)))
+    assert (again['indexed'], again['duplicates'], again['failed']) == (0, 3, 0)
+
+
+def test_ingest_counts_unparseable_files(tmp_path):
+    bad = tmp_path / 'report.htm'
+    bad.write_text('<html><p>no accession anywhere</p></html>')
+    report = run(ingest_filings([str(bad)], FilingIndex(str(tmp_path / 'index'))))
+    assert (report['files'], report['indexed'], report['failed']) == (1, 0, 1)
@@ -0,0 +1,49 @@
+"""Incremental indicator state against the vectorized engine."""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from src.analysis.incremental import IncrementalIndicators
+from src.analysis.indicators import technical_indicators
+
+
+@pytest.fixture
+def bars():
+    close = 100 + np.random.default_rng(3).standard_normal(120).cumsum()
+    return close, close + 1.5, close - 1.5
+
+
+def assert_same(values, expected):
+    assert values.keys() == expected.keys()
+    for name, value in expected.items():
+        assert (math.isnan(value) and math.isnan(values[name])) or values[name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_matches_vectorized_engine(bars):
+    close, high, low = bars
+    state = IncrementalIndicators.from_history('abc', close, high, low)
+    expected = {name: float(values[-1]) for name, values in technical_indicators(close, high, low).items()}
+    assert_same({k: v for k, v in state.values().items() if k != 'Close'}, expected)
+
+
+def test_revising_the_last_bar_replaces_it(bars):
+    close, high, low = bars
+    state = IncrementalIndicators.from_history('abc', close[:-1], high[:-1], low[:-1], timestamps=range(len(close) - 1))
+    for revision in (close[-1] - 3.0, close[-1] + 7.0, close[-1]):
+        state.update(revision, revision + 1.5, revision - 1.5, timestamp=len(close) - 1)
+    fresh = IncrementalIndicators.from_history('abc', close, high, low, timestamps=range(len(close)))
+    assert state.bars == fresh.bars == len(close)
+    assert_same(state.values(), fresh.values())
+
+
+def test_undo_survives_save_and_restore(bars):
+    close, high, low = bars
+    state = IncrementalIndicators.from_history('abc', close, high, low, timestamps=range(len(close)))
+    restored = IncrementalIndicators.from_dict(json.loads(json.dumps(state.to_dict())))
+    restored.update(close[-1] + 5.0, timestamp=len(close) - 1)
+    state.update(close[-1] + 5.0, timestamp=len(close) - 1)
+    assert_same(restored.values(), state.values())
+    assert list(restored.closes_50.values) == list(state.closes_50.values)
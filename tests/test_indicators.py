@@ -0,0 +1,46 @@
+"""The vectorized indicator engine against the pandas formulas it replaces."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import indicators
+
+
+@pytest.fixture
+def close():
+    values = 100 + np.random.default_rng(7).standard_normal(250).cumsum()
+    values[[0, 40, 41, 42, 120, 200, 201]] = np.nan
+    return values
+
+
+def assert_matches(actual, expected):
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype=float), rtol=1e-10, atol=1e-10, equal_nan=True)
+
+
+def test_sma_and_rolling_std_match_pandas(close):
+    series = pd.Series(close)
+    assert_matches(indicators.sma(close, 20), series.rolling(20).mean())
+    assert_matches(indicators.rolling_std(close, 20), series.rolling(20).std())
+
+
+@pytest.mark.parametrize('alpha, min_periods', [(2 / 21, 1), (1 / 14, 14)])
+def test_ewm_decays_through_gaps_like_pandas(close, alpha, min_periods):
+    expected = pd.Series(close).ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()
+    assert_matches(indicators._ewm(close, alpha, min_periods), expected)
+
+
+def test_rsi_matches_wilder_smoothing(close):
+    delta = pd.Series(close).diff()
+    gain = delta.clip(lower=0).where(delta.notna()).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    loss = (-delta).clip(lower=0).where(delta.notna()).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    assert_matches(indicators.rsi(close), 100 - 100 / (1 + gain / loss))
+
+
+def test_universe_rows_match_single_symbol(close):
+    universe = np.vstack([close, close[::-1] * 2])
+    result = indicators.technical_indicators(universe)
+    for row in range(2):
+        single = indicators.technical_indicators(universe[row])
+        for name, values in single.items():
+            assert_matches(result[name][row], values)
@@ -0,0 +1,70 @@
+"""
+InfluxHistoryConnector: closed ranges are served from the store, with the
+bars it lacks after its last one fetched from upstream.
+"""
+
+import asyncio
+
+import pandas as pd
+
+from src.storage.influx import InfluxHistoryConnector
+
+TZ = 'America/New_York'
+
+
+def bars(start, end):
+    index = pd.bdate_range(start, end, tz=TZ, name='Date')
+    return pd.DataFrame({'Close': range(len(index)), 'Volume': 100}, index=index, dtype='float64')
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = []
+
+    async def get_stock_price(self, symbol, **kwargs):
+        self.calls.append(kwargs)
+        end = pd.Timestamp(kwargs['end']) - pd.Timedelta(days=1)
+        return bars(kwargs['start'], end)
+
+
+class Reader:
+    def __init__(self, frame):
+        self.frame = frame
+
+    async def load_prices(self, symbol, start, end=None, source='yahoo_finance'):
+        return self.frame
+
+
+def fetch(stored, start='2025-01-06', end='2025-02-01'):
+    upstream = Upstream()
+    history = InfluxHistoryConnector('yahoo_finance', upstream, Reader(stored))
+    frame = asyncio.run(history.get_stock_price('AAPL', start=start, end=end))
+    return frame, upstream.calls, history.served
+
+
+def test_complete_range_is_served_from_store():
+    stored = bars('2025-01-06', '2025-01-31')
+    frame, calls, served = fetch(stored)
+    assert calls == []
+    assert served == 1
+    pd.testing.assert_frame_equal(frame, stored)
+
+
+def test_truncated_range_fetches_only_the_tail():
+    frame, calls, served = fetch(bars('2025-01-06', '2025-01-17'))
+    assert calls == [{'start': '2025-01-18', 'end': '2025-02-01'}]
+    assert served == 1
+    assert frame.index[-1] == pd.Timestamp('2025-01-31', tz=TZ)
+    assert frame.index.is_unique and frame.index.is_monotonic_increasing
+
+
+def test_range_ending_on_a_weekend_is_complete_at_friday():
+    _, calls, _ = fetch(bars('2025-01-06', '2025-01-31'), end='2025-02-03')
+    assert calls == []
+
+
+def test_store_missing_the_start_goes_upstream():
+    frame, calls, served = fetch(bars('2025-01-20', '2025-01-31'))
+    assert calls == [{'start': '2025-01-06', 'end': '2025-02-01'}]
+    assert served == 0
+    assert frame.index[0] == pd.Timestamp('2025-01-06', tz=TZ)
@@ -0,0 +1,148 @@
+"""
+Metrics registry: Prometheus text output, the Server-Timing breakdown and
+connector, cache and rate-limit accounting.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.utils.connector_proxy import ConnectorProxy
+from src.utils.metrics import MetricsRegistry, TimingMiddleware, install_metrics, metrics, session_samples
+from src.utils.rate_limiter import TokenBucketLimiter
+
+
+def lines(text, prefix):
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+def test_histogram_buckets_sum_and_count():
+    registry = MetricsRegistry(buckets=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.05, 0.05, 5.0):
+        registry.observe('fri_stage_seconds', seconds, stage='encode')
+    text = registry.render()
+
+    assert '# TYPE fri_stage_seconds histogram' in text
+    assert lines(text, 'fri_stage_seconds_bucket') == [
+        'fri_stage_seconds_bucket{stage="encode",le="0.01"} 1',
+        'fri_stage_seconds_bucket{stage="encode",le="0.1"} 3',
+        'fri_stage_seconds_bucket{stage="encode",le="1.0"} 3',
+        'fri_stage_seconds_bucket{stage="encode",le="+Inf"} 4',
+    ]
+    assert lines(text, 'fri_stage_seconds_sum') == ['fri_stage_seconds_sum{stage="encode"} 5.105']
+    assert lines(text, 'fri_stage_seconds_count') == ['fri_stage_seconds_count{stage="encode"} 4']
+
+    row, = registry.summary()['fri_stage_seconds']
+    assert (row['stage'], row['count'], row['p95_ms']) == ('encode', 4, float('inf'))
+
+
+def test_counters_collectors_and_label_escaping():
+    registry = MetricsRegistry()
+    registry.inc('fri_connector_errors_total', connector='yahoo_finance', method='get_stock_price', layer='api')
+    registry.inc('fri_connector_errors_total', connector='yahoo_finance', method='get_stock_price', layer='api')
+    registry.add_collector('test', lambda: [('custom_value', {'path': 'C:\\data "raw"\nnext'}, 1.5)])
+    text = registry.render()
+
+    assert '# TYPE fri_connector_errors_total counter' in text
+    assert ('fri_connector_errors_total{connector="yahoo_finance",layer="api",method="get_stock_price"} 2'
+            in text)
+    assert '# TYPE custom_value untyped' in text
+    assert 'custom_value{path="C:\\\\data \\"raw\\"\\nnext"} 1.5' in text
+
+
+def test_failing_collector_does_not_break_rendering():
+    registry = MetricsRegistry()
+    registry.add_collector('broken', lambda: 1 / 0)
+    registry.inc('fri_cache_coalesced_total')
+    assert 'fri_cache_coalesced_total 1' in registry.render()
+
+
+def test_server_timing_header_sums_request_stages():
+    app = FastAPI()
+
+    @app.get('/work/{item}')
+    async def work(item: str):
+        with metrics.timer('fri_stage_seconds', 'encode', stage='encode'):
+            await asyncio.sleep(0.01)
+        metrics.observe('fri_stage_seconds', 0.002, 'encode', stage='encode')
+        metrics.observe('fri_stage_seconds', 0.003, stage='serialize')  # no breakdown: not in the header
+        return {'item': item}
+
+    registry = MetricsRegistry()
+
+    async def request():
+        transport = httpx.ASGITransport(app=TimingMiddleware(app, registry, header=True))
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.get('/work/1')
+
+    response = asyncio.run(request())
+    stages = dict(part.split(';dur=') for part in response.headers['server-timing'].split(', '))
+    assert set(stages) == {'encode', 'total'}
+    assert float(stages['encode']) >= 12.0  # the timed sleep plus the 2 ms observation
+    assert float(stages['total']) >= 10.0
+
+    row, = registry.summary()['fri_http_request_seconds']
+    assert (row['route'], row['method'], row['status'], row['count']) == ('/work/{item}', 'GET', '200', 1)
+
+
+def test_cache_hits_count_at_the_api_layer_only():
+    class Upstream:
+        async def get_stock_price(self, symbol):
+            return symbol
+
+    class Memo(ConnectorProxy):
+        def __init__(self, connector):
+            super().__init__(connector)
+            self.memo = {}
+
+        async def _call(self, name, method, args, kwargs):
+            if args not in self.memo:
+                self.memo[args] = await method(*args, **kwargs)
+            return self.memo[args]
+
+    class Manager:
+        connectors = {'yahoo_finance': Memo(Upstream())}
+
+    registry = MetricsRegistry()
+    manager = install_metrics(Manager(), registry)
+
+    async def scenario():
+        for _ in range(3):
+            await manager.connectors['yahoo_finance'].get_stock_price('AAPL')
+
+    asyncio.run(scenario())
+    counts = {row['layer']: row['count'] for row in registry.summary()['fri_connector_call_seconds']}
+    assert counts == {'api': 3, 'upstream': 1}
+
+
+def test_session_samples_report_cache_hit_ratios():
+    stats = {'cache': {'memory': {'hits': 3, 'misses': 1}, 'disk': {'hits': 0, 'misses': 0}, 'coalesced': 2},
+             'rate_limits': {'connectors': {'yahoo_finance': {'rate_limited': 1, 'rate_factor': 0.5}}}}
+    samples = {(name, tuple(labels.items())): value for name, labels, value in session_samples(stats)}
+    assert samples[('fri_cache_hits_total', (('tier', 'memory'),))] == 3
+    assert samples[('fri_cache_hit_ratio', (('tier', 'memory'),))] == 0.75
+    assert samples[('fri_cache_hit_ratio', (('tier', 'disk'),))] == 0.0
+    assert samples[('fri_cache_coalesced_total', ())] == 2
+    assert samples[('fri_ratelimit_rate_factor', (('connector', 'yahoo_finance'),))] == 0.5
+
+
+@pytest.fixture
+def clean_metrics():
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+def test_rate_limit_waits_are_recorded(tmp_path, clean_metrics):
+    limiter = TokenBucketLimiter({'slow': (1, 0.05)}, redis_url=None, directory=str(tmp_path))
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.acquire('slow')
+
+    asyncio.run(scenario())
+    row, = clean_metrics.summary()['fri_ratelimit_wait_seconds']
+    assert (row['connector'], row['count']) == ('slow', 3)
+    assert row['avg_ms'] * 3 >= 90  # two queued acquisitions of about 50 ms each
@@ -0,0 +1,95 @@
+"""
+Multi-source fetch: per-source timeouts, the overall deadline and partial
+results, and validation on the fetched payload.
+"""
+
+import asyncio
+
+import pandas as pd
+
+from src.analysis.multi_source import fetch_multi_source, validate_cross_source_data
+
+
+class Source:
+    def __init__(self, close=100.0, delay=0.0, fail=(), column='Close'):
+        self.close = close
+        self.delay = delay
+        self.fail = set(fail)
+        self.column = column
+        self.calls = 0
+
+    async def _answer(self, data_type, value):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if data_type in self.fail:
+            raise RuntimeError(f"{data_type} unavailable")
+        return value
+
+    async def get_stock_price(self, symbol, period='1mo'):
+        frame = pd.DataFrame({self.column: [self.close - 1, self.close]})
+        return await self._answer('price', frame)
+
+    async def get_company_info(self, symbol):
+        return await self._answer('info', {'longName': f'{symbol} Inc.'})
+
+
+class Manager:
+    def __init__(self, **connectors):
+        self.connectors = connectors
+
+
+def run(manager, **kwargs):
+    return asyncio.run(fetch_multi_source(manager, 'aapl', **kwargs))
+
+
+def test_slow_and_failing_sources_leave_a_partial_payload():
+    manager = Manager(
+        yahoo_finance=Source(100.0),
+        alpha_vantage=Source(101.0, fail={'info'}, column='4. close'),
+        slow=Source(delay=1.0),
+        stalled=Source(delay=5.0),
+        broken=Source(fail={'price', 'info'}),
+        fred=object(),  # no per-symbol methods: not queried
+    )
+    result = run(manager, deadline=0.3, timeouts={'slow': 0.05, 'stalled': 10.0})
+
+    assert result['symbol'] == 'AAPL'
+    assert set(result['sources']) == {'yahoo_finance', 'alpha_vantage', 'slow', 'stalled', 'broken'}
+    statuses = {name: timing['status'] for name, timing in result['timings'].items()}
+    assert statuses == {'yahoo_finance': 'ok', 'alpha_vantage': 'partial', 'slow': 'timeout',
+                        'stalled': 'deadline', 'broken': 'error'}
+
+    assert set(result['sources']['yahoo_finance']) == {'price', 'info'}
+    assert set(result['sources']['alpha_vantage']) == {'price'}
+    assert result['timings']['alpha_vantage']['errors'] == {'info': 'info unavailable'}
+    assert result['sources']['slow'] == {'error': 'timed out after 0.1s'}
+    assert result['timings']['slow']['timeout_s'] == 0.05
+    assert result['sources']['stalled'] == {'error': 'deadline of 0.3s exceeded'}
+    assert result['sources']['broken'] == {'error': 'price: price unavailable; info: info unavailable'}
+    assert result['elapsed_ms'] < 1000
+
+
+def test_per_source_timeout_is_capped_by_the_deadline():
+    result = run(Manager(yahoo_finance=Source()), deadline=0.5, timeouts={'yahoo_finance': 30.0})
+    assert result['timings']['yahoo_finance']['timeout_s'] == 0.5
+
+
+def test_validation_uses_the_given_payload():
+    yahoo, alpha = Source(100.0), Source(103.0, column='4. close')
+    manager = Manager(yahoo_finance=yahoo, alpha_vantage=alpha, down=Source(fail={'price', 'info'}))
+    payload = run(manager, deadline=1.0)
+    calls = (yahoo.calls, alpha.calls)
+
+    validation = validate_cross_source_data('aapl', payload)
+    check = validation['validations']['price_consistency']
+    assert (yahoo.calls, alpha.calls) == calls
+    assert check['prices'] == {'yahoo_finance': 100.0, 'alpha_vantage': 103.0}
+    assert check['max_deviation_pct'] == 3.0
+    assert check['is_consistent'] is False
+
+
+def test_validation_needs_two_priced_sources():
+    payload = {'sources': {'yahoo_finance': {'price': pd.DataFrame({'Close': [1.0]})},
+                           'alpha_vantage': {'error': 'timed out after 15.0s'}}}
+    check = validate_cross_source_data('AAPL', payload)['validations']['price_consistency']
+    assert check == {'prices': {'yahoo_finance': 1.0}, 'message': 'Fewer than two sources returned prices'}
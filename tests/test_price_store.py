@@ -0,0 +1,198 @@
+"""Delta fetching of daily price history through the PriceStore."""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.storage import price_store
+from src.storage.price_store import PriceStore, covering_period, install_price_store
+
+NEW_YORK = 'America/New_York'
+
+
+class Clock:
+    def __init__(self, now: str):
+        self.now = pd.Timestamp(now, tz=NEW_YORK)
+
+    def __call__(self, tz: str = 'UTC') -> pd.Timestamp:
+        return self.now.tz_convert(tz)
+
+
+class PeriodOnlyYahoo:
+    """The connector signature used in this tree: get_stock_price(symbol, period=...)."""
+
+    def __init__(self, clock: Clock, tz=NEW_YORK):
+        index = pd.bdate_range(end=clock.now.normalize().tz_localize(None), periods=600, name='Date')
+        index = index.tz_localize(tz) if tz else index
+        self.history = pd.DataFrame({'Close': np.arange(600.0), 'Volume': np.arange(600) * 10}, index=index)
+        self.clock = clock
+        self.calls = []
+
+    def _since(self, start):
+        start = pd.Timestamp(start)
+        tz = self.history.index.tz
+        start = start.tz_localize(tz) if tz and start.tzinfo is None else start
+        return self.history[self.history.index >= start]
+
+    async def get_stock_price(self, symbol, period='1mo'):
+        self.calls.append(period)
+        if period == 'max':
+            return self.history
+        if period in ('1d', '5d'):
+            return self.history.iloc[-int(period[0]):]
+        return self._since(price_store.period_start(period, self.clock('UTC').normalize()).tz_localize(None))
+
+
+class RangeYahoo(PeriodOnlyYahoo):
+    async def get_stock_price(self, symbol, period=None, start=None, end=None, interval='1d'):
+        if start is None:
+            return await super().get_stock_price(symbol, period)
+        self.calls.append((start, end))
+        frame = self._since(start)
+        return frame if end is None else frame[frame.index < pd.Timestamp(end).tz_localize(frame.index.tz)]
+
+
+class Manager:
+    def __init__(self, connector):
+        self.connectors = {'yahoo_finance': connector}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock('2024-03-06 11:00')  # a Wednesday, mid-session
+    monkeypatch.setattr(price_store, '_now', clock)
+    return clock
+
+
+def fetch(manager, period, symbol='AAPL'):
+    return asyncio.run(manager.connectors['yahoo_finance'].get_stock_price(symbol, period=period))
+
+
+def setup(tmp_path, upstream):
+    manager = Manager(upstream)
+    install_price_store(manager, PriceStore(str(tmp_path)))
+    return manager
+
+
+def test_period_only_connector_fetches_the_smallest_covering_period(tmp_path, clock):
+    upstream = PeriodOnlyYahoo(clock)
+    manager = setup(tmp_path, upstream)
+
+    first = fetch(manager, '6mo')
+    again = fetch(manager, '6mo')
+    assert upstream.calls == ['6mo', '5d']  # the tail reaches back to Tuesday's final bar
+    pd.testing.assert_frame_equal(again, first, check_freq=False)
+
+    clock.now = pd.Timestamp('2024-03-08 11:00', tz=NEW_YORK)  # Friday: five days reach back past Tuesday
+    fetch(manager, '6mo')
+    clock.now = pd.Timestamp('2024-03-11 11:00', tz=NEW_YORK)  # Monday: five calendar days fall short
+    fetch(manager, '6mo')
+    assert upstream.calls == ['6mo', '5d', '5d', '1mo']
+
+
+def test_period_only_backfill_fetches_the_period_once(tmp_path, clock):
+    upstream = PeriodOnlyYahoo(clock)
+    manager = setup(tmp_path, upstream)
+    fetch(manager, '1mo')
+    year = fetch(manager, '1y')
+    assert upstream.calls == ['1mo', '1y']
+    assert year.index[0] >= price_store.period_start('1y', clock('UTC').normalize())
+
+
+def test_range_connector_fetches_only_missing_bars(tmp_path, clock):
+    upstream = RangeYahoo(clock)
+    manager = setup(tmp_path, upstream)
+    fetch(manager, '1mo')
+    year = fetch(manager, '1y')
+    assert upstream.calls[0] == '1mo'
+    older, tail = upstream.calls[1:]
+    assert older[0] == price_store.period_start('1y', clock('UTC').normalize()).strftime('%Y-%m-%d')
+    assert older[1] == '2024-02-07'  # up to and including the first stored bar
+    assert tail == ('2024-03-05', None)
+    assert year.index.is_monotonic_increasing and not year.index.duplicated().any()
+
+
+def test_closed_session_skips_the_tail_fetch(tmp_path, clock):
+    upstream = PeriodOnlyYahoo(clock)
+    manager = setup(tmp_path, upstream)
+    fetch(manager, '6mo')  # during the session: the last bar is still forming
+
+    clock.now = pd.Timestamp('2024-03-06 17:00', tz=NEW_YORK)
+    fetch(manager, '6mo')  # after the close: refresh the bar once
+    fetch(manager, '6mo')
+    clock.now = pd.Timestamp('2024-03-07 08:00', tz=NEW_YORK)  # before the next open
+    fetch(manager, '6mo')
+    assert upstream.calls == ['6mo', '5d']
+
+
+def test_bars_without_exchange_timezone_always_refresh_the_tail(tmp_path, clock):
+    upstream = PeriodOnlyYahoo(clock, tz=None)
+    manager = setup(tmp_path, upstream)
+    clock.now = pd.Timestamp('2024-03-06 18:00', tz=NEW_YORK)
+    fetch(manager, '6mo')
+    fetch(manager, '6mo')
+    assert upstream.calls == ['6mo', '5d']
+
+
+def test_readjusted_history_is_refetched_whole(tmp_path, clock):
+    upstream = PeriodOnlyYahoo(clock)
+    manager = setup(tmp_path, upstream)
+    fetch(manager, '6mo')
+
+    # A 2:1 split: upstream halves every earlier bar, the stored ones are stale
+    upstream.history['Close'] /= 2
+    frame = fetch(manager, '6mo')
+    assert upstream.calls == ['6mo', '5d', '6mo']
+    assert manager.connectors['yahoo_finance'].rebased == 1
+    expected = upstream.history[upstream.history.index >= frame.index[0]]
+    np.testing.assert_allclose(frame['Close'].to_numpy(), expected['Close'].to_numpy())
+
+
+def test_changed_forming_bar_is_not_a_readjustment(tmp_path, clock):
+    upstream = PeriodOnlyYahoo(clock)
+    manager = setup(tmp_path, upstream)
+    fetch(manager, '6mo')
+
+    upstream.history.iloc[-1, 0] += 1.5  # today's bar moved since it was stored
+    frame = fetch(manager, '6mo')
+    assert upstream.calls == ['6mo', '5d']
+    assert frame['Close'].iloc[-1] == upstream.history['Close'].iloc[-1]
+
+
+def test_readjusted_older_history_is_refetched_whole(tmp_path, clock):
+    upstream = RangeYahoo(clock)
+    manager = setup(tmp_path, upstream)
+    fetch(manager, '1mo')
+
+    upstream.history['Close'] *= 0.99  # a dividend adjusts every earlier bar
+    fetch(manager, '1y')
+    assert upstream.calls[0] == '1mo' and upstream.calls[2] == '1y'
+    assert len(upstream.calls) == 3
+
+
+def test_call_without_period_passes_through(tmp_path, clock):
+    upstream = PeriodOnlyYahoo(clock)
+    manager = setup(tmp_path, upstream)
+    asyncio.run(manager.connectors['yahoo_finance'].get_stock_price('AAPL'))
+    assert upstream.calls == ['1mo']  # the connector's own default
+    assert PriceStore(str(tmp_path)).symbols() == []
+
+
+def test_connector_errors_are_not_swallowed(tmp_path, clock):
+    class Broken(PeriodOnlyYahoo):
+        async def get_stock_price(self, symbol, period='1mo'):
+            raise TypeError('bad payload')
+
+    with pytest.raises(TypeError, match='bad payload'):
+        fetch(setup(tmp_path, Broken(clock)), '6mo')
+
+
+def test_covering_period():
+    now = pd.Timestamp('2024-03-06', tz='UTC')
+    assert covering_period(pd.Timestamp('2024-03-06', tz=NEW_YORK), now) == '1d'
+    assert covering_period(pd.Timestamp('2024-03-02', tz='UTC'), now) == '5d'
+    assert covering_period(pd.Timestamp('2024-02-20'), now) == '1mo'
+    assert covering_period(pd.Timestamp('2023-01-01'), now) == '2y'
+    assert covering_period(pd.Timestamp('1990-01-01'), now) == 'max'
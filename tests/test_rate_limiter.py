@@ -0,0 +1,143 @@
+"""Token buckets, 429 backoff and the rate-limited connector wrapper."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.utils import rate_limiter
+from src.utils.rate_limiter import (MAX_BACKOFF, MIN_RATE_FACTOR, RECOVERY_STEP, RateLimitedConnector,
+                                    RateLimitExceeded, TokenBucketLimiter, _reserve, rate_limit_signal)
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    return TokenBucketLimiter({'fast': (20, 1.0), 'slow': (2, 1.0), 'burst': (1000, 1.0)}, redis_url=None, directory=str(tmp_path))
+
+
+def test_bucket_allows_a_burst_then_refills_at_the_rate():
+    state = {}
+    assert _reserve(state, rate=2.0, capacity=2.0, now=100.0) == (True, 0.0)
+    assert _reserve(state, rate=2.0, capacity=2.0, now=100.0) == (True, 0.0)
+    # Empty: the next token is half a second away, and reserving it queues the caller
+    assert _reserve(state, rate=2.0, capacity=2.0, now=100.0) == (True, 0.5)
+    assert _reserve(state, rate=2.0, capacity=2.0, now=100.0) == (True, 1.0)
+    # Two seconds later the debt of two tokens is paid off and two more have accrued
+    assert _reserve(state, rate=2.0, capacity=2.0, now=102.0) == (True, 0.0)
+    # Refill never exceeds the capacity
+    assert _reserve(state, rate=2.0, capacity=2.0, now=1000.0) == (True, 0.0)
+    assert state['tokens'] == 1.0
+
+
+def test_blocked_bucket_reports_the_remaining_block():
+    state = {'blocked_until': 105.0, 'tokens': 0.0, 'ts': 105.0}
+    assert _reserve(state, rate=2.0, capacity=2.0, now=103.0) == (False, 2.0)
+    assert _reserve(state, rate=2.0, capacity=2.0, now=105.5) == (True, 0.0)
+
+
+def test_acquire_queues_at_the_configured_rate(limiter):
+    async def scenario():
+        return [await limiter.acquire('fast') for _ in range(25)]
+
+    waits = asyncio.run(scenario())
+    assert sum(waits[:20]) < 0.05  # the burst capacity
+    assert sum(waits[20:]) >= 5 * 0.05 * 0.9
+    assert limiter.stats()['connectors']['fast']['acquired'] == 25
+    assert asyncio.run(limiter.acquire('unlimited')) == 0.0
+
+
+def test_429_halves_the_rate_and_doubles_the_backoff(limiter, tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limiter.random, 'random', lambda: 0.0)
+    blocks = []
+
+    async def block(key, seconds):
+        blocks.append(seconds)
+
+    monkeypatch.setattr(limiter._file, 'block', block)
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.rate_limited('slow')
+        await limiter.rate_limited('slow', retry_after=7.0)
+
+    asyncio.run(scenario())
+    assert blocks == [1.0, 2.0, 4.0, 7.0]
+    assert limiter.rate('slow') == (2.0 * max(MIN_RATE_FACTOR, 0.5 ** 4), 2.0)
+    assert limiter.stats()['connectors']['slow']['rate_limited'] == 4
+
+    for _ in range(10):
+        asyncio.run(limiter.rate_limited('slow'))
+    assert limiter._factors['slow'] == MIN_RATE_FACTOR
+    assert blocks[-1] == MAX_BACKOFF
+
+
+def test_successes_recover_the_rate_gradually(limiter):
+    asyncio.run(limiter.rate_limited('slow', retry_after=0.0))
+    limiter.succeeded('slow')
+    assert limiter.rate('slow')[0] == pytest.approx(2.0 * (0.5 + RECOVERY_STEP))
+    for _ in range(int(0.5 / RECOVERY_STEP)):
+        limiter.succeeded('slow')
+    assert limiter.rate('slow') == (2.0, 2.0)
+    assert 'slow' not in limiter._backoff
+
+
+def test_block_is_shared_through_the_file_backend(limiter, tmp_path):
+    asyncio.run(limiter.rate_limited('slow', retry_after=30.0))
+    state = json.loads((tmp_path / 'slow.json').read_text())
+    other = TokenBucketLimiter({'slow': (2, 1.0)}, redis_url=None, directory=str(tmp_path))
+    reserved, wait = asyncio.run(other._file.reserve('slow', 2.0, 2.0))
+    assert state['tokens'] == 0.0
+    assert not reserved and 29.0 < wait <= 30.0
+
+
+def test_connector_retries_429s_and_passes_other_errors(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limiter.settings, 'RATE_LIMIT_MAX_RETRIES', 2)
+
+    class Upstream:
+        def __init__(self, failures):
+            self.failures = list(failures)
+            self.calls = 0
+
+        async def get_stock_price(self, symbol):
+            self.calls += 1
+            if self.failures:
+                raise self.failures.pop(0)
+            return symbol
+
+    flaky = Upstream([RateLimitExceeded(retry_after=0.0), RateLimitExceeded(retry_after=0.0)])
+    assert asyncio.run(RateLimitedConnector('burst', flaky, limiter).get_stock_price('AAPL')) == 'AAPL'
+    assert flaky.calls == 3
+
+    exhausted = Upstream([RateLimitExceeded(retry_after=0.0)] * 3)
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(RateLimitedConnector('burst', exhausted, limiter).get_stock_price('AAPL'))
+    assert exhausted.calls == 3
+
+    broken = Upstream([KeyError('Close')])
+    with pytest.raises(KeyError):
+        asyncio.run(RateLimitedConnector('burst', broken, limiter).get_stock_price('AAPL'))
+    assert broken.calls == 1
+
+
+def test_rate_limit_signal_reads_retry_after():
+    request = httpx.Request('GET', 'https://example.com')
+    error = httpx.HTTPStatusError('429', request=request,
+                                  response=httpx.Response(429, headers={'Retry-After': '12'}, request=request))
+    assert rate_limit_signal(error) == (True, 12.0)
+    assert rate_limit_signal(RuntimeError('429 Client Error: Too Many Requests for url')) == (True, None)
+    assert rate_limit_signal(ValueError('No data found')) == (False, None)
+
+
+def test_rate_limit_signal_recognises_yfinance_errors():
+    class YFRateLimitError(Exception):
+        pass
+
+    assert rate_limit_signal(YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')) == (True, None)
+
+
+def test_rate_limit_signal_ignores_unrelated_mentions():
+    assert rate_limit_signal(KeyError('429')) == (False, None)
+    assert rate_limit_signal(ValueError('No data found for symbol 4290.T')) == (False, None)
+    assert rate_limit_signal(RuntimeError('HTTP 500 while reading the rate limit docs')) == (False, None)
+    assert rate_limit_signal(RuntimeError('Too many requests queued locally')) == (False, None)
@@ -0,0 +1,120 @@
+"""
+Universe reconciliation over small synthetic matrices: each symbol carries
+one kind of disagreement between the reference and the other source.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.reconcile import _coverage, _episodes, _ffill, reconcile_universe
+from src.storage.price_store import PriceStore
+from src.storage.universe import build_universe_matrix
+
+DAYS = pd.bdate_range('2024-01-02', periods=30, tz='America/New_York', name='Date')
+
+
+def day(i):
+    return np.datetime64(DAYS[i].date(), 'D')
+
+
+def matrix(tmp_path, name, closes):
+    store = PriceStore(str(tmp_path / name / 'prices'))
+    for symbol, close in closes.items():
+        frame = pd.DataFrame({'Close': close}, index=DAYS).dropna()
+        store.merge(symbol, frame)
+    return build_universe_matrix(str(tmp_path / name / 'matrix'), store=store, fields=('Close',),
+                                 dtype='float64')
+
+
+@pytest.fixture
+def report(tmp_path):
+    # 1% a day, so a repeated close is a visible stale bar and ratios only step where intended
+    base = 100.0 * 1.01 ** np.arange(len(DAYS))
+    reference = {symbol: base.copy() for symbol in ('SPLT', 'MISS', 'STAL', 'DEVN', 'SAME')}
+
+    other = {symbol: base.copy() for symbol in reference}
+    other['SPLT'][:10] *= 2  # history not adjusted for a 2:1 split on day 10
+    other['MISS'][5] = np.nan
+    other['STAL'][8:10] = other['STAL'][7]
+    other['DEVN'][12:14] *= (1.05, 1.08)
+
+    return reconcile_universe({'yahoo': matrix(tmp_path, 'yahoo', reference),
+                               'alpha': matrix(tmp_path, 'alpha', other)})
+
+
+def rows(anomalies, symbol):
+    picked = anomalies[anomalies['symbol'] == symbol]
+    return [(r.source, r.check, r.start, r.end, r.bars, round(float(r.value), 4) if r.value == r.value else None)
+            for r in picked.itertuples()]
+
+
+def test_split_is_a_step_and_a_deviation_run(report):
+    assert rows(report['anomalies'], 'SPLT') == [
+        ('alpha', 'deviation', day(0), day(9), 10, 1.0),
+        ('alpha', 'split', day(10), day(10), 1, 2.0),
+    ]
+
+
+def test_missing_bar(report):
+    assert rows(report['anomalies'], 'MISS') == [('alpha', 'missing', day(5), day(5), 1, None)]
+
+
+def test_stale_run(report):
+    assert rows(report['anomalies'], 'STAL') == [('alpha', 'stale', day(8), day(9), 2, 0.01)]
+
+
+def test_deviation_run_reports_its_largest_deviation(report):
+    assert rows(report['anomalies'], 'DEVN') == [('alpha', 'deviation', day(12), day(13), 2, 0.08)]
+
+
+def test_summary(report):
+    summary = report['summary']
+    assert rows(report['anomalies'], 'SAME') == []
+    assert summary['reference'] == 'yahoo'
+    assert summary['sessions'] == len(DAYS)
+    assert summary['sources']['alpha'] == {'symbols': 5, 'missing_symbols': 0, 'bars_compared': 5 * 30 - 1}
+    assert summary['episodes'] == {'deviation': 2, 'missing': 1, 'split': 1, 'stale': 1}
+    assert summary['flagged_bars'] == {'deviation': 12, 'missing': 1, 'split': 1, 'stale': 2}
+    assert summary['symbols_flagged'] == 4
+
+
+def test_reconcile_needs_two_sources(tmp_path):
+    with pytest.raises(ValueError):
+        reconcile_universe({'yahoo': matrix(tmp_path, 'yahoo', {'AAPL': np.ones(len(DAYS))})})
+
+
+def test_episodes_find_runs_and_their_worst_value():
+    mask = np.array([[1, 1, 0, 1],
+                     [0, 0, 0, 0],
+                     [0, 1, 1, 1]], dtype=bool)
+    metric = np.array([[0.1, 0.3, 9.0, 0.2],
+                       [9.0, 9.0, 9.0, 9.0],
+                       [9.0, 0.5, 0.7, 0.6]])
+    found_rows, first, last, bars, worst = _episodes(mask, metric)
+    assert found_rows.tolist() == [0, 0, 2]
+    assert first.tolist() == [0, 3, 1]
+    assert last.tolist() == [1, 3, 3]
+    assert bars.tolist() == [2, 1, 3]
+    np.testing.assert_allclose(worst, [0.3, 0.2, 0.7])
+
+
+def test_episodes_without_metric_or_flags():
+    _, _, _, bars, worst = _episodes(np.array([[False, True]]))
+    assert bars.tolist() == [1] and np.isnan(worst).all()
+    assert len(_episodes(np.zeros((2, 3), dtype=bool), np.ones((2, 3)))[0]) == 0
+
+
+def test_ffill_and_coverage():
+    values = np.array([[np.nan, 1.0, np.nan, 3.0],
+                       [2.0, np.nan, np.nan, np.nan],
+                       [np.nan] * 4])
+    filled = _ffill(values)
+    np.testing.assert_array_equal(filled[0], [np.nan, 1.0, 1.0, 3.0])
+    np.testing.assert_array_equal(filled[1], [2.0, 2.0, 2.0, 2.0])
+    assert np.isnan(filled[2]).all()
+
+    first, last = _coverage(~np.isnan(values))
+    assert first.tolist() == [1, 0, 4]
+    assert last.tolist()[:2] == [3, 0]
+    assert first[2] > last[2]
@@ -0,0 +1,119 @@
+"""
+Record and replay: responses recorded beneath the data layers replay from
+the cassette with simulated latency and upstream rate limits.
+"""
+
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from src.config.settings import settings
+from src.storage.replay import ReplayError, ReplayManager, ReplayMiss, install_recorder
+from src.utils.rate_limiter import RateLimitExceeded
+
+INDEX = pd.bdate_range(end='2024-03-06', periods=200, tz='America/New_York', name='Date')
+
+
+class Upstream:
+    async def get_stock_price(self, symbol, period=None):
+        if symbol == 'BUSY':
+            raise RateLimitExceeded(retry_after=5)
+        if symbol == 'GONE':
+            raise ValueError(f"{symbol}: possibly delisted")
+        await asyncio.sleep(0.02)
+        return pd.DataFrame({'Close': range(len(INDEX)), 'Volume': 100}, index=INDEX, dtype='float64')
+
+    async def get_company_info(self, symbol):
+        return {'symbol': symbol, 'longName': f'{symbol} Inc.', 'marketCap': 10 ** 12}
+
+
+class Manager:
+    def __init__(self):
+        self.connectors = {'yahoo_finance': Upstream()}
+
+
+@pytest.fixture
+def cassette(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'REPLAY_LATENCY_MS', None)
+    monkeypatch.setattr(settings, 'REPLAY_LATENCY_JITTER', 0.0)
+    manager = Manager()
+    install_recorder(manager, str(tmp_path))
+    yahoo = manager.connectors['yahoo_finance']
+
+    async def record():
+        await yahoo.get_stock_price('AAPL')
+        await yahoo.get_company_info('AAPL')
+        for symbol in ('BUSY', 'GONE'):
+            with pytest.raises(Exception):
+                await yahoo.get_stock_price(symbol)
+
+    asyncio.run(record())
+    return str(tmp_path)
+
+
+def replay(manager, method, *args, **kwargs):
+    return asyncio.run(getattr(manager.connectors['yahoo_finance'], method)(*args, **kwargs))
+
+
+def test_recorded_responses_replay(cassette):
+    manager = ReplayManager(cassette, latency_ms=0, rate_limits={})
+    assert manager.get_available_connectors() == ['yahoo_finance']
+
+    frame = replay(manager, 'get_stock_price', 'AAPL')
+    expected = asyncio.run(Upstream().get_stock_price('AAPL'))
+    pd.testing.assert_frame_equal(frame, expected, check_freq=False)
+    assert replay(manager, 'get_company_info', 'AAPL') == {'symbol': 'AAPL', 'longName': 'AAPL Inc.',
+                                                            'marketCap': 10 ** 12}
+    assert asyncio.run(manager.get_stock_data('AAPL', 'info'))['longName'] == 'AAPL Inc.'
+
+
+def test_unrecorded_period_is_cut_from_the_recording(cassette):
+    manager = ReplayManager(cassette, latency_ms=0, rate_limits={})
+    frame = replay(manager, 'get_stock_price', 'aapl', period='1mo')
+    assert frame.index[-1] == INDEX[-1]
+    assert frame.index[0] >= INDEX[-1] - pd.DateOffset(months=1)
+    assert len(frame) < len(INDEX)
+
+
+def test_errors_replay_but_rate_limits_are_not_recorded(cassette):
+    manager = ReplayManager(cassette, latency_ms=0, rate_limits={})
+    with pytest.raises(ReplayError, match='possibly delisted'):
+        replay(manager, 'get_stock_price', 'GONE')
+    with pytest.raises(ReplayMiss):
+        replay(manager, 'get_stock_price', 'BUSY')
+
+
+def test_missing_recording_raises(cassette):
+    manager = ReplayManager(cassette, latency_ms=0, rate_limits={})
+    with pytest.raises(ReplayMiss, match='MSFT'):
+        replay(manager, 'get_company_info', 'MSFT')
+    with pytest.raises(AttributeError):
+        manager.connectors['yahoo_finance'].get_financial_statements
+    assert manager.get_connector_health()['yahoo_finance']['misses'] == 1
+
+
+def test_simulated_latency(cassette):
+    def timed(manager):
+        started = time.perf_counter()
+        replay(manager, 'get_company_info', 'AAPL')
+        return time.perf_counter() - started
+
+    assert timed(ReplayManager(cassette, latency_ms=80, rate_limits={})) >= 0.08
+    assert timed(ReplayManager(cassette, latency_ms=0, rate_limits={})) < 0.05
+    # Without a fixed latency the recorded one is replayed
+    manager = ReplayManager(cassette, rate_limits={})
+    started = time.perf_counter()
+    replay(manager, 'get_stock_price', 'AAPL')
+    assert time.perf_counter() - started >= 0.02
+
+
+def test_simulated_rate_limit(cassette):
+    manager = ReplayManager(cassette, latency_ms=0, rate_limits={'yahoo_finance': (2, 10.0)})
+    replay(manager, 'get_company_info', 'AAPL')
+    replay(manager, 'get_stock_price', 'AAPL')
+    with pytest.raises(RateLimitExceeded) as error:
+        replay(manager, 'get_company_info', 'AAPL')
+    assert 9.0 < error.value.retry_after <= 10.0
+    assert manager.get_connector_health()['yahoo_finance']['rate_limited'] == 1
@@ -0,0 +1,42 @@
+"""Frame encoding for the API responses."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import serialization
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def dumps(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(serialization, 'orjson', None)
+    return lambda payload: json.loads(serialization.dumps(payload))
+
+
+def test_prices_match_to_dict_records(dumps):
+    index = pd.date_range('2024-01-01', periods=5, tz='America/New_York')
+    df = pd.DataFrame({'Close': [1.5, np.nan, 3.0, 4.0, 5.0], 'Volume': [10, 20, 30, 40, 50]}, index=index)
+    assert dumps(serialization.to_records(df, rows=3)) == [
+        {'Close': 3.0, 'Volume': 30}, {'Close': 4.0, 'Volume': 40}, {'Close': 5.0, 'Volume': 50}]
+    columnar = dumps(serialization.to_columnar(df, rows=2))
+    assert columnar == {'index': ['2024-01-04T00:00:00', '2024-01-05T00:00:00'], 'Close': [4.0, 5.0], 'Volume': [40, 50]}
+
+
+def test_object_statements_keep_numbers(dumps):
+    # yfinance statements: line items x fiscal year ends, values of object dtype
+    df = pd.DataFrame({pd.Timestamp('2023-09-30'): [383285000000.0, None],
+                       pd.Timestamp('2022-09-30'): [394328000000.0, 99803000000]},
+                      index=['Total Revenue', 'Net Income'], dtype=object)
+    assert dumps(serialization.to_records(df)) == [
+        {'2023-09-30T00:00:00': 383285000000.0, '2022-09-30T00:00:00': 394328000000.0},
+        {'2023-09-30T00:00:00': None, '2022-09-30T00:00:00': 99803000000},
+    ]
+
+
+def test_mixed_object_columns_only_stringify_non_numbers(dumps):
+    df = pd.DataFrame({'value': np.array(['n/a', np.int64(3), 2.5, np.nan, pd.Timestamp('2024-01-02', tz='UTC')],
+                                         dtype=object)})
+    assert dumps(serialization.to_columnar(df))['value'] == ['n/a', 3, 2.5, None, '2024-01-02T00:00:00+00:00']
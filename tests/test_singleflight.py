@@ -0,0 +1,112 @@
+"""
+SingleFlight: concurrent calls for one key share a single fetch.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+
+class Fetch:
+    def __init__(self, result='data', error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_calls_share_one_fetch():
+    async def scenario():
+        flight, fetch = SingleFlight(), Fetch({'rows': 3})
+        fetch.release = asyncio.Event()
+        waiters = [asyncio.ensure_future(flight.do('DGS10', fetch)) for _ in range(10)]
+        await asyncio.sleep(0)
+        fetch.release.set()
+        return flight, fetch, await asyncio.gather(*waiters)
+
+    flight, fetch, results = asyncio.run(scenario())
+    assert fetch.calls == 1
+    assert all(result is results[0] for result in results)
+    assert (flight.calls, flight.coalesced, flight.in_flight()) == (1, 9, 0)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch():
+    async def scenario():
+        flight, fetch = SingleFlight(), Fetch()
+        fetch.release = asyncio.Event()
+        leaving = asyncio.ensure_future(flight.do('DGS10', fetch))
+        staying = asyncio.ensure_future(flight.do('DGS10', fetch))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        await asyncio.sleep(0)
+        fetch.release.set()
+        return leaving, await staying, fetch
+
+    leaving, result, fetch = asyncio.run(scenario())
+    assert leaving.cancelled()
+    assert result == 'data'
+    assert fetch.calls == 1
+
+
+def test_error_reaches_every_waiter_and_clears_key():
+    async def scenario():
+        flight, failing = SingleFlight(), Fetch(error=RuntimeError('upstream down'))
+        failing.release = asyncio.Event()
+        waiters = [asyncio.ensure_future(flight.do('DGS10', failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        failing.release.set()
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        in_flight = flight.in_flight()
+
+        retry = Fetch('fresh')
+        retry.release = asyncio.Event()
+        retry.release.set()
+        return outcomes, in_flight, await flight.do('DGS10', retry), failing, retry
+
+    outcomes, in_flight, result, failing, retry = asyncio.run(scenario())
+    assert [str(e) for e in outcomes] == ['upstream down'] * 3
+    assert all(isinstance(e, RuntimeError) for e in outcomes)
+    assert in_flight == 0
+    assert (failing.calls, retry.calls, result) == (1, 1, 'fresh')
+
+
+def test_fred_route_coalesces_concurrent_requests(monkeypatch):
+    import src.main_api as api
+
+    class Fred:
+        calls = 0
+
+        async def _fetch_observations(self, series_id):
+            Fred.calls += 1
+            await asyncio.sleep(0.01)
+            return {'series': series_id}
+
+    monkeypatch.setattr(api, 'fred_requests', SingleFlight())
+    monkeypatch.setattr(api.session, 'manager', SimpleNamespace(connectors={'fred': Fred()}))
+
+    async def scenario():
+        return await asyncio.gather(*(api.get_fred_observations(s) for s in ('dgs10', 'DGS10', 'DGS10')))
+
+    results = asyncio.run(scenario())
+    assert Fred.calls == 1
+    assert results == [{'series': 'dgs10'}] * 3
+
+
+def test_fred_route_without_connector_is_404(monkeypatch):
+    import src.main_api as api
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(api.session, 'manager', SimpleNamespace(connectors={}))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(api.get_fred_observations('DGS10'))
+    assert error.value.status_code == 404
@@ -0,0 +1,137 @@
+"""
+Quote streaming: the producer publishes ticks to the in-memory broker and
+the hub routes them to subscribers.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.streaming.broker import InMemoryBroker
+from src.streaming.hub import QuoteHub, QuoteSubscriber
+from src.streaming.producer import QuoteProducer
+from src.streaming.ticks import Tick, decode_tick, encode_tick
+
+TOPIC = 'test.ticks'
+
+
+def tick(symbol, price, ts=1):
+    return Tick(symbol, price, 100, ts)
+
+
+class FakeQuotes:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    async def get_stock_price(self, symbol, **kwargs):
+        self.calls.append((symbol, kwargs))
+        index = pd.DatetimeIndex([pd.Timestamp('2026-10-16 15:59', tz='America/New_York')])
+        return pd.DataFrame({'Close': [self.prices[symbol]], 'Volume': [1000]}, index=index)
+
+
+async def settle():
+    # Let the hub's consumer drain the broker queue
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_hub_routes_ticks_by_symbol_filter():
+    async def scenario():
+        broker = InMemoryBroker()
+        hub = QuoteHub(broker, topic=TOPIC)
+        apple = hub.subscribe(['aapl'])
+        everything = hub.subscribe()
+        await settle()
+        for t in (tick('AAPL', 1.0), tick('MSFT', 2.0)):
+            await broker.publish(TOPIC, t.symbol.encode(), encode_tick(t))
+        await settle()
+        apple_batch = await apple.next_batch()
+        all_batch = await everything.next_batch()
+        await hub.close()
+        return apple_batch, all_batch
+
+    apple_batch, all_batch = asyncio.run(scenario())
+    assert [decode_tick(p).symbol for p in apple_batch] == ['AAPL']
+    assert [decode_tick(p).symbol for p in all_batch] == ['AAPL', 'MSFT']
+
+
+def test_slow_subscriber_gets_latest_tick_per_symbol():
+    async def scenario():
+        broker = InMemoryBroker()
+        hub = QuoteHub(broker, topic=TOPIC)
+        subscriber = hub.subscribe(['AAPL', 'MSFT'])
+        await settle()
+        for t in (tick('AAPL', 1.0), tick('MSFT', 9.0), tick('AAPL', 2.0), tick('AAPL', 3.0)):
+            await broker.publish(TOPIC, t.symbol.encode(), encode_tick(t))
+        await settle()
+        batch = await subscriber.next_batch()
+        stats = hub.stats()
+        await hub.close()
+        return batch, stats
+
+    batch, stats = asyncio.run(scenario())
+    assert [(t.symbol, t.price) for t in map(decode_tick, batch)] == [('MSFT', 9.0), ('AAPL', 3.0)]
+    assert stats['received'] == 4
+    assert stats['conflated'] == 2
+    assert stats['delivered'] == 2
+
+
+def test_subscribe_and_unsubscribe_on_symbol_list():
+    subscriber = QuoteSubscriber(['AAPL'])
+    subscriber.subscribe(['msft'])
+    subscriber.offer('AAPL', b'a')
+    subscriber.unsubscribe(['aapl'])
+    assert not subscriber.wants('AAPL')
+    assert subscriber.wants('MSFT')
+    assert not subscriber.wants('TSLA')
+    assert 'AAPL' not in subscriber._pending
+
+
+def test_unsubscribe_on_wildcard_feed_excludes_only_that_symbol():
+    subscriber = QuoteSubscriber()
+    subscriber.unsubscribe(['aapl'])
+    assert not subscriber.wants('AAPL')
+    assert subscriber.wants('MSFT')
+    assert subscriber.symbols is None
+
+    subscriber.subscribe(['AAPL'])
+    assert subscriber.wants('AAPL')
+
+
+def test_producer_publishes_only_changed_ticks():
+    async def scenario():
+        quotes = FakeQuotes({'AAPL': 1.0, 'MSFT': 2.0})
+        manager = SimpleNamespace(connectors={'yahoo_finance': quotes})
+        broker = InMemoryBroker()
+        hub = QuoteHub(broker, topic=TOPIC)
+        subscriber = hub.subscribe()
+        await settle()
+        producer = QuoteProducer(manager, broker, ['AAPL', 'MSFT'], topic=TOPIC)
+        first = await producer.poll_once()
+        quotes.prices['MSFT'] = 2.5
+        second = await producer.poll_once()
+        await settle()
+        batch = await subscriber.next_batch()
+        await hub.close()
+        return quotes, producer, first, second, batch
+
+    quotes, producer, first, second, batch = asyncio.run(scenario())
+    assert (first, second) == (2, 1)
+    assert producer.stats()['unchanged'] == 1
+    assert quotes.calls[0][1] == {'period': '1d', 'interval': '1m'}
+    assert sorted((t.symbol, t.price) for t in map(decode_tick, batch)) == [('AAPL', 1.0), ('MSFT', 2.5)]
+
+
+def test_quote_socket_rejects_malformed_symbols():
+    from fastapi.testclient import TestClient
+
+    from src.main_api import app
+
+    client = TestClient(app)
+    with client.websocket_connect('/ws/quotes?symbols=AAPL') as websocket:
+        websocket.send_text('{"action": "subscribe", "symbols": "MSFT"}')
+        assert websocket.receive_json()['status'] == 'error'
+        websocket.send_text('not json')
+        assert websocket.receive_json()['status'] == 'error'
@@ -0,0 +1,39 @@
+"""
+``--warm``: seeds the calls the analyses make and warms them from a replay
+cassette, without switching tracking on for the rest of the process.
+"""
+
+import asyncio
+
+import pytest
+
+from src.cache.warmer import AccessTracker
+from src.config.settings import settings
+from src.storage.replay import write_synthetic_cassette
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    cassette = tmp_path / 'cassette'
+    write_synthetic_cassette(str(cassette), ['AAPL'], sessions=200)
+    # State files default to paths under data/, so keep them in the temp dir
+    monkeypatch.chdir(tmp_path)
+    for name, value in {'REPLAY_DIR': str(cassette), 'RECORD_DIR': None, 'WARM_ENABLED': False,
+                        'CACHE_REDIS_ENABLED': False, 'RATE_LIMIT_ENABLED': False,
+                        'INFLUX_ENABLED': False}.items():
+        monkeypatch.setattr(settings, name, value)
+    return tmp_path
+
+
+def test_warm_cache_seeds_analysis_periods(replay, monkeypatch):
+    from src.main import warm_cache
+
+    seeded = []
+    seed = AccessTracker.seed
+    monkeypatch.setattr(AccessTracker, 'seed',
+                        lambda self, connector, method, args, kwargs=None:
+                        seeded.append((method, args, kwargs)) or seed(self, connector, method, args, kwargs))
+
+    assert asyncio.run(warm_cache(['AAPL']))
+    assert settings.WARM_ENABLED is False
+    assert {kwargs['period'] for method, _, kwargs in seeded if method == 'get_stock_price'} == {'5d', '1mo', '6mo'}